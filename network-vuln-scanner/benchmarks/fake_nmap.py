@@ -0,0 +1,149 @@
+"""Drop-in replacement for nmap.PortScanner that replays recorded nmap XML.
+
+Hosts come either from a recorded `nmap -oX` file or from a synthetic
+inventory. Each scan() call builds the XML nmap would have produced for the
+requested hosts and ports and feeds it through python-nmap's own parser, so
+NetworkScanner sees exactly the data structures of a real run.
+"""
+import ipaddress
+import time
+import xml.etree.ElementTree as ET
+from typing import Dict, List, Tuple
+
+import nmap
+
+XML_HEADER = ('<?xml version="1.0"?><nmaprun scanner="nmap" args="nmap {args}" start="0" version="7.94">'
+              '<scaninfo type="syn" protocol="tcp" numservices="{count}" services="{services}"/>')
+XML_FOOTER = ('<runstats><finished time="0" elapsed="{elapsed:.2f}"/>'
+              '<hosts up="{up}" down="0" total="{up}"/></runstats></nmaprun>')
+
+SYNTHETIC_SERVICES = [
+    (22, 'ssh', 'OpenSSH', '8.9p1'), (80, 'http', 'nginx', '1.24.0'), (443, 'https', 'nginx', '1.24.0'),
+    (3389, 'ms-wbt-server', 'Microsoft Terminal Services', ''), (445, 'microsoft-ds', '', ''),
+    (3306, 'mysql', 'MySQL', '8.0.36'), (8080, 'http-proxy', 'Jetty', '9.4'), (21, 'ftp', 'vsftpd', '3.0.5'),
+    (53, 'domain', 'dnsmasq', '2.89'), (5900, 'vnc', 'RealVNC', '6.0'),
+]
+
+class FakePortScanner:
+    """Replays per-host nmap XML for scan() calls, optionally with simulated latency"""
+
+    def __init__(self, inventory: Dict[str, Tuple[str, Dict[int, str]]], latency: float = 0.0,
+                 latency_per_port: float = 0.0):
+        # inventory: ip -> (host XML without <ports>, {port: <port> element XML})
+        self.inventory = inventory
+        self.latency = latency
+        self.latency_per_port = latency_per_port
+        self.calls = 0
+        self.probes = 0
+        self._parser = nmap.PortScanner.__new__(nmap.PortScanner)  # skips the nmap binary lookup
+        self._parser._scan_result = {}
+
+    @classmethod
+    def from_xml(cls, xml_text: str, **kwargs) -> 'FakePortScanner':
+        """Build from a recorded `nmap -oX` document"""
+        inventory = {}
+        for host in ET.fromstring(xml_text).iter('host'):
+            address = host.find("address[@addrtype='ipv4']")
+            if address is None:
+                continue
+            ports = {}
+            ports_element = host.find('ports')
+            if ports_element is not None:
+                for port in ports_element.findall('port'):
+                    ports[int(port.get('portid'))] = ET.tostring(port, encoding='unicode')
+                host.remove(ports_element)
+            body = ET.tostring(host, encoding='unicode')
+            inventory[address.get('addr')] = (body, ports)
+        return cls(inventory, **kwargs)
+
+    @classmethod
+    def from_xml_file(cls, path: str, **kwargs) -> 'FakePortScanner':
+        with open(path, 'r', encoding='utf-8') as f:
+            return cls.from_xml(f.read(), **kwargs)
+
+    @classmethod
+    def synthetic(cls, count: int, network: str = '10.0.0.0/8', open_ports_per_host: int = 5,
+                  **kwargs) -> 'FakePortScanner':
+        """Build an inventory of count hosts, each with a rotating set of open services"""
+        xml_text = synthetic_nmap_xml(count, network, open_ports_per_host)
+        return cls.from_xml(xml_text, **kwargs)
+
+    def scan(self, hosts: str = '127.0.0.1', ports: str = None, arguments: str = '', sudo: bool = False,
+             timeout: int = 0) -> Dict:
+        self.calls += 1
+        targets = self._targets(hosts)
+        discovery = '-sn' in arguments.split()
+        wanted = None if discovery or not ports else _parse_ports(ports)
+
+        parts = []
+        for ip in targets:
+            body, port_elements = self.inventory[ip]
+            if discovery:
+                parts.append(body)
+                continue
+            selected = port_elements if wanted is None else {
+                port: element for port, element in port_elements.items() if port in wanted
+            }
+            self.probes += len(wanted) if wanted is not None else len(port_elements)
+            closing = body.rindex('</host>')
+            parts.append(f"{body[:closing]}<ports>{''.join(selected.values())}</ports></host>")
+
+        if self.latency or self.latency_per_port:
+            time.sleep(self.latency + self.latency_per_port * (len(wanted) if wanted else 0))
+
+        services = ports or ''
+        xml_text = (XML_HEADER.format(args=arguments, count=len(wanted or ()), services=services)
+                    + ''.join(parts)
+                    + XML_FOOTER.format(elapsed=self.latency, up=len(parts)))
+        return self._parser.analyse_nmap_xml_scan(xml_text)
+
+    def _targets(self, hosts: str) -> List[str]:
+        if hosts in self.inventory:
+            return [hosts]
+        try:
+            network = ipaddress.ip_network(hosts, strict=False)
+        except ValueError:
+            return []
+        return [ip for ip in self.inventory if ipaddress.ip_address(ip) in network]
+
+    def all_hosts(self) -> List[str]:
+        return self._parser.all_hosts()
+
+    def __getitem__(self, host: str):
+        return self._parser[host]
+
+def _parse_ports(ports: str) -> set:
+    wanted = set()
+    for part in ports.split(','):
+        if '-' in part:
+            start, end = part.split('-', 1)
+            wanted.update(range(int(start), int(end) + 1))
+        elif part:
+            wanted.add(int(part))
+    return wanted
+
+def synthetic_nmap_xml(count: int, network: str = '10.0.0.0/8', open_ports_per_host: int = 5) -> str:
+    """Generate an nmap XML document for count hosts of a network"""
+    hosts = []
+    addresses = ipaddress.ip_network(network).hosts()
+    for index in range(count):
+        ip = str(next(addresses))
+        port_xml = []
+        for offset in range(open_ports_per_host):
+            port, name, product, version = SYNTHETIC_SERVICES[(index + offset) % len(SYNTHETIC_SERVICES)]
+            port_xml.append(
+                f'<port protocol="tcp" portid="{port}"><state state="open" reason="syn-ack" reason_ttl="64"/>'
+                f'<service name="{name}" product="{product}" version="{version}" method="probed" conf="10"/></port>'
+            )
+        os_family = ('Linux', 'Windows', 'embedded')[index % 3]
+        hosts.append(
+            f'<host><status state="up" reason="syn-ack" reason_ttl="64"/>'
+            f'<address addr="{ip}" addrtype="ipv4"/><hostnames/>'
+            f'<ports>{"".join(port_xml)}</ports>'
+            f'<os><osmatch name="{os_family}" accuracy="95" line="1">'
+            f'<osclass type="general purpose" vendor="x" osfamily="{os_family}" osgen="1" accuracy="95"/>'
+            f'</osmatch></os></host>'
+        )
+    return (XML_HEADER.format(args='-sS -sV -O', count=0, services='')
+            + ''.join(hosts)
+            + XML_FOOTER.format(elapsed=0.0, up=count))
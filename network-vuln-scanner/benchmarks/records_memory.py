@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""Compare memory use of dict-based and slotted host/port results at /16 scale.
+
+Usage: python benchmarks/records_memory.py [--hosts 65536] [--ports 5] [--json out.json]
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import gc
+import json
+import tracemalloc
+from src.models import HostRecord, PortRecord, json_default
+
+SERVICES = [(22, 'ssh', 'MEDIUM'), (80, 'http', 'LOW'), (443, 'https', 'LOW'),
+            (3389, 'ms-wbt-server', 'HIGH'), (445, 'microsoft-ds', 'HIGH'),
+            (8080, 'http-proxy', 'LOW'), (53, 'domain', 'MEDIUM'), (21, 'ftp', 'HIGH')]
+
+def host_ips(count: int):
+    """Yield IPs of a 10.0.0.0/16-style block"""
+    for index in range(count):
+        yield f"10.{(index >> 16) & 0xff}.{(index >> 8) & 0xff}.{index & 0xff}"
+
+def build_records(count: int, ports_per_host: int) -> dict:
+    hosts = {}
+    for ip in host_ips(count):
+        ports = [
+            PortRecord(port, 'tcp', 'open', service, '1.0', 'product', '', risk)
+            for port, service, risk in SERVICES[:ports_per_host]
+        ]
+        hosts[ip] = HostRecord(ip, hostname=ip, state='up', os_name='Linux',
+                               os_version='5.X', os_accuracy='98', ports=ports)
+    return hosts
+
+def build_dicts(count: int, ports_per_host: int) -> dict:
+    hosts = {}
+    for ip in host_ips(count):
+        ports = {}
+        for port, service, risk in SERVICES[:ports_per_host]:
+            # Fresh strings, as produced by parsing nmap output per host
+            ports[f"{port}/tcp"] = {
+                'state': ''.join(['op', 'en']),
+                'service': ''.join([service]),
+                'version': '1.0',
+                'product': 'product',
+                'extrainfo': '',
+                'risk_level': ''.join([risk])
+            }
+        hosts[ip] = {
+            'hostname': ip,
+            'state': 'up',
+            'os_info': {'os': 'Linux', 'version': '5.X', 'accuracy': '98'},
+            'ports': ports,
+            'vulnerabilities': []
+        }
+    return hosts
+
+def measure(builder, count: int, ports_per_host: int) -> dict:
+    gc.collect()
+    tracemalloc.start()
+    hosts = builder(count, ports_per_host)
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del hosts
+    gc.collect()
+    return {'current_bytes': current, 'peak_bytes': peak, 'bytes_per_host': current / count}
+
+def check_round_trip(ports_per_host: int):
+    """Records must serialize to exactly the dict/JSON shape of the old results"""
+    records = build_records(256, ports_per_host)
+    dicts = build_dicts(256, ports_per_host)
+    encoded = json.dumps(records, default=json_default)
+    assert encoded == json.dumps(dicts), "record JSON differs from dict JSON"
+    restored = {ip: HostRecord.from_dict(ip, host) for ip, host in json.loads(encoded).items()}
+    assert restored == records, "records did not survive a JSON round trip"
+
+def main():
+    parser = argparse.ArgumentParser(description="Scan result memory benchmark")
+    parser.add_argument("--hosts", type=int, default=65536, help="Number of hosts (default: a /16)")
+    parser.add_argument("--ports", type=int, default=5, help="Open ports per host")
+    parser.add_argument("--json", help="Write results to this file")
+    args = parser.parse_args()
+
+    check_round_trip(args.ports)
+    results = {
+        'hosts': args.hosts,
+        'ports_per_host': args.ports,
+        'dicts': measure(build_dicts, args.hosts, args.ports),
+        'records': measure(build_records, args.hosts, args.ports)
+    }
+    results['reduction'] = 1 - results['records']['current_bytes'] / results['dicts']['current_bytes']
+
+    for name in ('dicts', 'records'):
+        stats = results[name]
+        print(f"{name:8} {stats['current_bytes'] / 2**20:8.1f} MiB  {stats['bytes_per_host']:7.0f} B/host")
+    print(f"Reduction: {results['reduction']:.0%}")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+"""Throughput benchmarks for NetworkScanner, ReportGenerator and EmailNotifier.
+
+Scans replay nmap XML through FakePortScanner (synthetic or recorded with
+`nmap -oX`), so 1 to 65k hosts can be measured without touching a network.
+--farm-hosts additionally runs the real nmap binary against a TargetFarm
+of listening sockets on loopback addresses.
+
+Usage:
+    python benchmarks/run_benchmarks.py --sizes 1,256,4096 --output bench.json
+    python benchmarks/run_benchmarks.py --sizes 65536 --baseline bench.json
+    python benchmarks/run_benchmarks.py --replay recorded_scan.xml
+    python benchmarks/run_benchmarks.py --farm-hosts 8
+
+Exits with status 1 if any result is slower than the baseline by more than
+--tolerance.
+"""
+import sys
+import os
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.dirname(BENCH_DIR))
+sys.path.append(BENCH_DIR)
+
+import argparse
+import json
+import logging
+import platform
+import shutil
+import tempfile
+import time
+from datetime import datetime
+from typing import Dict, List, Optional
+
+import src.emailer
+import src.scanner
+from fake_nmap import FakePortScanner
+from smtp_sink import SMTPSink
+from target_farm import TargetFarm
+from src.emailer import EmailNotifier
+from src.log_setup import configure_logging
+from src.metrics import ScanMetrics
+from src.pipeline import ScanPipeline
+from src.reporter import ReportGenerator, create_report_template
+from src.scanner import NetworkScanner
+
+SYNTHETIC_NETWORK = '10.0.0.0/8'
+FARM_PORTS = [3306, 5432, 5900, 8080]
+
+def timed(items: int, function, *args, **kwargs):
+    """Run function once, returning (result, stats)"""
+    start = time.perf_counter()
+    result = function(*args, **kwargs)
+    seconds = time.perf_counter() - start
+    return result, {
+        'seconds': seconds,
+        'items': items,
+        'items_per_second': items / seconds if seconds > 0 else float('inf')
+    }
+
+def best_of(repeat: int, items: int, function, *args, **kwargs):
+    """Run a benchmark repeat times and keep the fastest run"""
+    best_result, best_stats = None, None
+    for _ in range(repeat):
+        result, stats = timed(items, function, *args, **kwargs)
+        if best_stats is None or stats['seconds'] < best_stats['seconds']:
+            best_result, best_stats = result, stats
+    return best_result, best_stats
+
+def configure_smtp(sink: SMTPSink):
+    """Point EmailNotifier at the local SMTP sink"""
+    src.emailer.SMTP_SERVER = '127.0.0.1'
+    src.emailer.SMTP_PORT = sink.port
+    src.emailer.SMTP_USE_TLS = False
+    src.emailer.EMAIL_ENABLED = True
+
+def bench_size(label: str, make_scanner, network: str, hosts: int, repeat: int, sink: SMTPSink) -> Dict:
+    """Measure every stage for one scan size"""
+    results = {}
+
+    scanner = None
+    def scan():
+        nonlocal scanner
+        scanner = NetworkScanner(ScanMetrics(), port_scanner=make_scanner())
+        return scanner.scan_all_networks(networks=[network])
+    scan_results, results['scan'] = best_of(repeat, hosts, scan)
+
+    reporter = ReportGenerator()
+    summary, results['aggregate'] = best_of(repeat, hosts, reporter.generate_summary_report, scan_results)
+    html_report, results['render'] = best_of(repeat, hosts, reporter.generate_html_report, scan_results, summary)
+    results_file, results['serialize_json'] = best_of(repeat, hosts, scanner.save_results, 'bench_results.json')
+
+    def load():
+        with open(results_file) as f:
+            return json.load(f)
+    loaded, results['deserialize_json'] = best_of(repeat, hosts, load)
+    _, results['aggregate_from_json'] = best_of(repeat, hosts, reporter.generate_summary_report, loaded)
+
+    emailer = EmailNotifier()
+    text_summary = reporter.generate_text_summary(summary)
+    sent, results['email'] = best_of(repeat, 1, emailer.send_report, 'Benchmark', text_summary, html_report)
+    results['email']['ok'] = bool(sent)
+    results['email']['attachment_bytes'] = os.path.getsize(html_report)
+
+    def pipeline():
+        metrics = ScanMetrics()
+        pipeline_scanner = NetworkScanner(metrics, port_scanner=make_scanner())
+        ScanPipeline(pipeline_scanner, ReportGenerator(metrics), EmailNotifier(metrics),
+                     metrics=metrics, networks=[network]).run()
+        return metrics
+    metrics, results['pipeline'] = best_of(repeat, hosts, pipeline)
+    scan_seconds = metrics.phases['scan']['total_seconds']
+    results['pipeline']['after_last_probe_seconds'] = max(0.0, metrics.elapsed() - scan_seconds)
+
+    for stats in results.values():
+        stats['label'] = label
+    return results
+
+def bench_farm(hosts: int, arguments: str) -> Optional[Dict]:
+    """Scan a loopback TargetFarm with the real nmap binary"""
+    if not shutil.which('nmap'):
+        print("nmap not found, skipping target farm benchmark")
+        return None
+    src.scanner.SCAN_ARGUMENTS = arguments
+    with TargetFarm(hosts, FARM_PORTS) as farm:
+        first, last = farm.addresses[0], farm.addresses[-1]
+        network = f"{first}-{last.rsplit('.', 1)[1]}"
+        scanner = NetworkScanner(ScanMetrics())
+        scan_results, stats = timed(hosts, scanner.scan_all_networks, networks=[network])
+
+    found = {
+        ip: sorted(port.port for port in host.open_ports())
+        for ip, host in scan_results['results'].get(network, {}).get('hosts', {}).items()
+    }
+    stats['correct'] = found == {ip: sorted(ports) for ip, ports in farm.expected_open_ports().items()}
+    stats['phases'] = scanner.metrics.to_dict()['phases']
+    return {'scan_farm': stats}
+
+def compare(results: Dict, baseline: Dict, tolerance: float) -> List[str]:
+    """List benchmarks whose throughput dropped more than tolerance below the baseline"""
+    regressions = []
+    for name, stats in results.items():
+        previous = baseline.get(name)
+        if not previous or not previous.get('items_per_second'):
+            continue
+        ratio = stats['items_per_second'] / previous['items_per_second']
+        stats['baseline_ratio'] = ratio
+        if ratio < 1 - tolerance:
+            regressions.append(f"{name}: {stats['items_per_second']:.1f}/s vs baseline "
+                               f"{previous['items_per_second']:.1f}/s ({ratio:.0%})")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="Network scanner benchmark suite")
+    parser.add_argument("--sizes", default="1,256,4096", help="Comma separated host counts (up to 65536)")
+    parser.add_argument("--ports-per-host", type=int, default=5, help="Open ports per synthetic host")
+    parser.add_argument("--latency", type=float, default=0.0, help="Simulated seconds per nmap call")
+    parser.add_argument("--replay", help="Replay a recorded nmap -oX file instead of synthetic hosts")
+    parser.add_argument("--farm-hosts", type=int, default=0, help="Also scan this many loopback farm hosts with nmap")
+    parser.add_argument("--farm-arguments", default="-sT -T5", help="nmap arguments for the farm scan")
+    parser.add_argument("--repeat", type=int, default=1, help="Keep the best of N runs")
+    parser.add_argument("--output", help="Write machine-readable results to this JSON file")
+    parser.add_argument("--baseline", help="Previous results to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed slowdown vs baseline (0.25 = 25%%)")
+    args = parser.parse_args()
+
+    output = os.path.abspath(args.output) if args.output else None
+    baseline_path = os.path.abspath(args.baseline) if args.baseline else None
+    replay_path = os.path.abspath(args.replay) if args.replay else None
+
+    # Reports, templates, logs and port history all go to a scratch directory
+    workdir = tempfile.mkdtemp(prefix='vulnscan-bench-')
+    os.chdir(workdir)
+    configure_logging(logging.WARNING)
+    create_report_template()
+    src.scanner.RESOLVE_HOSTNAMES = False
+
+    results = {}
+    with SMTPSink() as sink:
+        configure_smtp(sink)
+
+        if replay_path:
+            with open(replay_path, 'r', encoding='utf-8') as f:
+                xml_text = f.read()
+            hosts = len(FakePortScanner.from_xml(xml_text).inventory)
+            make_scanner = lambda: FakePortScanner.from_xml(xml_text, latency=args.latency)
+            for name, stats in bench_size('replay', make_scanner, '0.0.0.0/0', hosts, args.repeat, sink).items():
+                results[f"{name}/replay"] = stats
+        else:
+            for size in [int(value) for value in args.sizes.split(',') if value]:
+                inventory = FakePortScanner.synthetic(size, SYNTHETIC_NETWORK, args.ports_per_host).inventory
+                make_scanner = lambda: FakePortScanner(inventory, latency=args.latency)
+                for name, stats in bench_size(str(size), make_scanner, SYNTHETIC_NETWORK, size, args.repeat, sink).items():
+                    results[f"{name}/{size}"] = stats
+                print(f"Finished {size} hosts")
+
+        if args.farm_hosts:
+            farm_results = bench_farm(args.farm_hosts, args.farm_arguments)
+            if farm_results:
+                results.update({f"{name}/{args.farm_hosts}": stats for name, stats in farm_results.items()})
+
+    for name, stats in results.items():
+        print(f"{name:28} {stats['seconds']:9.3f}s {stats['items_per_second']:12.1f}/s")
+
+    regressions = []
+    if baseline_path:
+        with open(baseline_path) as f:
+            regressions = compare(results, json.load(f)['results'], args.tolerance)
+
+    report = {
+        'meta': {
+            'timestamp': datetime.now().isoformat(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'latency': args.latency,
+            'ports_per_host': args.ports_per_host
+        },
+        'results': results,
+        'regressions': regressions
+    }
+    if output:
+        with open(output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"Results written to {output}")
+
+    shutil.rmtree(workdir, ignore_errors=True)
+
+    if regressions:
+        print("Regressions:")
+        for line in regressions:
+            print(f"  {line}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
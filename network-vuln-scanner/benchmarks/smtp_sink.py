@@ -0,0 +1,58 @@
+"""Minimal SMTP server on loopback that accepts and discards every message."""
+import socketserver
+import threading
+
+class _SinkHandler(socketserver.StreamRequestHandler):
+    def _reply(self, line: str):
+        self.wfile.write(f"{line}\r\n".encode('ascii'))
+
+    def handle(self):
+        self._reply('220 smtp-sink ready')
+        in_data = False
+        for raw in self.rfile:
+            line = raw.rstrip(b'\r\n')
+            if in_data:
+                if line == b'.':
+                    in_data = False
+                    self.server.messages += 1
+                    self._reply('250 OK queued')
+                else:
+                    self.server.bytes_received += len(raw)
+                continue
+            command = line.split(b' ', 1)[0].upper()
+            if command == b'EHLO':
+                self._reply('250-smtp-sink')
+                self._reply('250 AUTH PLAIN LOGIN')
+            elif command == b'AUTH':
+                self._reply('235 Authentication successful')
+            elif command == b'DATA':
+                in_data = True
+                self._reply('354 End data with <CR><LF>.<CR><LF>')
+            elif command == b'QUIT':
+                self._reply('221 Bye')
+                return
+            else:
+                self._reply('250 OK')
+
+class SMTPSink(socketserver.ThreadingTCPServer):
+    """Accepts SMTP sessions on 127.0.0.1 (plain text, no STARTTLS)"""
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, port: int = 0):
+        super().__init__(('127.0.0.1', port), _SinkHandler)
+        self.messages = 0
+        self.bytes_received = 0
+        self._thread = threading.Thread(target=self.serve_forever, name='smtp-sink', daemon=True)
+
+    @property
+    def port(self) -> int:
+        return self.server_address[1]
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.shutdown()
+        self.server_close()
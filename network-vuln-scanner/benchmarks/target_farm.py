@@ -0,0 +1,80 @@
+"""A farm of listening TCP sockets on loopback addresses to scan for real.
+
+Linux routes all of 127.0.0.0/8 to the loopback interface, so every farm
+host gets its own address without configuration. On macOS add aliases
+first (sudo ifconfig lo0 alias 127.0.1.N up); Windows accepts the whole
+127/8 range like Linux. Accepted connections get a short banner and are
+closed, which is enough for nmap to report the port open and guess a service.
+"""
+import ipaddress
+import selectors
+import socket
+import threading
+from typing import Dict, List
+
+BANNERS = {
+    21: b'220 farm FTP ready\r\n',
+    22: b'SSH-2.0-OpenSSH_8.9p1 farm\r\n',
+    25: b'220 farm ESMTP\r\n',
+    110: b'+OK farm POP3\r\n',
+}
+
+class TargetFarm:
+    """Listening sockets on hosts x ports loopback endpoints, served by one thread"""
+
+    def __init__(self, hosts: int, ports: List[int], network: str = '127.0.1.0/24'):
+        addresses = ipaddress.ip_network(network).hosts()
+        self.addresses = [str(next(addresses)) for _ in range(hosts)]
+        self.ports = list(ports)
+        self.network = network
+        self._selector = selectors.DefaultSelector()
+        self._sockets = []
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self) -> 'TargetFarm':
+        for address in self.addresses:
+            for port in self.ports:
+                listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+                listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+                listener.bind((address, port))
+                listener.listen(64)
+                listener.setblocking(False)
+                self._selector.register(listener, selectors.EVENT_READ, port)
+                self._sockets.append(listener)
+        self._thread = threading.Thread(target=self._serve, name='target-farm', daemon=True)
+        self._thread.start()
+        return self
+
+    def _serve(self):
+        while not self._stop.is_set():
+            for key, _ in self._selector.select(timeout=0.2):
+                try:
+                    connection, _ = key.fileobj.accept()
+                except OSError:
+                    continue
+                try:
+                    connection.sendall(BANNERS.get(key.data, b''))
+                except OSError:
+                    pass
+                finally:
+                    connection.close()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+        for listener in self._sockets:
+            self._selector.unregister(listener)
+            listener.close()
+        self._sockets = []
+        self._selector.close()
+
+    def expected_open_ports(self) -> Dict[str, List[int]]:
+        return {address: list(self.ports) for address in self.addresses}
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
@@ -20,12 +20,48 @@ EXTENDED_PORTS = list(range(1, 1025))  # Scan ports 1-1024
 SCAN_TIMEOUT = 300  # 5 minutes timeout
 SCAN_INTENSITY = "-T4"  # Aggressive timing
 SCAN_ARGUMENTS = "-sS -sV -O"  # SYN scan, version detection, OS detection
+RESOLVE_HOSTNAMES = True  # Reverse DNS lookup for every live host
+
+# Risk rules (re-applied when reports are regenerated with --report-only)
+HIGH_RISK_PORTS = [21, 23, 135, 139, 445, 1433, 3389, 5432]
+MEDIUM_RISK_PORTS = [22, 25, 53, 110, 143, 993, 995]
+
+# History-driven port prioritisation
+PORT_HISTORY_FILE = "reports/port_history.json"
+PORT_HISTORY_DECAY = 0.9  # Weight kept by past runs on every new scan
+PORT_HISTORY_PRIOR_WEIGHT = 2.0  # Pseudo-observations backing the prior estimate
+HOST_SCAN_TIME_BUDGET = None  # Seconds per host, None scans every port
+PORT_BATCH_SIZE = 20  # Ports per nmap call when a time budget is set
+
+# Pipeline between scan, storage/aggregation and report rendering
+PIPELINE_QUEUE_SIZE = 256  # Max queued host records before the scanner waits
+
+# Trend rollups across scans
+TREND_FILE = "reports/trends.json"
+TREND_MAX_WEEKS = 260  # Weekly buckets kept in the rollups
+TREND_REPORT_WEEKS = 12  # Weeks shown in the report trend section
+
+# Performance metrics (Prometheus text format)
+METRICS_FILE = None  # e.g. "reports/metrics.prom" for the node_exporter textfile collector
+METRICS_PORT = None  # e.g. 9105 to serve /metrics while the scheduler runs
+METRICS_HOST = "127.0.0.1"  # Address /metrics is served on; "0.0.0.0" exposes it on every interface
 
 # Report configuration
 REPORT_DIR = "reports/current"
 ARCHIVE_DIR = "reports/archive"
+ARCHIVE_ENABLED = True  # Archive every run and prune old files from REPORT_DIR
+ARCHIVE_KEEP_CURRENT_RUNS = 1  # Runs left uncompressed in REPORT_DIR
+ARCHIVE_KEEP_ALL_DAYS = 14  # Keep every run this recent
+ARCHIVE_KEEP_DAILY_DAYS = 90  # Then the last run of each day
+ARCHIVE_KEEP_WEEKLY_WEEKS = 104  # Then the last run of each week
 LOG_DIR = "logs"
+LOG_FORMAT = "text"  # "text" or "json" (one object per line)
+LOG_MAX_BYTES = 10 * 1024 * 1024  # Rotate logs/scanner.log at this size
+LOG_BACKUP_COUNT = 5  # Rotated log files kept
 TEMPLATE_DIR = "templates"
+REPORT_CACHE_DIR = "reports/cache"  # Rendered network sections, None disables caching
+REPORT_CACHE_MAX_ENTRIES = 1000  # Least recently used sections beyond this are evicted
+REPORT_CACHE_MAX_AGE_DAYS = 30  # Sections unused for this long are evicted
 
 # Email configuration
 EMAIL_ENABLED = True
@@ -1,60 +1,157 @@
 #!/usr/bin/env python3
+import os
 import sys
+import time
 import argparse
-import logging
-from src.scanner import NetworkScanner
-from src.reporter import ReportGenerator
-from src.emailer import EmailNotifier
-from src.scheduler import ScanScheduler
+from functools import partial
+from config.settings import ARCHIVE_ENABLED, METRICS_FILE, METRICS_HOST, METRICS_PORT, TREND_REPORT_WEEKS
+
+# Scanner, reporter and emailer pull in nmap, psutil, jinja2 and smtplib.
+# Each command imports only what it needs, so --help, --report-only and the
+# idle scheduler start without loading the scan stack.
 
 def main():
     parser = argparse.ArgumentParser(description="Network Vulnerability Scanner")
     parser.add_argument("--scan", action="store_true", help="Run immediate scan")
     parser.add_argument("--schedule", action="store_true", help="Start scheduler")
-    parser.add_argument("--report-only", help="Generate report from existing scan file")
+    parser.add_argument("--report-only", help="Regenerate reports from a saved .json or .ndjson scan file (optionally .gz) or an archived run id")
+    parser.add_argument("--archive", action="store_true", help="Archive old results and reports and apply retention")
+    parser.add_argument("--trends", nargs="?", const="", metavar="NETWORK", help="Show weekly trends, optionally for one network")
+    parser.add_argument("--weeks", type=int, default=TREND_REPORT_WEEKS, help="Weeks of trends to show")
+    parser.add_argument("--profile", action="store_true", help="Store a timing breakdown in the scan metadata")
+    parser.add_argument("--metrics-file", default=METRICS_FILE, help="Write Prometheus metrics to this file after each scan")
+    parser.add_argument("--metrics-port", type=int, default=METRICS_PORT, help="Serve Prometheus metrics on this port")
+    parser.add_argument("--metrics-host", default=METRICS_HOST, help="Address to serve metrics on (default: localhost only; 0.0.0.0 for every interface)")
     
     args = parser.parse_args()
     
-    # Setup logging
-    logging.basicConfig(level=logging.INFO)
+    # Setup logging once for the process; records are written by a background thread
+    from src.log_setup import configure_logging
+    configure_logging()
+    
+    metrics_server = None
+    if args.metrics_port is not None and (args.scan or args.schedule):
+        from src.metrics import MetricsServer
+        metrics_server = MetricsServer(args.metrics_port, args.metrics_host)
+        metrics_server.start()
+    
+    scan = partial(run_scan, profile=args.profile, metrics_file=args.metrics_file, metrics_server=metrics_server)
     
     if args.scan:
-        run_scan()
+        scan()
     elif args.schedule:
-        start_scheduler()
+        start_scheduler(scan)
     elif args.report_only:
         generate_report_from_file(args.report_only)
+    elif args.archive:
+        archive_reports()
+    elif args.trends is not None:
+        show_trends(args.trends or None, args.weeks)
     else:
         parser.print_help()
 
-def run_scan():
+def run_scan(profile=False, metrics_file=None, metrics_server=None):
     """Execute a complete network scan with reporting and notifications"""
-    scanner = NetworkScanner()
-    reporter = ReportGenerator()
-    emailer = EmailNotifier()
+    from src.emailer import EmailNotifier
+    from src.metrics import ScanMetrics
+    from src.pipeline import ScanPipeline
+    from src.reporter import ReportGenerator
+    from src.scanner import NetworkScanner
+    from src.trends import TrendStore
+    
+    metrics = ScanMetrics()
+    scanner = NetworkScanner(metrics)
+    reporter = ReportGenerator(metrics)
+    emailer = EmailNotifier(metrics)
+    if metrics_server:
+        metrics_server.publish(metrics)
     
-    # Perform scan
+    # Scan, store, summarize and render as overlapping stages, then email
     print("Starting network vulnerability scan...")
-    results = scanner.scan_all_networks()
+    outcome = ScanPipeline(scanner, reporter, emailer, metrics=metrics, trends=TrendStore()).run(profile=profile)
+    
+    if metrics_file:
+        metrics.write_prometheus(metrics_file)
+    
+    if ARCHIVE_ENABLED:
+        archive_reports(outcome)
+    
+    print(f"Scan complete. Results saved to: {outcome['results_file']}")
+    print(f"HTML report: {outcome['html_report']}")
+    if profile:
+        print_profile(outcome['results']['scan_metadata']['profile'])
+
+def print_profile(profile):
+    """Print the per-phase timing breakdown of a profiled scan"""
+    print(f"\nTiming breakdown ({profile['elapsed_seconds']:.1f}s total, "
+          f"{profile['hosts_per_second']:.2f} hosts/s, {profile['probes_per_second']:.1f} probes/s):")
+    phases = sorted(profile['phases'].items(), key=lambda item: item[1]['total_seconds'], reverse=True)
+    for name, stats in phases:
+        print(f"  {name:30} {stats['total_seconds']:9.3f}s  x{stats['count']:<6} max {stats['max_seconds']:.3f}s")
+
+def generate_report_from_file(results_file):
+    """Regenerate the summary, HTML and text reports from saved scan results"""
+    from src.archiver import ScanArchiver
+    from src.report_regenerator import ReportRegenerator
+    from src.trends import TrendStore
+    
+    if not os.path.exists(results_file):
+        archived = ScanArchiver().results_path(results_file)
+        if archived is None:
+            print(f"No scan results file or archived run named {results_file}")
+            sys.exit(1)
+        results_file = archived
+    
+    outcome = ReportRegenerator(trends=TrendStore()).regenerate(results_file)
+    
+    print(outcome['text_summary'])
+    print(f"HTML report: {outcome['html_report']}")
+    print(f"Network sections: {outcome['cache_hits']} cached, {outcome['cache_misses']} rendered")
+
+def archive_reports(outcome=None):
+    """Archive the latest scan and older leftovers, then apply retention"""
+    from src.archiver import ScanArchiver
+    
+    archiver = ScanArchiver()
+    if outcome:
+        run_id = archiver.run_id_for(outcome['results']['scan_metadata'])
+        archiver.archive_run(run_id, [outcome['results_file'], outcome['ndjson_file'], outcome['html_report']])
+    archiver.archive_directory()
+    archiver.apply_retention()
+    archiver.prune_current()
     
-    # Save raw results
-    results_file = scanner.save_results()
+    usage = archiver.usage()
+    print(f"Archive: {usage['runs']} runs, {usage['objects']} objects, "
+          f"{usage['stored_bytes'] / 1024:.0f} KiB stored for {usage['original_bytes'] / 1024:.0f} KiB of reports")
+
+def show_trends(network=None, weeks=TREND_REPORT_WEEKS):
+    """Print weekly trends read from the rollup tables"""
+    from src.trends import TrendStore
     
-    # Generate reports
-    summary = reporter.generate_summary_report(results)
-    html_report = reporter.generate_html_report(results, summary)
-    text_summary = reporter.generate_text_summary(summary)
+    trends = TrendStore()
+    rows = trends.weekly(network, weeks)
+    if not rows:
+        print("No trend data yet" + (f" for {network}" if network else ""))
+        return
     
-    # Send email notification
-    subject = f"Network Scan Complete - {summary['high_risk_findings']} High Risk Issues Found"
-    emailer.send_report(subject, text_summary, html_report)
+    print(f"{'Week':10} {'Scans':>5} {'Hosts':>8} {'Open':>8} {'High':>7} {'Medium':>7} {'New':>5} {'Gone':>5}")
+    for row in rows:
+        print(f"{row['week']:10} {row['runs']:5} {row['hosts']:8.1f} {row['open_ports']:8.1f} "
+              f"{row['findings']['HIGH']:7.1f} {row['findings']['MEDIUM']:7.1f} {row['new_hosts']:5} {row['gone_hosts']:5}")
     
-    print(f"Scan complete. Results saved to: {results_file}")
-    print(f"HTML report: {html_report}")
+    exposure = trends.high_risk_exposure(network)
+    if exposure['mean_days_open_when_closed'] is not None:
+        print(f"\nHigh risk ports stayed open {exposure['mean_days_open_when_closed']:.1f} days on average "
+              f"({exposure['closed']} closed)")
+    if exposure['still_open']:
+        print(f"High risk ports still open: {exposure['still_open']}, "
+              f"for {exposure['mean_days_open_so_far']:.1f} days on average")
 
-def start_scheduler():
+def start_scheduler(scan_function=run_scan):
     """Start the scan scheduler"""
-    scheduler = ScanScheduler(run_scan)
+    from src.scheduler import ScanScheduler
+    
+    scheduler = ScanScheduler(scan_function)
     scheduler.start_scheduler()
     
     print("Scheduler started. Press Ctrl+C to stop.")
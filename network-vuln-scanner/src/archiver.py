@@ -0,0 +1,296 @@
+import gzip
+import hashlib
+import json
+import logging
+import os
+import re
+import shutil
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional
+from config.settings import *
+
+# Timestamp embedded in scan_results_<ts>.json/.ndjson and network_scan_report_<ts>.html
+ARTIFACT_PATTERN = re.compile(r'_(\d{8}_\d{6})\.(json|ndjson|html)$')
+RUN_ID_FORMAT = "%Y%m%d_%H%M%S"
+CHUNK_SIZE = 1024 * 1024
+
+class ScanArchiver:
+    """Compressed, content-addressed archive of scan results and reports.
+
+    Every artifact is gzip-compressed into objects/<sha256[:2]>/ under the
+    SHA-256 of its uncompressed content, so identical files are stored once.
+    index.json maps each run id to its artifacts; retention drops runs by
+    age (all recent runs, then one per day, then one per week) and deletes
+    objects no remaining run refers to.
+    """
+
+    def __init__(self, archive_dir: str = ARCHIVE_DIR, report_dir: str = REPORT_DIR):
+        self.logger = logging.getLogger(__name__)
+        self.archive_dir = archive_dir
+        self.report_dir = report_dir
+        self.objects_dir = os.path.join(archive_dir, 'objects')
+        self.index_file = os.path.join(archive_dir, 'index.json')
+        self.index = self._load_index()
+
+    def _load_index(self) -> Dict:
+        """Load the archive index, starting empty if unavailable"""
+        if not os.path.exists(self.index_file):
+            return {'runs': {}}
+        try:
+            with open(self.index_file, 'r') as f:
+                index = json.load(f)
+        except (OSError, ValueError) as e:
+            self.logger.warning(f"Ignoring unreadable archive index {self.index_file}: {str(e)}")
+            return {'runs': {}}
+        index.setdefault('runs', {})
+        return index
+
+    def save(self):
+        """Persist the archive index"""
+        os.makedirs(self.archive_dir, exist_ok=True)
+        tmp_file = f"{self.index_file}.tmp"
+        with open(tmp_file, 'w') as f:
+            json.dump(self.index, f, indent=2, sort_keys=True)
+        os.replace(tmp_file, self.index_file)
+
+    @staticmethod
+    def run_id_for(scan_metadata: Dict) -> str:
+        """Run id of a scan, derived from its start time"""
+        start_time = scan_metadata.get('start_time')
+        started = datetime.fromisoformat(start_time) if start_time else datetime.now()
+        return started.strftime(RUN_ID_FORMAT)
+
+    def _object_path(self, digest: str, name: str) -> str:
+        # The original extension is kept so readers can tell .json from .ndjson
+        extension = os.path.splitext(name)[1]
+        return os.path.join(self.objects_dir, digest[:2], f"{digest}{extension}.gz")
+
+    def _file_digest(self, path: str) -> str:
+        sha = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(CHUNK_SIZE), b''):
+                sha.update(chunk)
+        return sha.hexdigest()
+
+    def _store(self, path: str) -> Dict:
+        """Compress one file into the object store unless its content is already there"""
+        name = os.path.basename(path)
+        digest = self._file_digest(path)
+        object_path = self._object_path(digest, name)
+        if not os.path.exists(object_path):
+            os.makedirs(os.path.dirname(object_path), exist_ok=True)
+            tmp_path = f"{object_path}.tmp"
+            with open(path, 'rb') as src, open(tmp_path, 'wb') as raw:
+                # mtime=0 keeps the compressed bytes reproducible
+                with gzip.GzipFile(filename='', mode='wb', fileobj=raw, mtime=0) as dst:
+                    shutil.copyfileobj(src, dst, CHUNK_SIZE)
+            os.replace(tmp_path, object_path)
+        return {
+            'sha256': digest,
+            'object': os.path.relpath(object_path, self.archive_dir),
+            'size': os.path.getsize(path),
+            'stored_size': os.path.getsize(object_path),
+            'source': path
+        }
+
+    def archive_run(self, run_id: str, files: Iterable[str], run_time: Optional[datetime] = None) -> Dict:
+        """Add the artifacts of one run to the archive"""
+        run = self.index['runs'].setdefault(run_id, {
+            'time': (run_time or datetime.strptime(run_id, RUN_ID_FORMAT)).isoformat(),
+            'artifacts': {}
+        })
+        for path in files:
+            if not path or not os.path.exists(path):
+                continue
+            try:
+                run['artifacts'][os.path.basename(path)] = self._store(path)
+            except OSError as e:
+                self.logger.error(f"Failed to archive {path}: {str(e)}")
+        self.save()
+        self.logger.info(f"Archived run {run_id} ({len(run['artifacts'])} artifacts)")
+        return run
+
+    def archive_directory(self) -> List[str]:
+        """Archive result and report files in the report directory that are not archived yet
+
+        Each artifact's name carries the time it was written, not the time
+        its run started, so runs are taken from the scan start time stored
+        in the results files. A report joins the run of the latest results
+        file written before it; files without either fall back to their
+        own timestamp.
+        """
+        if not os.path.isdir(self.report_dir):
+            return []
+        archived = self._archived_sources()
+        results, reports = [], []
+        for name in sorted(os.listdir(self.report_dir)):
+            match = ARTIFACT_PATTERN.search(name)
+            path = os.path.join(self.report_dir, name)
+            if match and path not in archived:
+                (reports if match.group(2) == 'html' else results).append((match.group(1), path))
+
+        runs = {}
+        # (timestamp in the file name, run id) of every results file, archived or not
+        anchors = self._archived_results()
+        for stamp, path in results:
+            run_id = self._results_run_id(path) or stamp
+            runs.setdefault(run_id, []).append(path)
+            anchors.append((stamp, run_id))
+        for stamp, path in reports:
+            earlier = [anchor for anchor in anchors if anchor[0] <= stamp]
+            run_id = max(earlier)[1] if earlier else stamp
+            runs.setdefault(run_id, []).append(path)
+
+        for run_id in sorted(runs):
+            self.archive_run(run_id, runs[run_id])
+        return sorted(runs)
+
+    def _results_run_id(self, path: str) -> Optional[str]:
+        """Run id from the scan metadata inside a results file, if it has a start time"""
+        scan_metadata = {}
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                if path.endswith('.ndjson'):
+                    # The metadata record comes last; skip parsing host records
+                    for line in f:
+                        if '"metadata"' in line:
+                            record = json.loads(line)
+                            if record.get('type') == 'metadata':
+                                scan_metadata = record.get('scan_metadata', {})
+                else:
+                    scan_metadata = json.load(f).get('scan_metadata', {})
+        except (OSError, ValueError) as e:
+            self.logger.warning(f"Could not read scan metadata from {path}: {str(e)}")
+            return None
+        if not scan_metadata.get('start_time'):
+            return None
+        try:
+            return self.run_id_for(scan_metadata)
+        except ValueError:
+            return None
+
+    def _archived_results(self) -> List[tuple]:
+        anchors = []
+        for run_id, run in self.index['runs'].items():
+            for name in run['artifacts']:
+                match = ARTIFACT_PATTERN.search(name)
+                if match and match.group(2) != 'html':
+                    anchors.append((match.group(1), run_id))
+        return anchors
+
+    def _archived_sources(self) -> set:
+        return {
+            artifact['source']
+            for run in self.index['runs'].values()
+            for artifact in run['artifacts'].values()
+        }
+
+    def apply_retention(self, now: Optional[datetime] = None) -> List[str]:
+        """Drop runs outside the retention policy and delete unreferenced objects"""
+        now = now or datetime.now()
+        keep_all = timedelta(days=ARCHIVE_KEEP_ALL_DAYS)
+        keep_daily = timedelta(days=ARCHIVE_KEEP_DAILY_DAYS)
+        keep_weekly = timedelta(weeks=ARCHIVE_KEEP_WEEKLY_WEEKS)
+
+        days_kept, weeks_kept, removed = set(), set(), []
+        # Newest first, so the run kept for a day or week is its latest one
+        for run_id, run in sorted(self.index['runs'].items(), key=lambda item: item[1]['time'], reverse=True):
+            run_time = datetime.fromisoformat(run['time'])
+            age = now - run_time
+            day = run_time.date()
+            week = run_time.isocalendar()[:2]
+            if age <= keep_all:
+                keep = True
+            elif age <= keep_daily:
+                keep = day not in days_kept
+            elif age <= keep_weekly:
+                keep = week not in weeks_kept
+            else:
+                keep = False
+            if keep:
+                days_kept.add(day)
+                weeks_kept.add(week)
+            else:
+                removed.append(run_id)
+
+        for run_id in removed:
+            del self.index['runs'][run_id]
+        if removed:
+            self.save()
+            self.logger.info(f"Retention removed {len(removed)} archived runs")
+        self._collect_garbage()
+        return removed
+
+    def _collect_garbage(self):
+        """Delete objects that no archived run refers to"""
+        referenced = {
+            os.path.join(self.archive_dir, artifact['object'])
+            for run in self.index['runs'].values()
+            for artifact in run['artifacts'].values()
+        }
+        if not os.path.isdir(self.objects_dir):
+            return
+        for prefix in os.listdir(self.objects_dir):
+            prefix_dir = os.path.join(self.objects_dir, prefix)
+            for name in os.listdir(prefix_dir):
+                path = os.path.join(prefix_dir, name)
+                if path not in referenced:
+                    os.remove(path)
+            if not os.listdir(prefix_dir):
+                os.rmdir(prefix_dir)
+
+    def prune_current(self, keep_runs: int = ARCHIVE_KEEP_CURRENT_RUNS) -> List[str]:
+        """Remove archived files from the report directory, except those of the newest runs"""
+        runs = sorted(self.index['runs'].values(), key=lambda run: run['time'], reverse=True)
+        kept = {artifact['source'] for run in runs[:keep_runs] for artifact in run['artifacts'].values()}
+        removed = []
+        for run in runs[keep_runs:]:
+            for artifact in run['artifacts'].values():
+                source = artifact['source']
+                if source not in kept and os.path.exists(source):
+                    os.remove(source)
+                    removed.append(source)
+        return removed
+
+    def list_runs(self) -> List[str]:
+        """Archived run ids, oldest first"""
+        return sorted(self.index['runs'], key=lambda run_id: self.index['runs'][run_id]['time'])
+
+    def artifact_path(self, run_id: str, name: str) -> Optional[str]:
+        """Path of the compressed object holding an artifact of a run"""
+        artifact = self.index['runs'].get(run_id, {}).get('artifacts', {}).get(name)
+        if artifact is None:
+            return None
+        return os.path.join(self.archive_dir, artifact['object'])
+
+    def results_path(self, run_id: str) -> Optional[str]:
+        """Compressed scan results of a run, preferring the NDJSON stream"""
+        artifacts = self.index['runs'].get(run_id, {}).get('artifacts', {})
+        for extension in ('.ndjson', '.json'):
+            for name in sorted(artifacts):
+                if name.startswith('scan_results_') and name.endswith(extension):
+                    return self.artifact_path(run_id, name)
+        return None
+
+    def read_artifact(self, run_id: str, name: str) -> bytes:
+        """Uncompressed content of an archived artifact"""
+        path = self.artifact_path(run_id, name)
+        if path is None:
+            raise KeyError(f"No artifact {name} in archived run {run_id}")
+        with gzip.open(path, 'rb') as f:
+            return f.read()
+
+    def usage(self) -> Dict:
+        """Original and stored sizes of the archive"""
+        objects = {}
+        original = 0
+        for run in self.index['runs'].values():
+            for artifact in run['artifacts'].values():
+                original += artifact['size']
+                objects[artifact['object']] = artifact['stored_size']
+        return {
+            'runs': len(self.index['runs']),
+            'objects': len(objects),
+            'original_bytes': original,
+            'stored_bytes': sum(objects.values())
+        }
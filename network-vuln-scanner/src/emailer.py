@@ -1,16 +1,14 @@
-import smtplib
 import logging
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
-from email.mime.base import MIMEBase
-from email import encoders
+from datetime import datetime
 from typing import List, Optional
 from config.email_config import *
-from config.settings import EMAIL_RECIPIENTS, EMAIL_SUBJECT_PREFIX
+from config.settings import EMAIL_ENABLED, EMAIL_RECIPIENTS, EMAIL_SUBJECT_PREFIX
+from src.metrics import ScanMetrics
 
 class EmailNotifier:
-    def __init__(self):
+    def __init__(self, metrics: Optional[ScanMetrics] = None):
         self.logger = logging.getLogger(__name__)
+        self.metrics = metrics or ScanMetrics()
         
     def send_report(self, 
                    subject: str, 
@@ -26,6 +24,11 @@ class EmailNotifier:
         if recipients is None:
             recipients = EMAIL_RECIPIENTS
             
+        # Deferred so importing the notifier stays cheap for report-only runs
+        import smtplib
+        from email.mime.multipart import MIMEMultipart
+        from email.mime.text import MIMEText
+        
         try:
             # Create message
             msg = MIMEMultipart('alternative')
@@ -42,11 +45,13 @@ class EmailNotifier:
                 self._attach_file(msg, html_report_path)
             
             # Send email
-            with smtplib.SMTP(SMTP_SERVER, SMTP_PORT) as server:
-                if SMTP_USE_TLS:
-                    server.starttls()
-                server.login(EMAIL_USER, EMAIL_PASSWORD)
-                server.send_message(msg)
+            with self.metrics.phase('smtp'):
+                with smtplib.SMTP(SMTP_SERVER, SMTP_PORT, timeout=EMAIL_TIMEOUT) as server:
+                    if SMTP_USE_TLS:
+                        server.starttls()
+                    server.login(EMAIL_USER, EMAIL_PASSWORD)
+                    server.send_message(msg)
+            self.metrics.increment('emails_sent')
             
             self.logger.info(f"Email sent successfully to {', '.join(recipients)}")
             return True
@@ -55,8 +60,11 @@ class EmailNotifier:
             self.logger.error(f"Failed to send email: {str(e)}")
             return False
     
-    def _attach_file(self, msg: MIMEMultipart, file_path: str):
+    def _attach_file(self, msg: 'MIMEMultipart', file_path: str):
         """Attach file to email message"""
+        from email import encoders
+        from email.mime.base import MIMEBase
+        
         try:
             # Check file size
             file_size = os.path.getsize(file_path)
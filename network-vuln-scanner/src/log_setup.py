@@ -0,0 +1,22 @@
+import logging
+import os
+import sys
+from config.settings import LOG_BACKUP_COUNT, LOG_DIR, LOG_FORMAT, LOG_MAX_BYTES
+
+# The queue-based logging setup is shared with the other tools in the repository
+SHARED_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), 'shared')
+if SHARED_DIR not in sys.path:
+    sys.path.append(SHARED_DIR)
+
+import queue_logging
+
+def configure_logging(level=logging.INFO) -> bool:
+    """Log to the console and a rotated logs/scanner.log once per process; later calls change nothing"""
+    return queue_logging.configure(
+        log_file=os.path.join(LOG_DIR, "scanner.log"),
+        level=level,
+        json_format=LOG_FORMAT == "json",
+        fmt='%(asctime)s - %(levelname)s - %(message)s',
+        max_bytes=LOG_MAX_BYTES,
+        backup_count=LOG_BACKUP_COUNT
+    )
@@ -0,0 +1,205 @@
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+def _label_value(value: str) -> str:
+    """Escape a label value for the Prometheus text format"""
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+class ScanMetrics:
+    """Thread-safe timers, counters and gauges for one scan run.
+
+    Phases are named timers (discovery, port_scan, dns, render, smtp, ...);
+    timings can also be attributed to a host. Counters count events such as
+    hosts and probes, gauges track current and peak values such as queue depths.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.started = time.monotonic()
+        self.finished = None
+        self.phases = {}
+        self.counters = {}
+        self.gauges = {}
+        self.host_timings = {}
+
+    @contextmanager
+    def phase(self, name: str, host: Optional[str] = None):
+        """Time a block of code as one occurrence of a phase"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record_phase(name, time.perf_counter() - start, host)
+
+    def record_phase(self, name: str, seconds: float, host: Optional[str] = None):
+        """Add one timed occurrence of a phase, optionally attributed to a host"""
+        with self._lock:
+            stats = self.phases.get(name)
+            if stats is None:
+                stats = self.phases[name] = {'count': 0, 'total_seconds': 0.0, 'max_seconds': 0.0}
+            stats['count'] += 1
+            stats['total_seconds'] += seconds
+            if seconds > stats['max_seconds']:
+                stats['max_seconds'] = seconds
+            if host is not None:
+                timings = self.host_timings.setdefault(host, {})
+                timings[name] = timings.get(name, 0.0) + seconds
+
+    def increment(self, name: str, amount: int = 1):
+        """Increase a counter"""
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def set_gauge(self, name: str, value: float):
+        """Set a gauge, keeping track of its peak value"""
+        with self._lock:
+            gauge = self.gauges.get(name)
+            if gauge is None:
+                gauge = self.gauges[name] = {'current': value, 'max': value}
+            gauge['current'] = value
+            if value > gauge['max']:
+                gauge['max'] = value
+
+    def finish(self):
+        """Mark the end of the run used for rate calculations"""
+        self.finished = time.monotonic()
+
+    def elapsed(self) -> float:
+        end = self.finished if self.finished is not None else time.monotonic()
+        return end - self.started
+
+    def rates(self) -> Dict[str, float]:
+        """Hosts and probes per second over the run so far"""
+        elapsed = self.elapsed() or 1e-9
+        return {
+            'hosts_per_second': self.counters.get('hosts_scanned', 0) / elapsed,
+            'probes_per_second': self.counters.get('probes', 0) / elapsed
+        }
+
+    def to_dict(self, slowest_hosts: int = 20) -> Dict:
+        """Timing breakdown suitable for the scan metadata"""
+        with self._lock:
+            phases = {
+                name: dict(stats, mean_seconds=stats['total_seconds'] / stats['count'])
+                for name, stats in self.phases.items()
+            }
+            host_totals = sorted(
+                ((host, sum(timings.values()), timings) for host, timings in self.host_timings.items()),
+                key=lambda item: item[1],
+                reverse=True
+            )
+            breakdown = {
+                'elapsed_seconds': self.elapsed(),
+                'phases': phases,
+                'counters': dict(self.counters),
+                'gauges': {name: dict(gauge) for name, gauge in self.gauges.items()},
+                'hosts_timed': len(host_totals),
+                'slowest_hosts': [
+                    {'host': host, 'total_seconds': total, 'phases': dict(timings)}
+                    for host, total, timings in host_totals[:slowest_hosts]
+                ]
+            }
+        breakdown.update(self.rates())
+        return breakdown
+
+    def to_prometheus(self, prefix: str = 'vulnscan') -> str:
+        """Render all metrics in the Prometheus text exposition format"""
+        lines = []
+
+        def family(name: str, kind: str, help_text: str):
+            lines.append(f"# HELP {prefix}_{name} {help_text}")
+            lines.append(f"# TYPE {prefix}_{name} {kind}")
+
+        with self._lock:
+            phases = {name: dict(stats) for name, stats in self.phases.items()}
+            counters = dict(self.counters)
+            gauges = {name: dict(gauge) for name, gauge in self.gauges.items()}
+
+        family('phase_seconds_total', 'counter', 'Total time spent per scan phase.')
+        for name, stats in sorted(phases.items()):
+            lines.append(f'{prefix}_phase_seconds_total{{phase="{_label_value(name)}"}} {stats["total_seconds"]:.6f}')
+        family('phase_calls_total', 'counter', 'Number of timed occurrences per scan phase.')
+        for name, stats in sorted(phases.items()):
+            lines.append(f'{prefix}_phase_calls_total{{phase="{_label_value(name)}"}} {stats["count"]}')
+        family('phase_max_seconds', 'gauge', 'Longest single occurrence per scan phase.')
+        for name, stats in sorted(phases.items()):
+            lines.append(f'{prefix}_phase_max_seconds{{phase="{_label_value(name)}"}} {stats["max_seconds"]:.6f}')
+
+        for name, value in sorted(counters.items()):
+            family(f'{name}_total', 'counter', f'Count of {name.replace("_", " ")}.')
+            lines.append(f'{prefix}_{name}_total {value}')
+
+        for name, gauge in sorted(gauges.items()):
+            family(name, 'gauge', f'Current {name.replace("_", " ")}.')
+            lines.append(f'{prefix}_{name} {gauge["current"]}')
+            family(f'{name}_max', 'gauge', f'Peak {name.replace("_", " ")}.')
+            lines.append(f'{prefix}_{name}_max {gauge["max"]}')
+
+        for name, value in sorted(self.rates().items()):
+            family(name, 'gauge', f'{name.replace("_", " ").capitalize()} over the last run.')
+            lines.append(f'{prefix}_{name} {value:.6f}')
+        family('elapsed_seconds', 'gauge', 'Duration of the last run.')
+        lines.append(f'{prefix}_elapsed_seconds {self.elapsed():.6f}')
+
+        return '\n'.join(lines) + '\n'
+
+    def write_prometheus(self, path: str):
+        """Write metrics atomically, e.g. for the node_exporter textfile collector"""
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w') as f:
+            f.write(self.to_prometheus())
+        os.replace(tmp_path, path)
+
+class MetricsServer:
+    """Serves the metrics of the latest run on http://<host>:<port>/metrics
+
+    Only this machine can reach it unless another host address is given,
+    since the metrics reveal what is being scanned and when.
+    """
+
+    def __init__(self, port: int, host: str = '127.0.0.1'):
+        from http.server import BaseHTTPRequestHandler, HTTPServer
+        self.logger = logging.getLogger(__name__)
+        self.metrics = ScanMetrics()
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split('?')[0] != '/metrics':
+                    self.send_error(404)
+                    return
+                body = server.metrics.to_prometheus().encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                server.logger.debug(format % args)
+
+        self.httpd = HTTPServer((host, port), Handler)
+        self.thread = threading.Thread(target=self.httpd.serve_forever, name='metrics-server', daemon=True)
+
+    @property
+    def port(self) -> int:
+        return self.httpd.server_address[1]
+
+    def start(self):
+        self.thread.start()
+        self.logger.info(f"Serving metrics on {self.httpd.server_address[0]}:{self.port}")
+
+    def publish(self, metrics: ScanMetrics):
+        """Expose the metrics of a new run"""
+        self.metrics = metrics
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
@@ -0,0 +1,204 @@
+import sys
+from typing import Dict, List, Optional, Union
+from config.settings import HIGH_RISK_PORTS, MEDIUM_RISK_PORTS
+
+def _intern(value):
+    """Share one copy of short repeated strings (states, services, risk levels)"""
+    return sys.intern(value) if isinstance(value, str) else value
+
+class PortRecord:
+    """A single scanned port, stored as slots instead of a six-key dict"""
+    __slots__ = ('port', 'protocol', 'state', 'service', 'version', 'product', 'extrainfo', 'risk_level')
+
+    def __init__(self, port: int, protocol: str, state: str, service: str = 'unknown',
+                 version: str = '', product: str = '', extrainfo: str = '', risk_level: str = 'INFO'):
+        self.port = port
+        self.protocol = _intern(protocol)
+        self.state = _intern(state)
+        self.service = _intern(service)
+        self.version = version
+        self.product = product
+        self.extrainfo = extrainfo
+        self.risk_level = _intern(risk_level)
+
+    @property
+    def key(self) -> str:
+        """Port key as used in the JSON results, e.g. '22/tcp'"""
+        return f"{self.port}/{self.protocol}"
+
+    def to_dict(self) -> Dict:
+        """Convert to the dict stored under host['ports'][key]"""
+        return {
+            'state': self.state,
+            'service': self.service,
+            'version': self.version,
+            'product': self.product,
+            'extrainfo': self.extrainfo,
+            'risk_level': self.risk_level
+        }
+
+    @classmethod
+    def from_dict(cls, key: str, data: Dict) -> 'PortRecord':
+        """Build a record from a port key and its dict"""
+        port, _, protocol = key.partition('/')
+        return cls(
+            int(port), protocol or 'tcp',
+            data.get('state', ''),
+            data.get('service', 'unknown'),
+            data.get('version', ''),
+            data.get('product', ''),
+            data.get('extrainfo', ''),
+            data.get('risk_level', 'INFO')
+        )
+
+    def __eq__(self, other):
+        if not isinstance(other, PortRecord):
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in self.__slots__)
+
+    def __repr__(self):
+        return f"PortRecord({self.key!r}, state={self.state!r}, service={self.service!r}, risk_level={self.risk_level!r})"
+
+class HostRecord:
+    """A scanned host with its ports kept as a list of PortRecord"""
+    __slots__ = ('ip', 'hostname', 'state', 'os_name', 'os_version', 'os_accuracy',
+                 'ports', 'vulnerabilities', 'scan_truncated', 'error')
+
+    def __init__(self, ip: str, hostname: Optional[str] = None, state: str = '',
+                 os_name: str = 'Unknown', os_version: Optional[str] = None, os_accuracy=0,
+                 ports: Optional[List[PortRecord]] = None, vulnerabilities: Optional[List] = None,
+                 scan_truncated: bool = False, error: Optional[str] = None):
+        self.ip = ip
+        self.hostname = hostname if hostname is not None else ip
+        self.state = _intern(state)
+        self.os_name = _intern(os_name)
+        self.os_version = os_version
+        self.os_accuracy = os_accuracy
+        self.ports = ports if ports is not None else []
+        self.vulnerabilities = vulnerabilities if vulnerabilities is not None else []
+        self.scan_truncated = scan_truncated
+        self.error = error
+
+    @classmethod
+    def failed(cls, ip: str, error: str) -> 'HostRecord':
+        """Record a host whose scan raised an error"""
+        return cls(ip, error=error)
+
+    @property
+    def os_info(self) -> Dict:
+        """OS details in the shape of the JSON 'os_info' field"""
+        os_info = {'os': self.os_name}
+        if self.os_version is not None:
+            os_info['version'] = self.os_version
+        os_info['accuracy'] = self.os_accuracy
+        return os_info
+
+    def open_ports(self) -> List[PortRecord]:
+        """Ports whose state is open"""
+        return [port for port in self.ports if port.state == 'open']
+
+    def to_dict(self) -> Dict:
+        """Convert to the dict stored under network['hosts'][ip]"""
+        if self.error is not None:
+            return {'error': self.error}
+        host = {
+            'hostname': self.hostname,
+            'state': self.state,
+            'os_info': self.os_info,
+            'ports': {port.key: port.to_dict() for port in self.ports},
+            'vulnerabilities': self.vulnerabilities
+        }
+        if self.scan_truncated:
+            host['scan_truncated'] = True
+        return host
+
+    @classmethod
+    def from_dict(cls, ip: str, data: Dict) -> 'HostRecord':
+        """Build a record from a host IP and its dict"""
+        if 'error' in data:
+            return cls.failed(ip, data['error'])
+        os_info = data.get('os_info', {})
+        return cls(
+            ip,
+            hostname=data.get('hostname', ip),
+            state=data.get('state', ''),
+            os_name=os_info.get('os', 'Unknown'),
+            os_version=os_info.get('version'),
+            os_accuracy=os_info.get('accuracy', 0),
+            ports=[PortRecord.from_dict(key, port) for key, port in data.get('ports', {}).items()],
+            vulnerabilities=list(data.get('vulnerabilities', [])),
+            scan_truncated=data.get('scan_truncated', False)
+        )
+
+    @classmethod
+    def coerce(cls, ip: str, host: Union['HostRecord', Dict]) -> 'HostRecord':
+        """Accept either a record or a host dict loaded from JSON"""
+        if isinstance(host, HostRecord):
+            return host
+        return cls.from_dict(ip, host)
+
+    def __eq__(self, other):
+        if not isinstance(other, HostRecord):
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in self.__slots__)
+
+    def __repr__(self):
+        return f"HostRecord({self.ip!r}, hostname={self.hostname!r}, ports={len(self.ports)})"
+
+class Finding:
+    """An open port reported in the summary of a host"""
+    __slots__ = ('port', 'service', 'version', 'risk_level')
+
+    def __init__(self, port: str, service: str, version: str, risk_level: str):
+        self.port = port
+        self.service = service
+        self.version = version
+        self.risk_level = risk_level
+
+    @classmethod
+    def from_port(cls, port: PortRecord) -> 'Finding':
+        """Build a finding from an open port"""
+        return cls(port.key, port.service, port.version, port.risk_level)
+
+    def to_dict(self) -> Dict:
+        """Convert to the dict shape used in summary['host_details'][i]['open_ports']"""
+        return {
+            'port': self.port,
+            'service': self.service,
+            'version': self.version,
+            'risk_level': self.risk_level
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'Finding':
+        """Build a finding from its summary dict"""
+        return cls(data['port'], data['service'], data['version'], data['risk_level'])
+
+    def __eq__(self, other):
+        if not isinstance(other, Finding):
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in self.__slots__)
+
+    def __repr__(self):
+        return f"Finding({self.port!r}, {self.service!r}, risk_level={self.risk_level!r})"
+
+def assess_risk_level(port: int, state: str) -> str:
+    """Risk level of a port under the configured risk rules"""
+    if port in HIGH_RISK_PORTS:
+        return "HIGH"
+    elif port in MEDIUM_RISK_PORTS:
+        return "MEDIUM"
+    elif state == 'open':
+        return "LOW"
+    else:
+        return "INFO"
+
+def risk_rules() -> Dict:
+    """The rules applied by assess_risk_level, e.g. to fingerprint cached reports"""
+    return {'HIGH': sorted(HIGH_RISK_PORTS), 'MEDIUM': sorted(MEDIUM_RISK_PORTS)}
+
+def json_default(obj):
+    """json.dump hook that serializes records in the original dict shape"""
+    if isinstance(obj, (PortRecord, HostRecord, Finding)):
+        return obj.to_dict()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
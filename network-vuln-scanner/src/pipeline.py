@@ -0,0 +1,200 @@
+import json
+import logging
+import queue
+import threading
+from datetime import datetime
+from typing import Callable, Dict, List
+from config.settings import *
+from src.metrics import ScanMetrics
+from src.models import json_default
+
+_DONE = object()
+
+class _Stage(threading.Thread):
+    """Worker thread that feeds every queued item to a handler.
+
+    If the handler fails the stage keeps draining its queue so upstream
+    stages never block on a full queue; the error is re-raised by raise_error().
+    """
+
+    def __init__(self, name: str, inbox: queue.Queue, handler: Callable):
+        super().__init__(name=name, daemon=True)
+        self.inbox = inbox
+        self.handler = handler
+        self.error = None
+
+    def run(self):
+        while True:
+            item = self.inbox.get()
+            if item is _DONE:
+                break
+            if self.error is not None:
+                continue
+            try:
+                self.handler(item)
+            except Exception as e:
+                self.error = e
+
+    def raise_error(self):
+        if self.error is not None:
+            raise self.error
+
+class ScanPipeline:
+    """Runs scan, storage/aggregation, section rendering and notification as overlapping stages.
+
+    The scanner pushes each host record into a bounded queue as soon as it is
+    scanned. The storage stage appends it to an NDJSON results file and folds
+    it into the summary; when a network completes its report section is handed
+    to the render stage. Once the last host is scanned only the report layout
+    and the email are left to do, while the full JSON is written in parallel.
+    """
+
+    def __init__(self, scanner, reporter, emailer, queue_size: int = PIPELINE_QUEUE_SIZE,
+                 metrics: ScanMetrics = None, networks: List[str] = None, trends=None):
+        self.logger = logging.getLogger(__name__)
+        self.networks = networks
+        self.trends = trends
+        self.metrics = metrics or ScanMetrics()
+        self.scanner = scanner
+        self.reporter = reporter
+        self.emailer = emailer
+        self.host_queue = queue.Queue(maxsize=queue_size)
+        self.render_queue = queue.Queue(maxsize=queue_size)
+        self.summary = reporter.new_summary()
+        self.sections = {}
+        self._network_summaries = {}
+        self._ndjson_file = None
+        self.ndjson_path = None
+        self.results_file = None
+
+    def run(self, profile: bool = False) -> Dict:
+        """Run a full scan through the pipeline and return the run outcome
+        
+        With profile=True the timing breakdown is stored in the scan metadata
+        under 'profile'; results are then saved after the email so the
+        breakdown covers every stage.
+        """
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        os.makedirs(REPORT_DIR, exist_ok=True)
+        self.ndjson_path = os.path.join(REPORT_DIR, f"scan_results_{timestamp}.ndjson")
+        self._ndjson_file = open(self.ndjson_path, 'w')
+
+        storage = _Stage('scan-storage', self.host_queue, self._store_and_aggregate)
+        render = _Stage('scan-render', self.render_queue, self._render_section)
+        storage.start()
+        render.start()
+
+        try:
+            with self.metrics.phase('scan'):
+                results = self.scanner.scan_all_networks(
+                    on_host=lambda network, ip, host: self._put(self.host_queue, ('host', network, ip, host)),
+                    on_network=lambda network, data: self._put(self.host_queue, ('network', network, data)),
+                    networks=self.networks
+                )
+            self.host_queue.put(('metadata', None, results.get('scan_metadata', {})))
+        finally:
+            with self.metrics.phase('pipeline_drain'):
+                self.host_queue.put(_DONE)
+                storage.join()
+                self.render_queue.put(_DONE)
+                render.join()
+            self._ndjson_file.close()
+        # The full JSON file is written while the report is assembled and
+        # mailed, and also when a stage or the report fails
+        save_thread = threading.Thread(target=self._save_results, name='scan-save', daemon=True)
+        if not profile:
+            save_thread.start()
+        try:
+            storage.raise_error()
+            render.raise_error()
+
+            self.summary['scan_info'] = results.get('scan_metadata', {})
+            summary = self.reporter.finalize_summary(self.summary)
+            sections = [self.sections[network] for network in results.get('results', {}) if network in self.sections]
+            html_report = self.reporter.generate_html_report_from_sections(summary, sections, self._update_trends(results))
+            text_summary = self.reporter.generate_text_summary(summary)
+
+            subject = f"Network Scan Complete - {summary['high_risk_findings']} High Risk Issues Found"
+            self.emailer.send_report(subject, text_summary, html_report)
+
+            self.metrics.finish()
+            if profile:
+                results.setdefault('scan_metadata', {})['profile'] = self.metrics.to_dict()
+        finally:
+            if save_thread.ident is None:
+                save_thread.start()
+            save_thread.join()
+        return {
+            'results': results,
+            'summary': summary,
+            'results_file': self.results_file,
+            'ndjson_file': self.ndjson_path,
+            'html_report': html_report
+        }
+
+    def _update_trends(self, results: Dict):
+        """Fold the run into the trend rollups and return the trend report data"""
+        if self.trends is None:
+            return None
+        try:
+            with self.metrics.phase('trends'):
+                self.trends.record_run(results)
+                self.trends.save()
+                return self.trends.report()
+        except Exception as e:
+            self.logger.error(f"Failed to update trend rollups: {str(e)}")
+            return None
+
+    def _put(self, stage_queue: queue.Queue, item):
+        stage_queue.put(item)
+        self.metrics.set_gauge('host_queue_depth', self.host_queue.qsize())
+        self.metrics.set_gauge('render_queue_depth', self.render_queue.qsize())
+
+    def _save_results(self):
+        try:
+            self.results_file = self.scanner.save_results()
+        except Exception as e:
+            self.logger.error(f"Failed to save scan results: {str(e)}")
+
+    def _write_ndjson(self, record: Dict):
+        self._ndjson_file.write(json.dumps(record, default=json_default))
+        self._ndjson_file.write('\n')
+
+    def _store_and_aggregate(self, item):
+        """Storage/aggregation stage: persist hosts and build per-network summaries"""
+        kind, network = item[0], item[1]
+        if kind == 'metadata':
+            self._write_ndjson({'type': 'metadata', 'scan_metadata': item[2]})
+            return
+
+        partial = self._network_summaries.get(network)
+        if partial is None:
+            partial = {'summary': self.reporter.new_summary(), 'hosts': []}
+            self._network_summaries[network] = partial
+
+        if kind == 'host':
+            ip, host = item[2], item[3]
+            self._write_ndjson({'type': 'host', 'network': network, 'ip': ip, 'host': host})
+            host_summary = self.reporter.add_host_to_summary(partial['summary'], ip, host)
+            if host_summary is not None:
+                partial['hosts'].append(host_summary)
+        else:
+            network_data = item[2]
+            self._write_ndjson({
+                'type': 'network',
+                'network': network,
+                'scan_time': network_data.get('scan_time'),
+                'network_range': network_data.get('network_range', network),
+                'total_hosts_scanned': network_data.get('total_hosts_scanned', 0)
+            })
+            self._ndjson_file.flush()
+            self.reporter.add_network_to_summary(partial['summary'], network_data)
+            self.reporter.merge_summary(self.summary, partial['summary'])
+            del self._network_summaries[network]
+            self._put(self.render_queue, (network, network_data, partial['hosts']))
+
+    def _render_section(self, item):
+        """Render stage: render a network's report section as soon as it completes"""
+        network, network_data, host_summaries = item
+        self.sections[network] = self.reporter.render_network_section(network, network_data, host_summaries)
+        self.logger.info(f"Rendered report section for {network}")
@@ -0,0 +1,133 @@
+import json
+import os
+import logging
+from typing import Dict, Iterable, List, Optional
+from config.settings import *
+
+class PortPrioritizer:
+    """Orders ports by how often they were found open in past scans.
+
+    Open/probed counts are kept per subnet, per device class (OS family)
+    and globally. Counts decay by PORT_HISTORY_DECAY on every run so the
+    ordering follows changes in the network instead of freezing on the
+    first scans. The device class of each host decays the same way, so
+    hosts that are no longer seen are forgotten.
+    """
+
+    def __init__(self, history_file: str = PORT_HISTORY_FILE):
+        self.logger = logging.getLogger(__name__)
+        self.history_file = history_file
+        self.history = self._load_history()
+
+    def _load_history(self) -> Dict:
+        """Load port history from disk, starting empty if unavailable"""
+        empty = {'subnets': {}, 'device_classes': {}, 'global': {}, 'host_classes': {}}
+        if not os.path.exists(self.history_file):
+            return empty
+        try:
+            with open(self.history_file, 'r') as f:
+                history = json.load(f)
+        except (OSError, ValueError) as e:
+            self.logger.warning(f"Ignoring unreadable port history {self.history_file}: {str(e)}")
+            return empty
+        for key, value in empty.items():
+            history.setdefault(key, value)
+        # Older files kept the bare device class of each host
+        for host, entry in history['host_classes'].items():
+            if isinstance(entry, str):
+                history['host_classes'][host] = {'class': entry, 'weight': 1.0}
+        return history
+
+    def save(self):
+        """Persist the port history"""
+        directory = os.path.dirname(self.history_file)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self.history_file}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(self.history, f)
+        os.replace(tmp_path, self.history_file)
+
+    def begin_run(self):
+        """Decay existing counts so recent runs weigh more than old ones"""
+        scopes = [self.history['global']]
+        scopes.extend(self.history['subnets'].values())
+        scopes.extend(self.history['device_classes'].values())
+        for scope in scopes:
+            for counts in (scope.get('open', {}), scope.get('probed', {})):
+                for port in list(counts):
+                    counts[port] *= PORT_HISTORY_DECAY
+                    if counts[port] < 0.01:
+                        del counts[port]
+        host_classes = self.history['host_classes']
+        for host in list(host_classes):
+            host_classes[host]['weight'] *= PORT_HISTORY_DECAY
+            if host_classes[host]['weight'] < 0.01:
+                del host_classes[host]
+
+    def device_class_for(self, host: str) -> Optional[str]:
+        """Return the device class last seen for a host, if any"""
+        entry = self.history['host_classes'].get(host)
+        return entry['class'] if entry else None
+
+    def record_host(self, network: str, host: str, device_class: Optional[str],
+                    probed_ports: Iterable[int], open_ports: Iterable[int]):
+        """Record which of the probed ports were found open on a host"""
+        probed = [str(port) for port in probed_ports]
+        opened = [str(port) for port in open_ports]
+
+        scopes = [
+            self.history['global'],
+            self.history['subnets'].setdefault(network, {}),
+        ]
+        if device_class and device_class != 'Unknown':
+            scopes.append(self.history['device_classes'].setdefault(device_class, {}))
+            self.history['host_classes'][host] = {'class': device_class, 'weight': 1.0}
+
+        for scope in scopes:
+            probed_counts = scope.setdefault('probed', {})
+            open_counts = scope.setdefault('open', {})
+            for port in probed:
+                probed_counts[port] = probed_counts.get(port, 0) + 1
+            for port in opened:
+                open_counts[port] = open_counts.get(port, 0) + 1
+
+    def _open_rate(self, scope: Dict, port: str, prior: float) -> float:
+        """Estimate the open probability of a port, shrunk towards a prior"""
+        probed = scope.get('probed', {}).get(port, 0)
+        opened = scope.get('open', {}).get(port, 0)
+        weight = PORT_HISTORY_PRIOR_WEIGHT
+        return (opened + weight * prior) / (probed + weight)
+
+    def score_port(self, port: int, network: Optional[str] = None,
+                   device_class: Optional[str] = None) -> float:
+        """Estimate how likely a port is to be open for a subnet and device class"""
+        key = str(port)
+        base_prior = 0.05 if port in COMMON_PORTS else 0.01
+        global_rate = self._open_rate(self.history['global'], key, base_prior)
+
+        estimates = []
+        subnet = self.history['subnets'].get(network)
+        if subnet:
+            estimates.append(self._open_rate(subnet, key, global_rate))
+        device = self.history['device_classes'].get(device_class)
+        if device:
+            estimates.append(self._open_rate(device, key, global_rate))
+
+        if not estimates:
+            return global_rate
+        return sum(estimates) / len(estimates)
+
+    def order_ports(self, ports: List[int], network: Optional[str] = None,
+                    device_class: Optional[str] = None) -> List[int]:
+        """Return ports ordered from most to least likely to be open"""
+        common_rank = {port: index for index, port in enumerate(COMMON_PORTS)}
+        fallback = len(common_rank)
+        return sorted(
+            ports,
+            key=lambda port: (
+                -self.score_port(port, network, device_class),
+                common_rank.get(port, fallback),
+                port
+            )
+        )
@@ -0,0 +1,303 @@
+import gzip
+import hashlib
+import json
+import logging
+import os
+import time
+from typing import Dict, Iterator, Optional, Tuple
+from config.settings import *
+from src.models import Finding, HostRecord, assess_risk_level, json_default, risk_rules
+from src.reporter import ReportGenerator, default_templates
+
+# Bump when the cached entry layout changes so old entries are ignored
+CACHE_FORMAT = 1
+# Characters read at a time from JSON results; doubled while a value does not fit
+JSON_READ_SIZE = 1 << 16
+
+class _JsonObjectReader:
+    """Reads the members of a JSON object from a file one value at a time
+
+    Only the value being decoded is held in memory, so the networks of a
+    large results file can be processed one after the other.
+    """
+
+    def __init__(self, f):
+        self.f = f
+        self.decoder = json.JSONDecoder()
+        self.buffer = ''
+        self.position = 0
+        self.eof = False
+
+    def _fill(self, size: int):
+        chunk = self.f.read(size)
+        self.eof = not chunk
+        self.buffer = self.buffer[self.position:] + chunk
+        self.position = 0
+
+    def _skip_space(self):
+        while True:
+            while self.position < len(self.buffer) and self.buffer[self.position] in ' \t\r\n':
+                self.position += 1
+            if self.position < len(self.buffer) or self.eof:
+                return
+            self._fill(JSON_READ_SIZE)
+
+    def _expect(self, characters: str) -> str:
+        self._skip_space()
+        if self.position >= len(self.buffer) or self.buffer[self.position] not in characters:
+            raise ValueError(f"Malformed JSON results: expected one of {characters!r}")
+        self.position += 1
+        return self.buffer[self.position - 1]
+
+    def value(self):
+        """Decode the next value"""
+        self._skip_space()
+        size = JSON_READ_SIZE
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.position)
+                # A number may continue past the end of the buffer
+                if end < len(self.buffer) or self.eof:
+                    self.position = end
+                    return value
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+            self._fill(size)
+            size *= 2
+
+    def members(self) -> Iterator[str]:
+        """Yield the key of each member of the next object; the caller reads its value before resuming"""
+        self._expect('{')
+        self._skip_space()
+        if self.buffer.startswith('}', self.position):
+            self.position += 1
+            return
+        while True:
+            key = self.value()
+            self._expect(':')
+            yield key
+            if self._expect(',}') == '}':
+                return
+
+class ReportRegenerator:
+    """Rebuilds the summary, HTML and text reports from saved scan results.
+
+    Accepts the full JSON results, the NDJSON stream written by the scan
+    pipeline, or gzip-compressed copies of either. Both are read one network
+    at a time, so only one network is held in memory. Each network's partial
+    summary and rendered section are cached under a hash of its data, the
+    section template and the risk rules; networks whose inputs did not
+    change are not re-aggregated or re-rendered. After each run the cache
+    is trimmed to the REPORT_CACHE_MAX_ENTRIES most recently used entries
+    and those used within REPORT_CACHE_MAX_AGE_DAYS.
+    """
+
+    def __init__(self, reporter: Optional[ReportGenerator] = None,
+                 cache_dir: Optional[str] = REPORT_CACHE_DIR, trends=None):
+        self.logger = logging.getLogger(__name__)
+        self.reporter = reporter or ReportGenerator()
+        self.trends = trends
+        self.metrics = self.reporter.metrics
+        self.cache_dir = cache_dir
+        self._rules_digest = self._rules_fingerprint()
+
+    def regenerate(self, results_file: str) -> Dict:
+        """Regenerate the reports of one saved scan"""
+        summary = self.reporter.new_summary()
+        sections = []
+        scan_metadata = {}
+
+        with self.metrics.phase('regenerate'):
+            for network, network_data, data_digest in self._read_networks(results_file, scan_metadata):
+                partial, section = self._network_report(network, network_data, data_digest)
+                self.reporter.merge_summary(summary, partial)
+                sections.append(section)
+
+            summary['scan_info'] = scan_metadata
+            summary = self.reporter.finalize_summary(summary)
+            trend_report = self.trends.report() if self.trends is not None else None
+            html_report = self.reporter.generate_html_report_from_sections(summary, sections, trend_report)
+            text_summary = self.reporter.generate_text_summary(summary)
+        self.prune_cache()
+
+        return {
+            'summary': summary,
+            'html_report': html_report,
+            'text_summary': text_summary,
+            'cache_hits': self.metrics.counters.get('section_cache_hits', 0),
+            'cache_misses': self.metrics.counters.get('section_cache_misses', 0)
+        }
+
+    def _rules_fingerprint(self) -> str:
+        """Hash of everything besides the scan data that shapes a network section"""
+        from jinja2 import TemplateNotFound
+        try:
+            template_source = self.reporter.env.loader.get_source(
+                self.reporter.env, 'network_section_template.html')[0]
+        except TemplateNotFound:
+            # Installs predating the template render with the built-in one
+            template_source = default_templates()['network_section_template.html']
+        rules = json.dumps({
+            'format': CACHE_FORMAT,
+            'risk_rules': risk_rules(),
+            'template': template_source
+        }, sort_keys=True)
+        return hashlib.sha256(rules.encode('utf-8')).hexdigest()
+
+    def _open(self, results_file: str):
+        if results_file.endswith('.gz'):
+            return gzip.open(results_file, 'rt', encoding='utf-8')
+        return open(results_file, 'r', encoding='utf-8')
+
+    def _read_networks(self, results_file: str, scan_metadata: Dict) -> Iterator[Tuple[str, Dict, str]]:
+        """Yield (network, network_data, data_digest) for every network in a results file"""
+        name = results_file[:-3] if results_file.endswith('.gz') else results_file
+        with self._open(results_file) as f:
+            if name.endswith('.ndjson'):
+                yield from self._read_ndjson(f, scan_metadata)
+            else:
+                yield from self._read_json(f, scan_metadata)
+
+    def _read_json(self, f, scan_metadata: Dict) -> Iterator[Tuple[str, Dict, str]]:
+        reader = _JsonObjectReader(f)
+        for key in reader.members():
+            if key != 'results':
+                with self.metrics.phase('load_results'):
+                    value = reader.value()
+                if key == 'scan_metadata':
+                    scan_metadata.update(value)
+                continue
+            for network in reader.members():
+                with self.metrics.phase('load_results'):
+                    network_data = reader.value()
+                encoded = json.dumps(network_data, sort_keys=True, default=json_default)
+                yield network, network_data, hashlib.sha256(encoded.encode('utf-8')).hexdigest()
+
+    def _read_ndjson(self, f, scan_metadata: Dict) -> Iterator[Tuple[str, Dict, str]]:
+        hosts = {}
+        digests = {}
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            record = json.loads(line)
+            kind = record.get('type')
+            if kind == 'host':
+                network = record['network']
+                hosts.setdefault(network, {})[record['ip']] = record['host']
+                digests.setdefault(network, hashlib.sha256()).update(line.encode('utf-8'))
+            elif kind == 'network':
+                network = record['network']
+                digest = digests.pop(network, None) or hashlib.sha256()
+                digest.update(line.encode('utf-8'))
+                network_data = {
+                    'scan_time': record.get('scan_time'),
+                    'network_range': record.get('network_range', network),
+                    'total_hosts_scanned': record.get('total_hosts_scanned', 0),
+                    'hosts': hosts.pop(network, {})
+                }
+                yield network, network_data, digest.hexdigest()
+            elif kind == 'metadata':
+                scan_metadata.update(record.get('scan_metadata', {}))
+
+        # Hosts of a network that never completed, e.g. an interrupted scan
+        for network, network_hosts in hosts.items():
+            self.logger.warning(f"Network {network} is incomplete in the results file")
+            network_data = {
+                'scan_time': None,
+                'network_range': network,
+                'total_hosts_scanned': len(network_hosts),
+                'hosts': network_hosts
+            }
+            yield network, network_data, digests[network].hexdigest()
+
+    def _network_report(self, network: str, network_data: Dict, data_digest: str) -> Tuple[Dict, str]:
+        """Partial summary and rendered section of one network, from the cache when possible"""
+        key = hashlib.sha256(f"{self._rules_digest}:{network}:{data_digest}".encode('utf-8')).hexdigest()
+        cached = self._load_cached(key)
+        if cached is not None:
+            self.metrics.increment('section_cache_hits')
+            return cached
+        self.metrics.increment('section_cache_misses')
+
+        partial = self.reporter.new_summary()
+        host_summaries = []
+        self.reporter.add_network_to_summary(partial, network_data)
+        for host_ip, host_data in network_data.get('hosts', {}).items():
+            host = HostRecord.coerce(host_ip, host_data)
+            # Risk levels follow the current rules, not those of the original scan
+            for port in host.ports:
+                port.risk_level = assess_risk_level(port.port, port.state)
+            host_summary = self.reporter.add_host_to_summary(partial, host_ip, host)
+            if host_summary is not None:
+                host_summaries.append(host_summary)
+        section = self.reporter.render_network_section(network, network_data, host_summaries)
+
+        self._store_cached(key, partial, section)
+        return partial, section
+
+    def _cache_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key[:2], f"{key}.json")
+
+    def _load_cached(self, key: str) -> Optional[Tuple[Dict, str]]:
+        if not self.cache_dir:
+            return None
+        path = self._cache_path(key)
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+            # The modification time marks the last use for eviction
+            os.utime(path)
+        except (OSError, ValueError) as e:
+            self.logger.warning(f"Ignoring unreadable report cache entry {path}: {str(e)}")
+            return None
+        partial = entry['summary']
+        for host_summary in partial['host_details']:
+            host_summary['open_ports'] = [Finding.from_dict(finding) for finding in host_summary['open_ports']]
+        return partial, entry['section']
+
+    def _store_cached(self, key: str, partial: Dict, section: str):
+        if not self.cache_dir:
+            return
+        path = self._cache_path(key)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({'summary': partial, 'section': section}, f, default=json_default)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            self.logger.warning(f"Could not write report cache entry {path}: {str(e)}")
+
+    def prune_cache(self, max_entries: int = REPORT_CACHE_MAX_ENTRIES,
+                    max_age_days: float = REPORT_CACHE_MAX_AGE_DAYS) -> int:
+        """Evict cache entries unused for max_age_days and the least recently used beyond max_entries"""
+        if not self.cache_dir or not os.path.isdir(self.cache_dir):
+            return 0
+        entries = []
+        for directory, _, filenames in os.walk(self.cache_dir):
+            for filename in filenames:
+                path = os.path.join(directory, filename)
+                try:
+                    entries.append((os.path.getmtime(path), path))
+                except OSError:
+                    continue
+        entries.sort(reverse=True)
+
+        cutoff = time.time() - max_age_days * 86400
+        evicted = 0
+        for index, (used, path) in enumerate(entries):
+            if index < max_entries and used >= cutoff:
+                continue
+            try:
+                os.remove(path)
+                evicted += 1
+            except OSError as e:
+                self.logger.warning(f"Could not evict report cache entry {path}: {str(e)}")
+        if evicted:
+            self.logger.info(f"Evicted {evicted} report cache entries")
+        self.metrics.increment('section_cache_evictions', evicted)
+        return evicted
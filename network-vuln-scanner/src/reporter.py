@@ -1,18 +1,41 @@
 import json
+import logging
 import os
 from datetime import datetime
-from jinja2 import Template, FileSystemLoader, Environment
-from typing import Dict, List
+from typing import Dict, List, Optional
 from config.settings import *
+from src.metrics import ScanMetrics
+from src.models import Finding, HostRecord
 
 class ReportGenerator:
-    def __init__(self):
+    def __init__(self, metrics: Optional[ScanMetrics] = None):
+        from jinja2 import FileSystemLoader, Environment
         self.env = Environment(loader=FileSystemLoader(TEMPLATE_DIR))
+        self.metrics = metrics or ScanMetrics()
+        self.logger = logging.getLogger(__name__)
+    
+    def get_template(self, name: str):
+        """Load a template, creating it from the built-in default if the install predates it"""
+        from jinja2 import TemplateNotFound
+        try:
+            return self.env.get_template(name)
+        except TemplateNotFound:
+            content = default_templates().get(name)
+            if content is None:
+                raise
+        self.logger.info(f"Template {name} is missing, creating it from the built-in default")
+        try:
+            os.makedirs(TEMPLATE_DIR, exist_ok=True)
+            with open(os.path.join(TEMPLATE_DIR, name), 'w') as f:
+                f.write(content)
+        except OSError as e:
+            self.logger.warning(f"Could not write template {name}: {str(e)}")
+        return self.env.from_string(content)
         
-    def generate_summary_report(self, scan_results: Dict) -> Dict:
-        """Generate a summary report from scan results"""
-        summary = {
-            'scan_info': scan_results.get('scan_metadata', {}),
+    def new_summary(self, scan_info: Dict = None) -> Dict:
+        """Create an empty summary to aggregate hosts into"""
+        return {
+            'scan_info': scan_info or {},
             'total_networks': 0,
             'total_hosts': 0,
             'total_open_ports': 0,
@@ -24,68 +47,124 @@ class ReportGenerator:
             'top_services': {},
             'host_details': []
         }
-        
-        for network, network_data in scan_results.get('results', {}).items():
-            summary['total_networks'] += 1
-            summary['total_hosts'] += network_data.get('total_hosts_scanned', 0)
+    
+    def add_host_to_summary(self, summary: Dict, host_ip: str, host_data) -> Optional[Dict]:
+        """Aggregate one scanned host into the summary, returning its host summary"""
+        host = HostRecord.coerce(host_ip, host_data)
+        if host.error is not None:
+            return None
             
-            for host_ip, host_data in network_data.get('hosts', {}).items():
-                if 'error' in host_data:
-                    continue
-                    
-                host_summary = {
-                    'ip': host_ip,
-                    'hostname': host_data.get('hostname', host_ip),
-                    'os': host_data.get('os_info', {}).get('os', 'Unknown'),
-                    'open_ports': [],
-                    'risk_score': 0
-                }
+        host_summary = {
+            'ip': host.ip,
+            'hostname': host.hostname,
+            'os': host.os_name,
+            'open_ports': [],
+            'risk_score': 0
+        }
+        
+        for port in host.ports:
+            if port.state == 'open':
+                summary['total_open_ports'] += 1
+                
+                service = port.service
+                summary['top_services'][service] = summary['top_services'].get(service, 0) + 1
                 
-                for port_key, port_info in host_data.get('ports', {}).items():
-                    if port_info.get('state') == 'open':
-                        summary['total_open_ports'] += 1
-                        
-                        service = port_info.get('service', 'unknown')
-                        summary['top_services'][service] = summary['top_services'].get(service, 0) + 1
-                        
-                        risk_level = port_info.get('risk_level', 'INFO')
-                        summary['risk_breakdown'][risk_level] += 1
-                        
-                        if risk_level == 'HIGH':
-                            summary['high_risk_findings'] += 1
-                            host_summary['risk_score'] += 3
-                        elif risk_level == 'MEDIUM':
-                            summary['medium_risk_findings'] += 1
-                            host_summary['risk_score'] += 2
-                        elif risk_level == 'LOW':
-                            host_summary['risk_score'] += 1
-                        
-                        host_summary['open_ports'].append({
-                            'port': port_key,
-                            'service': service,
-                            'version': port_info.get('version', ''),
-                            'risk_level': risk_level
-                        })
+                risk_level = port.risk_level
+                summary['risk_breakdown'][risk_level] += 1
                 
-                summary['host_details'].append(host_summary)
+                if risk_level == 'HIGH':
+                    summary['high_risk_findings'] += 1
+                    host_summary['risk_score'] += 3
+                elif risk_level == 'MEDIUM':
+                    summary['medium_risk_findings'] += 1
+                    host_summary['risk_score'] += 2
+                elif risk_level == 'LOW':
+                    host_summary['risk_score'] += 1
+                
+                host_summary['open_ports'].append(Finding.from_port(port))
         
-        # Sort hosts by risk score
+        summary['host_details'].append(host_summary)
+        return host_summary
+    
+    def add_network_to_summary(self, summary: Dict, network_data: Dict):
+        """Count a completed network in the summary"""
+        summary['total_networks'] += 1
+        summary['total_hosts'] += network_data.get('total_hosts_scanned', 0)
+    
+    def merge_summary(self, summary: Dict, partial: Dict):
+        """Fold a partial (e.g. per-network) summary into summary"""
+        for key in ('total_networks', 'total_hosts', 'total_open_ports',
+                    'high_risk_findings', 'medium_risk_findings'):
+            summary[key] += partial[key]
+        for key in ('new_hosts', 'new_ports', 'host_details'):
+            summary[key].extend(partial[key])
+        for level, count in partial['risk_breakdown'].items():
+            summary['risk_breakdown'][level] = summary['risk_breakdown'].get(level, 0) + count
+        for service, count in partial['top_services'].items():
+            summary['top_services'][service] = summary['top_services'].get(service, 0) + count
+    
+    def finalize_summary(self, summary: Dict) -> Dict:
+        """Sort hosts by risk score once every host has been added"""
         summary['host_details'].sort(key=lambda x: x['risk_score'], reverse=True)
-        
         return summary
     
+    def generate_summary_report(self, scan_results: Dict) -> Dict:
+        """Generate a summary report from scan results"""
+        with self.metrics.phase('summary'):
+            summary = self.new_summary(scan_results.get('scan_metadata', {}))
+            
+            for network, network_data in scan_results.get('results', {}).items():
+                self.add_network_to_summary(summary, network_data)
+                
+                for host_ip, host_data in network_data.get('hosts', {}).items():
+                    self.add_host_to_summary(summary, host_ip, host_data)
+            
+            return self.finalize_summary(summary)
+    
     def generate_html_report(self, scan_results: Dict, summary: Dict) -> str:
         """Generate HTML report"""
-        template = self.env.get_template('report_template.html')
+        with self.metrics.phase('render_report'):
+            template = self.get_template('report_template.html')
+            
+            html_content = template.render(
+                scan_results=scan_results,
+                summary=summary,
+                generation_time=datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            )
         
-        html_content = template.render(
-            scan_results=scan_results,
-            summary=summary,
-            generation_time=datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        )
+        return self._write_report(html_content)
+    
+    def render_network_section(self, network: str, network_data: Dict, host_summaries: List[Dict]) -> str:
+        """Render the report section of one network as soon as it has been scanned"""
+        with self.metrics.phase('render_section'):
+            template = self.get_template('network_section_template.html')
+            
+            return template.render(
+                network=network,
+                network_data=network_data,
+                hosts=sorted(host_summaries, key=lambda x: x['risk_score'], reverse=True)
+            )
+    
+    def generate_html_report_from_sections(self, summary: Dict, sections: List[str],
+                                           trends: Optional[Dict] = None) -> str:
+        """Generate HTML report from pre-rendered per-network sections and optional trend rollups"""
+        with self.metrics.phase('render_report'):
+            template = self.get_template('report_layout_template.html')
+            
+            html_content = template.render(
+                summary=summary,
+                sections=sections,
+                trends=trends,
+                generation_time=datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            )
         
+        return self._write_report(html_content)
+    
+    def _write_report(self, html_content: str) -> str:
+        """Write rendered HTML to a timestamped report file"""
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         report_filename = f"network_scan_report_{timestamp}.html"
+        os.makedirs(REPORT_DIR, exist_ok=True)
         report_path = os.path.join(REPORT_DIR, report_filename)
         
         with open(report_path, 'w', encoding='utf-8') as f:
@@ -116,13 +195,12 @@ TOP VULNERABLE HOSTS:
         for i, host in enumerate(summary['host_details'][:5]):  # Top 5 hosts
             text_summary += f"{i+1}. {host['hostname']} ({host['ip']}) - Risk Score: {host['risk_score']}\n"
             for port in host['open_ports'][:3]:  # Top 3 ports per host
-                text_summary += f"   - {port['port']}: {port['service']} ({port['risk_level']})\n"
+                text_summary += f"   - {port.port}: {port.service} ({port.risk_level})\n"
         
         return text_summary
 
-# Create report template
-def create_report_template():
-    """Create the HTML report template"""
+def default_templates() -> Dict[str, str]:
+    """Built-in HTML report templates by file name"""
     template_content = """
 <!DOCTYPE html>
 <html>
@@ -187,6 +265,100 @@ def create_report_template():
 </html>
 """
     
+    # Per-network section, rendered while later networks are still being scanned
+    section_content = """
+<div class="network-section">
+    <h2>Network {{ network }}</h2>
+    <p><strong>Hosts Scanned:</strong> {{ network_data.total_hosts_scanned }} ({{ network_data.scan_time }})</p>
+    {% for host in hosts %}
+    <div class="host-section">
+        <h3>{{ host.hostname }} ({{ host.ip }})</h3>
+        <p><strong>OS:</strong> {{ host.os }}</p>
+        <p><strong>Risk Score:</strong> {{ host.risk_score }}</p>
+        
+        {% if host.open_ports %}
+        <table>
+            <tr>
+                <th>Port</th>
+                <th>Service</th>
+                <th>Version</th>
+                <th>Risk Level</th>
+            </tr>
+            {% for port in host.open_ports %}
+            <tr>
+                <td>{{ port.port }}</td>
+                <td>{{ port.service }}</td>
+                <td>{{ port.version }}</td>
+                <td class="risk-{{ port.risk_level.lower() }}">{{ port.risk_level }}</td>
+            </tr>
+            {% endfor %}
+        </table>
+        {% endif %}
+    </div>
+    {% endfor %}
+</div>
+"""
+    
+    # Trends read from the rollup tables, shown above the findings
+    trend_content = """    {% if trends and trends.weeks %}
+    <div class="summary">
+        <h2>Trends</h2>
+        <table>
+            <tr>
+                <th>Week</th>
+                <th>Scans</th>
+                <th>Hosts</th>
+                <th>Open Ports</th>
+                <th>High</th>
+                <th>Medium</th>
+                <th>New Hosts</th>
+                <th>Gone Hosts</th>
+            </tr>
+            {% for week in trends.weeks %}
+            <tr>
+                <td>{{ week.week }}</td>
+                <td>{{ week.runs }}</td>
+                <td>{{ "%.1f"|format(week.hosts) }}</td>
+                <td>{{ "%.1f"|format(week.open_ports) }}</td>
+                <td class="risk-high">{{ "%.1f"|format(week.findings.HIGH) }}</td>
+                <td class="risk-medium">{{ "%.1f"|format(week.findings.MEDIUM) }}</td>
+                <td>{{ week.new_hosts }}</td>
+                <td>{{ week.gone_hosts }}</td>
+            </tr>
+            {% endfor %}
+        </table>
+        {% set exposure = trends.high_risk_exposure %}
+        {% if exposure.mean_days_open_when_closed is not none %}
+        <p><strong>High risk ports stayed open for:</strong> {{ "%.1f"|format(exposure.mean_days_open_when_closed) }} days on average ({{ exposure.closed }} closed)</p>
+        {% endif %}
+        {% if exposure.still_open %}
+        <p><strong>High risk ports still open:</strong> {{ exposure.still_open }}, for {{ "%.1f"|format(exposure.mean_days_open_so_far) }} days on average</p>
+        {% endif %}
+    </div>
+    {% endif %}
+    
+"""
+    
+    # Report layout that stitches the pre-rendered network sections together
+    head, _, _ = template_content.partition('    <h2>Detailed Findings</h2>')
+    layout_content = head + trend_content + """    <h2>Detailed Findings</h2>
+    {% for section in sections %}
+    {{ section }}
+    {% endfor %}
+</body>
+</html>
+"""
+    
+    return {
+        'report_template.html': template_content,
+        'network_section_template.html': section_content,
+        'report_layout_template.html': layout_content
+    }
+
+# Create report template
+def create_report_template():
+    """Create the HTML report templates"""
     os.makedirs(TEMPLATE_DIR, exist_ok=True)
-    with open(os.path.join(TEMPLATE_DIR, 'report_template.html'), 'w') as f:
-        f.write(template_content)
\ No newline at end of file
+    for filename, content in default_templates().items():
+        with open(os.path.join(TEMPLATE_DIR, filename), 'w') as f:
+            f.write(content)
\ No newline at end of file
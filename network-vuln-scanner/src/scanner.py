@@ -1,33 +1,35 @@
-import nmap
 import json
 import logging
-import psutil
 import socket
+import time
 from datetime import datetime
-from typing import Dict, List, Optional
+from typing import Callable, Dict, List, Optional
 from config.settings import *
+from src.log_setup import configure_logging
+from src.metrics import ScanMetrics
+from src.models import HostRecord, PortRecord, assess_risk_level, json_default
+from src.port_prioritizer import PortPrioritizer
 
 class NetworkScanner:
-    def __init__(self):
-        self.nm = nmap.PortScanner()
+    def __init__(self, metrics: Optional[ScanMetrics] = None, port_scanner=None):
+        # port_scanner lets benchmarks and tests replay recorded nmap output
+        if port_scanner is None:
+            import nmap
+            port_scanner = nmap.PortScanner()
+        self.nm = port_scanner
         self.logger = self._setup_logging()
         self.scan_results = {}
+        self.prioritizer = PortPrioritizer()
+        self.metrics = metrics or ScanMetrics()
         
     def _setup_logging(self) -> logging.Logger:
-        """Setup logging configuration"""
-        os.makedirs(LOG_DIR, exist_ok=True)
-        logging.basicConfig(
-            level=logging.INFO,
-            format='%(asctime)s - %(levelname)s - %(message)s',
-            handlers=[
-                logging.FileHandler(f"{LOG_DIR}/scanner.log"),
-                logging.StreamHandler()
-            ]
-        )
+        """Setup logging configuration once per process"""
+        configure_logging()
         return logging.getLogger(__name__)
     
     def discover_local_networks(self) -> List[str]:
         """Automatically discover local network ranges"""
+        import psutil
         networks = []
         for interface, addrs in psutil.net_if_addrs().items():
             for addr in addrs:
@@ -39,19 +41,22 @@ class NetworkScanner:
                         networks.append(network)
         return networks
     
-    def scan_network_range(self, network_range: str, ports: List[int] = None) -> Dict:
-        """Scan a network range for live hosts and open ports"""
+    def scan_network_range(self, network_range: str, ports: List[int] = None,
+                           on_host: Optional[Callable[[str, str, HostRecord], None]] = None) -> Dict:
+        """Scan a network range for live hosts and open ports
+        
+        on_host(network_range, ip, host_record) is called as soon as each host is scanned.
+        """
         self.logger.info(f"Starting scan of network range: {network_range}")
         
         if ports is None:
             ports = COMMON_PORTS
-            
-        port_string = ','.join(map(str, ports))
         
         try:
             # Host discovery scan
             self.logger.info("Performing host discovery...")
-            self.nm.scan(hosts=network_range, arguments='-sn')
+            with self.metrics.phase('discovery'):
+                self.nm.scan(hosts=network_range, arguments='-sn')
             live_hosts = list(self.nm.all_hosts())
             
             self.logger.info(f"Found {len(live_hosts)} live hosts")
@@ -63,11 +68,15 @@ class NetworkScanner:
                 'hosts': {}
             }
             
-            # Port scan on live hosts
+            # Port scan on live hosts, most likely open ports first
             for host in live_hosts:
                 self.logger.info(f"Scanning ports on {host}")
-                host_results = self._scan_host_ports(host, port_string)
+                device_class = self.prioritizer.device_class_for(host)
+                host_ports = self.prioritizer.order_ports(ports, network_range, device_class)
+                host_results = self._scan_host_ports(host, host_ports, network_range)
                 scan_results['hosts'][host] = host_results
+                if on_host:
+                    on_host(network_range, host, host_results)
                 
             return scan_results
             
@@ -75,43 +84,89 @@ class NetworkScanner:
             self.logger.error(f"Error scanning network {network_range}: {str(e)}")
             return {}
     
-    def _scan_host_ports(self, host: str, port_string: str) -> Dict:
-        """Scan ports on a specific host"""
+    def _scan_host_ports(self, host: str, ports: List[int], network_range: Optional[str] = None) -> HostRecord:
+        """Scan ports on a specific host, stopping early once the time budget is spent"""
+        if HOST_SCAN_TIME_BUDGET is None:
+            batches = [ports]
+            deadline = None
+        else:
+            batches = [ports[i:i + PORT_BATCH_SIZE] for i in range(0, len(ports), PORT_BATCH_SIZE)]
+            deadline = time.monotonic() + HOST_SCAN_TIME_BUDGET
+        
         try:
-            self.nm.scan(host, port_string, arguments=SCAN_ARGUMENTS)
+            host_info = None
+            probed_ports = []
             
-            host_info = {
-                'hostname': self._get_hostname(host),
-                'state': self.nm[host].state(),
-                'os_info': self._extract_os_info(host),
-                'ports': {},
-                'vulnerabilities': []
-            }
+            for index, batch in enumerate(batches):
+                if host_info is not None and deadline is not None and time.monotonic() >= deadline:
+                    self.logger.info(f"Time budget reached on {host} after {len(probed_ports)} of {len(ports)} ports")
+                    host_info.scan_truncated = True
+                    break
+                
+                # OS detection only needs to run once per host
+                arguments = SCAN_ARGUMENTS if index == 0 else self._without_os_detection(SCAN_ARGUMENTS)
+                phase = 'port_scan_with_os_detection' if '-O' in arguments.split() else 'port_scan'
+                with self.metrics.phase(phase, host):
+                    self.nm.scan(host, ','.join(map(str, batch)), arguments=arguments)
+                probed_ports.extend(batch)
+                self.metrics.increment('probes', len(batch))
+                
+                if host_info is None:
+                    os_info = self._extract_os_info(host)
+                    host_info = HostRecord(
+                        host,
+                        hostname=self._get_hostname(host),
+                        state=self.nm[host].state(),
+                        os_name=os_info['os'],
+                        os_version=os_info.get('version'),
+                        os_accuracy=os_info['accuracy']
+                    )
+                elif host not in self.nm.all_hosts():
+                    continue
+                
+                self._extract_port_info(host, host_info)
             
-            # Extract port information
-            for protocol in self.nm[host].all_protocols():
-                ports = self.nm[host][protocol].keys()
-                for port in ports:
-                    port_info = self.nm[host][protocol][port]
-                    host_info['ports'][f"{port}/{protocol}"] = {
-                        'state': port_info['state'],
-                        'service': port_info.get('name', 'unknown'),
-                        'version': port_info.get('version', ''),
-                        'product': port_info.get('product', ''),
-                        'extrainfo': port_info.get('extrainfo', ''),
-                        'risk_level': self._assess_risk_level(port, port_info)
-                    }
+            open_ports = [port.port for port in host_info.open_ports()]
+            self.metrics.increment('hosts_scanned')
+            self.metrics.increment('open_ports', len(open_ports))
+            self.prioritizer.record_host(
+                network_range, host, host_info.os_name, probed_ports, open_ports
+            )
             
             return host_info
             
         except Exception as e:
             self.logger.error(f"Error scanning host {host}: {str(e)}")
-            return {'error': str(e)}
+            self.metrics.increment('hosts_failed')
+            return HostRecord.failed(host, str(e))
+    
+    def _extract_port_info(self, host: str, host_info: HostRecord):
+        """Add the ports of the last nmap run on a host to host_info"""
+        for protocol in self.nm[host].all_protocols():
+            ports = self.nm[host][protocol].keys()
+            for port in ports:
+                port_info = self.nm[host][protocol][port]
+                host_info.ports.append(PortRecord(
+                    port, protocol,
+                    port_info['state'],
+                    port_info.get('name', 'unknown'),
+                    port_info.get('version', ''),
+                    port_info.get('product', ''),
+                    port_info.get('extrainfo', ''),
+                    self._assess_risk_level(port, port_info)
+                ))
+    
+    def _without_os_detection(self, arguments: str) -> str:
+        """Strip OS detection from nmap arguments"""
+        return ' '.join(arg for arg in arguments.split() if arg != '-O')
     
     def _get_hostname(self, ip: str) -> str:
         """Get hostname for IP address"""
+        if not RESOLVE_HOSTNAMES:
+            return ip
         try:
-            hostname = socket.gethostbyaddr(ip)[0]
+            with self.metrics.phase('dns', ip):
+                hostname = socket.gethostbyaddr(ip)[0]
             return hostname
         except:
             return ip
@@ -122,39 +177,49 @@ class NetworkScanner:
         try:
             if 'osclass' in self.nm[host]:
                 os_classes = self.nm[host]['osclass']
-                if os_classes:
-                    best_match = max(os_classes, key=lambda x: int(x.get('accuracy', 0)))
-                    os_info = {
-                        'os': best_match.get('osfamily', 'Unknown'),
-                        'version': best_match.get('osgen', ''),
-                        'accuracy': best_match.get('accuracy', 0)
-                    }
+            else:
+                # python-nmap >= 0.6 nests OS classes under each OS match
+                os_classes = [
+                    os_class
+                    for os_match in self.nm[host].get('osmatch', [])
+                    for os_class in os_match.get('osclass', [])
+                ]
+            if os_classes:
+                best_match = max(os_classes, key=lambda x: int(x.get('accuracy', 0)))
+                os_info = {
+                    'os': best_match.get('osfamily', 'Unknown'),
+                    'version': best_match.get('osgen', ''),
+                    'accuracy': best_match.get('accuracy', 0)
+                }
         except:
             pass
         return os_info
     
     def _assess_risk_level(self, port: int, port_info: Dict) -> str:
         """Assess risk level based on port and service"""
-        high_risk_ports = [21, 23, 135, 139, 445, 1433, 3389, 5432]
-        medium_risk_ports = [22, 25, 53, 110, 143, 993, 995]
-        
-        if port in high_risk_ports:
-            return "HIGH"
-        elif port in medium_risk_ports:
-            return "MEDIUM"
-        elif port_info.get('state') == 'open':
-            return "LOW"
-        else:
-            return "INFO"
+        return assess_risk_level(port, port_info.get('state'))
     
-    def scan_all_networks(self) -> Dict:
-        """Scan all configured network ranges"""
+    def scan_all_networks(self,
+                          on_host: Optional[Callable[[str, str, HostRecord], None]] = None,
+                          on_network: Optional[Callable[[str, Dict], None]] = None,
+                          networks: Optional[List[str]] = None) -> Dict:
+        """Scan all configured network ranges
+        
+        on_host is passed to scan_network_range; on_network(network, network_results)
+        is called when each network range completes. If networks is given only
+        those ranges are scanned.
+        """
         self.logger.info("Starting comprehensive network scan")
         
-        # Combine configured and discovered networks
-        all_networks = set(NETWORK_RANGES)
-        discovered_networks = self.discover_local_networks()
-        all_networks.update(discovered_networks)
+        if networks is not None:
+            all_networks = list(networks)
+        else:
+            # Combine configured and discovered networks
+            all_networks = set(NETWORK_RANGES)
+            with self.metrics.phase('network_discovery'):
+                discovered_networks = self.discover_local_networks()
+            all_networks.update(discovered_networks)
+        self.prioritizer.begin_run()
         
         comprehensive_results = {
             'scan_metadata': {
@@ -166,13 +231,21 @@ class NetworkScanner:
         }
         
         for network in all_networks:
-            network_results = self.scan_network_range(network)
+            network_results = self.scan_network_range(network, on_host=on_host)
             if network_results:
                 comprehensive_results['results'][network] = network_results
+                self.metrics.increment('networks_scanned')
+                if on_network:
+                    on_network(network, network_results)
         
         comprehensive_results['scan_metadata']['end_time'] = datetime.now().isoformat()
         self.scan_results = comprehensive_results
         
+        try:
+            self.prioritizer.save()
+        except OSError as e:
+            self.logger.warning(f"Failed to save port history: {str(e)}")
+        
         return comprehensive_results
     
     def save_results(self, filename: Optional[str] = None) -> str:
@@ -184,8 +257,9 @@ class NetworkScanner:
         os.makedirs(REPORT_DIR, exist_ok=True)
         filepath = os.path.join(REPORT_DIR, filename)
         
-        with open(filepath, 'w') as f:
-            json.dump(self.scan_results, f, indent=2)
+        with self.metrics.phase('save_results'):
+            with open(filepath, 'w') as f:
+                json.dump(self.scan_results, f, indent=2, default=json_default)
         
         self.logger.info(f"Scan results saved to {filepath}")
         return filepath
\ No newline at end of file
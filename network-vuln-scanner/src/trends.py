@@ -0,0 +1,182 @@
+import json
+import logging
+import os
+from datetime import datetime
+from typing import Dict, List, Optional
+from config.settings import *
+from src.models import HostRecord
+
+RISK_LEVELS = ('HIGH', 'MEDIUM', 'LOW', 'INFO')
+
+def week_key(when: datetime) -> str:
+    """ISO week bucket of a timestamp, e.g. '2024-W05'"""
+    year, week, _ = when.isocalendar()
+    return f"{year}-W{week:02d}"
+
+class TrendStore:
+    """Rollup tables of scan history, updated once per scan.
+
+    Per network and ISO week it keeps sums of hosts, open ports, findings
+    per risk level and host churn. To measure how long HIGH-risk ports stay
+    open it only remembers the HIGH-risk ports open in the last run and
+    the hosts seen in the last run; a host whose scan failed or was cut
+    short keeps what the last run knew about it. Queries read these tables alone, so
+    their cost does not grow with the number of past scans.
+    """
+
+    def __init__(self, trend_file: str = TREND_FILE):
+        self.logger = logging.getLogger(__name__)
+        self.trend_file = trend_file
+        self.rollups = self._load_rollups()
+
+    def _load_rollups(self) -> Dict:
+        """Load the rollup tables from disk, starting empty if unavailable"""
+        empty = {'weeks': {}, 'networks': {}}
+        if not os.path.exists(self.trend_file):
+            return empty
+        try:
+            with open(self.trend_file, 'r') as f:
+                rollups = json.load(f)
+        except (OSError, ValueError) as e:
+            self.logger.warning(f"Ignoring unreadable trend rollups {self.trend_file}: {str(e)}")
+            return empty
+        for key, value in empty.items():
+            rollups.setdefault(key, value)
+        return rollups
+
+    def save(self):
+        """Persist the rollup tables"""
+        directory = os.path.dirname(self.trend_file)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_file = f"{self.trend_file}.tmp"
+        with open(tmp_file, 'w') as f:
+            json.dump(self.rollups, f)
+        os.replace(tmp_file, self.trend_file)
+
+    def record_run(self, scan_results: Dict, run_time: Optional[datetime] = None):
+        """Fold one completed scan into the rollups"""
+        if run_time is None:
+            start_time = scan_results.get('scan_metadata', {}).get('start_time')
+            run_time = datetime.fromisoformat(start_time) if start_time else datetime.now()
+        week = self.rollups['weeks'].setdefault(week_key(run_time), {})
+
+        for network, network_data in scan_results.get('results', {}).items():
+            self._record_network(week, network, network_data, run_time)
+
+        # Keep a bounded number of weekly buckets
+        for key in sorted(self.rollups['weeks'])[:-TREND_MAX_WEEKS]:
+            del self.rollups['weeks'][key]
+
+    def _record_network(self, week: Dict, network: str, network_data: Dict, run_time: datetime):
+        bucket = week.setdefault(network, {
+            'runs': 0, 'hosts': 0, 'open_ports': 0,
+            'findings': {level: 0 for level in RISK_LEVELS},
+            'new_hosts': 0, 'gone_hosts': 0
+        })
+        state = self.rollups['networks'].setdefault(network, {
+            'hosts': None, 'high_open': {}, 'high_closed': 0, 'high_closed_seconds': 0.0
+        })
+
+        previous = set(state['hosts'] or [])
+        hosts = set()
+        high_open = {}
+        # Hosts whose HIGH-risk ports from the last run could not all be checked in this one
+        unchecked = set()
+        open_ports = 0
+        for host_ip, host_data in network_data.get('hosts', {}).items():
+            host = HostRecord.coerce(host_ip, host_data)
+            if host.error is not None:
+                # A failed scan says nothing about the host; keep what the last run knew
+                if host_ip in previous:
+                    hosts.add(host_ip)
+                unchecked.add(host_ip)
+                continue
+            if host.scan_truncated:
+                unchecked.add(host_ip)
+            hosts.add(host_ip)
+            for port in host.open_ports():
+                open_ports += 1
+                bucket['findings'][port.risk_level] = bucket['findings'].get(port.risk_level, 0) + 1
+                if port.risk_level == 'HIGH':
+                    key = f"{host_ip}|{port.key}"
+                    high_open[key] = state['high_open'].get(key, run_time.isoformat())
+
+        # HIGH-risk ports open in the previous run but closed now end their exposure
+        for key, first_seen in state['high_open'].items():
+            if key in high_open:
+                continue
+            if key.split('|', 1)[0] in unchecked:
+                high_open[key] = first_seen
+            else:
+                state['high_closed'] += 1
+                state['high_closed_seconds'] += (run_time - datetime.fromisoformat(first_seen)).total_seconds()
+        state['high_open'] = high_open
+
+        # The first run of a network is its baseline, not churn
+        if state['hosts'] is not None:
+            bucket['new_hosts'] += len(hosts - previous)
+            bucket['gone_hosts'] += len(previous - hosts)
+        state['hosts'] = sorted(hosts)
+        state['last_run'] = run_time.isoformat()
+
+        bucket['runs'] += 1
+        bucket['hosts'] += len(hosts)
+        bucket['open_ports'] += open_ports
+
+    @staticmethod
+    def _select(per_network: Dict, network: Optional[str]) -> List[Dict]:
+        """Entries of one network, or of every network if network is None"""
+        if network is None:
+            return list(per_network.values())
+        return [per_network[network]] if network in per_network else []
+
+    def weekly(self, network: Optional[str] = None, weeks: int = TREND_REPORT_WEEKS) -> List[Dict]:
+        """Per-week averages per run, for one network or all networks combined"""
+        rows = []
+        for key in sorted(self.rollups['weeks'])[-weeks:]:
+            buckets = self.rollups['weeks'][key]
+            selected = self._select(buckets, network)
+            if not selected:
+                continue
+            # Every network is scanned once per run, so the busiest network counts the runs
+            runs = max(bucket['runs'] for bucket in selected)
+            findings = {
+                level: sum(bucket['findings'].get(level, 0) for bucket in selected) / runs
+                for level in RISK_LEVELS
+            }
+            rows.append({
+                'week': key,
+                'runs': runs,
+                'hosts': sum(bucket['hosts'] for bucket in selected) / runs,
+                'open_ports': sum(bucket['open_ports'] for bucket in selected) / runs,
+                'findings': findings,
+                'new_hosts': sum(bucket['new_hosts'] for bucket in selected),
+                'gone_hosts': sum(bucket['gone_hosts'] for bucket in selected)
+            })
+        return rows
+
+    def high_risk_exposure(self, network: Optional[str] = None, now: Optional[datetime] = None) -> Dict:
+        """How long HIGH-risk ports stayed open (closed ones) or have been open (still open)"""
+        now = now or datetime.now()
+        states = self._select(self.rollups['networks'], network)
+        closed = sum(state['high_closed'] for state in states)
+        closed_seconds = sum(state['high_closed_seconds'] for state in states)
+        open_ages = [
+            (now - datetime.fromisoformat(first_seen)).total_seconds()
+            for state in states
+            for first_seen in state['high_open'].values()
+        ]
+        return {
+            'closed': closed,
+            'mean_days_open_when_closed': closed_seconds / closed / 86400 if closed else None,
+            'still_open': len(open_ages),
+            'mean_days_open_so_far': sum(open_ages) / len(open_ages) / 86400 if open_ages else None
+        }
+
+    def report(self, network: Optional[str] = None) -> Dict:
+        """Trend data for the HTML report section and the CLI"""
+        return {
+            'weeks': self.weekly(network),
+            'high_risk_exposure': self.high_risk_exposure(network)
+        }
@@ -0,0 +1,105 @@
+import os
+import gzip
+import shutil
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+
+from src.archiver import ScanArchiver
+
+class TestScanArchiver(unittest.TestCase):
+
+    def setUp(self):
+        self.cwd = os.getcwd()
+        self.workdir = tempfile.mkdtemp()
+        os.chdir(self.workdir)
+        os.makedirs('current')
+        self.archiver = ScanArchiver('archive', 'current')
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        shutil.rmtree(self.workdir, ignore_errors=True)
+
+    def _write_run(self, run_id, report='<html>same</html>'):
+        paths = [os.path.join('current', f'scan_results_{run_id}.ndjson'),
+                 os.path.join('current', f'network_scan_report_{run_id}.html')]
+        with open(paths[0], 'w') as f:
+            f.write(f'{{"type": "metadata", "scan_metadata": {{"run": "{run_id}"}}}}\n')
+        with open(paths[1], 'w') as f:
+            f.write(report)
+        return paths
+
+    def test_identical_artifacts_are_stored_once(self):
+        self.archiver.archive_run('20240101_020000', self._write_run('20240101_020000'))
+        self.archiver.archive_run('20240108_020000', self._write_run('20240108_020000'))
+
+        usage = self.archiver.usage()
+        self.assertEqual(usage['runs'], 2)
+        self.assertEqual(usage['objects'], 3)
+        self.assertEqual(self.archiver.read_artifact('20240108_020000', 'network_scan_report_20240108_020000.html'),
+                         b'<html>same</html>')
+        with gzip.open(self.archiver.results_path('20240101_020000'), 'rt') as f:
+            self.assertIn('20240101_020000', f.read())
+
+    def test_archive_directory_and_prune_current(self):
+        self._write_run('20240101_020000')
+        self._write_run('20240108_020000')
+
+        self.assertEqual(self.archiver.archive_directory(), ['20240101_020000', '20240108_020000'])
+        self.assertEqual(self.archiver.archive_directory(), [])
+        self.archiver.prune_current(keep_runs=1)
+
+        self.assertEqual(sorted(os.listdir('current')),
+                         ['network_scan_report_20240108_020000.html', 'scan_results_20240108_020000.ndjson'])
+        self.assertEqual(ScanArchiver('archive', 'current').list_runs(), ['20240101_020000', '20240108_020000'])
+
+    def test_archive_directory_groups_artifacts_by_scan_start(self):
+        # A pipeline run names each file by the time it was written
+        for start, files in (('2024-01-01T02:00:00', ['scan_results_20240101_020000.ndjson',
+                                                      'network_scan_report_20240101_020512.html',
+                                                      'scan_results_20240101_020513.json']),
+                             ('2024-01-08T02:00:00', ['scan_results_20240108_020001.ndjson',
+                                                      'scan_results_20240108_020420.json',
+                                                      'network_scan_report_20240108_020419.html'])):
+            for name in files:
+                with open(os.path.join('current', name), 'w') as f:
+                    if name.endswith('.ndjson'):
+                        f.write('{"type": "host", "network": "10.1.0.0/24", "ip": "10.1.0.1", "host": {}}\n')
+                        f.write(f'{{"type": "metadata", "scan_metadata": {{"start_time": "{start}"}}}}\n')
+                    elif name.endswith('.json'):
+                        f.write(f'{{"scan_metadata": {{"start_time": "{start}"}}, "results": {{}}}}')
+                    else:
+                        f.write(f'<html>{start}</html>')
+
+        self.assertEqual(self.archiver.archive_directory(), ['20240101_020000', '20240108_020000'])
+
+        runs = self.archiver.index['runs']
+        self.assertEqual(sorted(runs['20240101_020000']['artifacts']),
+                         ['network_scan_report_20240101_020512.html', 'scan_results_20240101_020000.ndjson',
+                          'scan_results_20240101_020513.json'])
+        self.assertEqual(len(runs['20240108_020000']['artifacts']), 3)
+
+    def test_retention_keeps_recent_then_daily_then_weekly(self):
+        now = datetime(2024, 6, 30, 12, 0)
+        runs = [
+            now - timedelta(days=1),
+            now - timedelta(days=1, hours=2),             # recent: both kept
+            now - timedelta(days=30),
+            now - timedelta(days=30, hours=2),            # daily: newest of the day kept
+            now - timedelta(days=200),
+            now - timedelta(days=201),                    # weekly: newest of the week kept
+            now - timedelta(weeks=200)                    # expired
+        ]
+        for index, run_time in enumerate(runs):
+            run_id = run_time.strftime('%Y%m%d_%H%M%S')
+            self.archiver.archive_run(run_id, self._write_run(run_id, f'<html>{index}</html>'))
+
+        removed = self.archiver.apply_retention(now)
+
+        kept = [datetime.strptime(run_id, '%Y%m%d_%H%M%S') for run_id in self.archiver.list_runs()]
+        self.assertEqual(sorted(kept), sorted([runs[0], runs[1], runs[2], runs[4]]))
+        self.assertEqual(len(removed), 3)
+        self.assertEqual(self.archiver.usage()['objects'], 8)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,65 @@
+import unittest
+import urllib.error
+import urllib.request
+from src.metrics import MetricsServer, ScanMetrics
+
+class TestPrometheusExposition(unittest.TestCase):
+
+    def setUp(self):
+        self.metrics = ScanMetrics()
+        self.metrics.record_phase('port_scan', 0.5)
+        self.metrics.record_phase('port_scan', 1.5)
+        self.metrics.record_phase('render "full"\\report\n', 0.25)
+        self.metrics.increment('hosts_scanned', 3)
+        self.metrics.set_gauge('host_queue_depth', 4)
+        self.metrics.set_gauge('host_queue_depth', 1)
+        self.metrics.finish()
+
+    def test_every_sample_follows_its_help_and_type(self):
+        lines = self.metrics.to_prometheus().splitlines()
+
+        families = {}
+        for i, line in enumerate(lines):
+            if line.startswith('# HELP '):
+                name = line.split()[2]
+                self.assertEqual(lines[i + 1].split()[:3], ['#', 'TYPE', name])
+                self.assertIn(lines[i + 1].split()[3], ('counter', 'gauge'))
+                families[name] = lines[i + 1].split()[3]
+            elif not line.startswith('#'):
+                self.assertIn(line.split('{')[0].split()[0], families)
+
+        self.assertEqual(families['vulnscan_hosts_scanned_total'], 'counter')
+        self.assertIn('vulnscan_phase_seconds_total{phase="port_scan"} 2.000000', lines)
+        self.assertIn('vulnscan_phase_calls_total{phase="port_scan"} 2', lines)
+        self.assertIn('vulnscan_host_queue_depth 1', lines)
+        self.assertIn('vulnscan_host_queue_depth_max 4', lines)
+
+    def test_label_values_are_escaped(self):
+        text = self.metrics.to_prometheus()
+
+        self.assertIn('vulnscan_phase_calls_total{phase="render \\"full\\"\\\\report\\n"} 1', text.splitlines())
+
+class TestMetricsServer(unittest.TestCase):
+
+    def setUp(self):
+        self.server = MetricsServer(0)
+        self.server.start()
+        self.addCleanup(self.server.stop)
+
+    def test_serves_published_metrics_on_localhost(self):
+        self.assertEqual(self.server.httpd.server_address[0], '127.0.0.1')
+        metrics = ScanMetrics()
+        metrics.increment('hosts_scanned', 7)
+        self.server.publish(metrics)
+
+        with urllib.request.urlopen(f'http://127.0.0.1:{self.server.port}/metrics', timeout=5) as response:
+            self.assertTrue(response.headers['Content-Type'].startswith('text/plain; version=0.0.4'))
+            body = response.read().decode('utf-8')
+        self.assertIn('vulnscan_hosts_scanned_total 7', body.splitlines())
+
+        with self.assertRaises(urllib.error.HTTPError) as error:
+            urllib.request.urlopen(f'http://127.0.0.1:{self.server.port}/other', timeout=5)
+        self.assertEqual(error.exception.code, 404)
+
+if __name__ == '__main__':
+    unittest.main()
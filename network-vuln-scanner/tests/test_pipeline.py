@@ -0,0 +1,77 @@
+import os
+import sys
+import json
+import shutil
+import tempfile
+import unittest
+from unittest.mock import Mock, patch
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'benchmarks'))
+
+import src.scanner
+from config.settings import TEMPLATE_DIR
+from fake_nmap import FakePortScanner
+from src.metrics import ScanMetrics
+from src.pipeline import ScanPipeline
+from src.reporter import ReportGenerator, create_report_template
+from src.scanner import NetworkScanner
+
+class TestScanPipeline(unittest.TestCase):
+
+    def setUp(self):
+        self.cwd = os.getcwd()
+        self.workdir = tempfile.mkdtemp()
+        os.chdir(self.workdir)
+        self.resolve = src.scanner.RESOLVE_HOSTNAMES
+        src.scanner.RESOLVE_HOSTNAMES = False
+        create_report_template()
+
+    def tearDown(self):
+        src.scanner.RESOLVE_HOSTNAMES = self.resolve
+        os.chdir(self.cwd)
+        shutil.rmtree(self.workdir, ignore_errors=True)
+
+    def make_pipeline(self, reporter=None):
+        metrics = ScanMetrics()
+        scanner = NetworkScanner(metrics, port_scanner=FakePortScanner.synthetic(3, '10.1.0.0/24'))
+        return ScanPipeline(scanner, reporter or ReportGenerator(metrics), Mock(), metrics=metrics,
+                            networks=['10.1.0.0/24'])
+
+    def saved_results(self, pipeline):
+        self.assertIsNotNone(pipeline.results_file)
+        with open(pipeline.results_file) as f:
+            return json.load(f)
+
+    def test_run_saves_results_and_mails_report(self):
+        pipeline = self.make_pipeline()
+
+        outcome = pipeline.run()
+
+        self.assertEqual(len(self.saved_results(pipeline)['results']['10.1.0.0/24']['hosts']), 3)
+        self.assertTrue(os.path.exists(outcome['html_report']))
+        pipeline.emailer.send_report.assert_called_once()
+
+    def test_templates_missing_from_older_installs_are_created(self):
+        # Installs made before per-network sections only have the full report template
+        for name in ('network_section_template.html', 'report_layout_template.html'):
+            os.remove(os.path.join(TEMPLATE_DIR, name))
+
+        outcome = self.make_pipeline().run()
+
+        with open(outcome['html_report']) as f:
+            self.assertIn('Network 10.1.0.0/24', f.read())
+        self.assertTrue(os.path.exists(os.path.join(TEMPLATE_DIR, 'report_layout_template.html')))
+
+    def test_results_are_saved_when_a_stage_fails(self):
+        for profile in (False, True):
+            with self.subTest(profile=profile):
+                reporter = ReportGenerator()
+                pipeline = self.make_pipeline(reporter)
+                with patch.object(reporter, 'render_network_section', side_effect=RuntimeError('template broken')):
+                    with self.assertRaises(RuntimeError):
+                        pipeline.run(profile=profile)
+
+                self.assertEqual(len(self.saved_results(pipeline)['results']['10.1.0.0/24']['hosts']), 3)
+                pipeline.emailer.send_report.assert_not_called()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,83 @@
+import os
+import shutil
+import tempfile
+import unittest
+from config.settings import PORT_HISTORY_DECAY
+from src.port_prioritizer import PortPrioritizer
+
+NETWORK = '10.1.0.0/24'
+
+class TestPortPrioritizer(unittest.TestCase):
+
+    def setUp(self):
+        self.workdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.workdir, ignore_errors=True)
+        self.history_file = os.path.join(self.workdir, 'reports', 'port_history.json')
+        self.prioritizer = PortPrioritizer(self.history_file)
+
+    def scan_hosts(self, count: int, probed, opened, device_class='Linux'):
+        for i in range(count):
+            self.prioritizer.record_host(NETWORK, f'10.1.0.{i + 1}', device_class, probed, opened)
+
+    def test_counts_decay_every_run(self):
+        self.scan_hosts(3, [22, 80], [22])
+
+        self.prioritizer.begin_run()
+
+        subnet = self.prioritizer.history['subnets'][NETWORK]
+        self.assertAlmostEqual(subnet['open']['22'], 3 * PORT_HISTORY_DECAY)
+        self.assertAlmostEqual(subnet['probed']['80'], 3 * PORT_HISTORY_DECAY)
+        self.assertAlmostEqual(self.prioritizer.history['device_classes']['Linux']['open']['22'],
+                               3 * PORT_HISTORY_DECAY)
+
+        # Counts and hosts that have faded away are dropped
+        for _ in range(60):
+            self.prioritizer.begin_run()
+        self.assertEqual(self.prioritizer.history['global']['open'], {})
+        self.assertEqual(self.prioritizer.history['host_classes'], {})
+        self.assertIsNone(self.prioritizer.device_class_for('10.1.0.1'))
+
+    def test_probed_ports_are_ordered_by_history(self):
+        self.scan_hosts(3, [22, 80], [22])
+
+        ordered = self.prioritizer.order_ports([80, 8081, 443, 22, 21], NETWORK)
+
+        # Open before never seen; never seen common ports by COMMON_PORTS order,
+        # then other ports; ports probed and always closed last
+        self.assertEqual(ordered, [22, 21, 443, 8081, 80])
+        self.assertEqual(self.prioritizer.device_class_for('10.1.0.1'), 'Linux')
+
+    def test_history_round_trips_through_the_file(self):
+        self.scan_hosts(2, [3389], [3389], device_class='Windows')
+        self.prioritizer.save()
+
+        loaded = PortPrioritizer(self.history_file)
+
+        self.assertEqual(loaded.history, self.prioritizer.history)
+        self.assertEqual(loaded.order_ports([22, 3389], NETWORK, 'Windows'), [3389, 22])
+
+    def test_host_classes_of_older_files_are_loaded(self):
+        os.makedirs(os.path.dirname(self.history_file))
+        with open(self.history_file, 'w') as f:
+            f.write('{"global": {}, "host_classes": {"10.1.0.9": "Windows"}}')
+
+        loaded = PortPrioritizer(self.history_file)
+
+        self.assertEqual(loaded.device_class_for('10.1.0.9'), 'Windows')
+        loaded.begin_run()
+        self.assertAlmostEqual(loaded.history['host_classes']['10.1.0.9']['weight'], PORT_HISTORY_DECAY)
+
+    def test_missing_or_corrupt_history_starts_empty(self):
+        empty = {'subnets': {}, 'device_classes': {}, 'global': {}, 'host_classes': {}}
+        self.assertEqual(self.prioritizer.history, empty)
+
+        os.makedirs(os.path.dirname(self.history_file))
+        with open(self.history_file, 'w') as f:
+            f.write('{"global": {"open": ')
+        with self.assertLogs('src.port_prioritizer', 'WARNING'):
+            corrupt = PortPrioritizer(self.history_file)
+        self.assertEqual(corrupt.history, empty)
+        self.assertEqual(corrupt.order_ports([8081, 80, 21]), [21, 80, 8081])
+
+if __name__ == '__main__':
+    unittest.main()
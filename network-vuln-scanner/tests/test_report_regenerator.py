@@ -0,0 +1,138 @@
+import gzip
+import os
+import sys
+import json
+import shutil
+import tempfile
+import time
+import unittest
+from unittest.mock import patch
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'benchmarks'))
+
+import src.models
+import src.report_regenerator
+import src.scanner
+from config.settings import TEMPLATE_DIR
+from fake_nmap import FakePortScanner
+from src.metrics import ScanMetrics
+from src.models import json_default
+from src.report_regenerator import ReportRegenerator
+from src.reporter import ReportGenerator, create_report_template
+from src.scanner import NetworkScanner
+
+class TestReportRegenerator(unittest.TestCase):
+
+    def setUp(self):
+        self.cwd = os.getcwd()
+        self.workdir = tempfile.mkdtemp()
+        os.chdir(self.workdir)
+        self.resolve = src.scanner.RESOLVE_HOSTNAMES
+        src.scanner.RESOLVE_HOSTNAMES = False
+        create_report_template()
+
+        networks = ['10.1.0.0/24', '10.2.0.0/24']
+        inventory = dict(FakePortScanner.synthetic(4, networks[0], open_ports_per_host=3).inventory)
+        inventory.update(FakePortScanner.synthetic(3, networks[1], open_ports_per_host=2).inventory)
+        self.scanner = NetworkScanner(ScanMetrics(), port_scanner=FakePortScanner(inventory))
+        self.results = self.scanner.scan_all_networks(networks=networks)
+        self.json_file = self.scanner.save_results('results.json')
+        self.ndjson_file = self._write_ndjson('results.ndjson')
+
+    def tearDown(self):
+        src.scanner.RESOLVE_HOSTNAMES = self.resolve
+        os.chdir(self.cwd)
+        shutil.rmtree(self.workdir, ignore_errors=True)
+
+    def _write_ndjson(self, path):
+        """Write the results in the format of the scan pipeline"""
+        with open(path, 'w') as f:
+            for network, network_data in self.results['results'].items():
+                for ip, host in network_data['hosts'].items():
+                    f.write(json.dumps({'type': 'host', 'network': network, 'ip': ip, 'host': host},
+                                       default=json_default) + '\n')
+                f.write(json.dumps({
+                    'type': 'network',
+                    'network': network,
+                    'scan_time': network_data['scan_time'],
+                    'network_range': network_data['network_range'],
+                    'total_hosts_scanned': network_data['total_hosts_scanned']
+                }) + '\n')
+            f.write(json.dumps({'type': 'metadata', 'scan_metadata': self.results['scan_metadata']}) + '\n')
+        return path
+
+    def _expected_summary(self):
+        return ReportGenerator().generate_summary_report(self.results)
+
+    def test_json_and_ndjson_match_summary_report(self):
+        expected = self._expected_summary()
+        for results_file in (self.json_file, self.ndjson_file):
+            outcome = ReportRegenerator(cache_dir=None).regenerate(results_file)
+            self.assertEqual(outcome['summary'], expected)
+            self.assertTrue(os.path.exists(outcome['html_report']))
+
+    def test_json_is_read_one_network_at_a_time(self):
+        with open(self.json_file, 'rb') as source, gzip.open('results.json.gz', 'wb') as target:
+            target.write(source.read())
+
+        # Values straddle many reads of a few characters
+        with patch.object(src.report_regenerator, 'JSON_READ_SIZE', 7):
+            for results_file in (self.json_file, 'results.json.gz'):
+                outcome = ReportRegenerator(cache_dir=None).regenerate(results_file)
+                self.assertEqual(outcome['summary'], self._expected_summary())
+
+        with open(self.json_file) as f:
+            truncated = f.read()[:-200]
+        with open('truncated.json', 'w') as f:
+            f.write(truncated)
+        with self.assertRaises(ValueError):
+            ReportRegenerator(cache_dir=None).regenerate('truncated.json')
+
+    def test_unchanged_networks_come_from_cache(self):
+        first = ReportRegenerator(cache_dir='cache').regenerate(self.ndjson_file)
+        self.assertEqual((first['cache_hits'], first['cache_misses']), (0, 2))
+
+        second = ReportRegenerator(cache_dir='cache').regenerate(self.ndjson_file)
+        self.assertEqual((second['cache_hits'], second['cache_misses']), (2, 0))
+        self.assertEqual(second['summary'], first['summary'])
+        self.assertEqual(second['text_summary'], first['text_summary'])
+
+    def test_risk_rule_change_invalidates_cache(self):
+        ReportRegenerator(cache_dir='cache').regenerate(self.json_file)
+        high = src.models.HIGH_RISK_PORTS
+        src.models.HIGH_RISK_PORTS = high + [80]
+        try:
+            outcome = ReportRegenerator(cache_dir='cache').regenerate(self.json_file)
+        finally:
+            src.models.HIGH_RISK_PORTS = high
+        self.assertEqual(outcome['cache_hits'], 0)
+        self.assertGreater(outcome['summary']['high_risk_findings'], self._expected_summary()['high_risk_findings'])
+
+    def test_regenerates_without_section_templates(self):
+        for name in ('network_section_template.html', 'report_layout_template.html'):
+            os.remove(os.path.join(TEMPLATE_DIR, name))
+
+        outcome = ReportRegenerator(cache_dir='cache').regenerate(self.json_file)
+
+        self.assertEqual(outcome['summary'], self._expected_summary())
+
+    def test_cache_keeps_recently_used_entries(self):
+        regenerator = ReportRegenerator(cache_dir='cache')
+        regenerator.regenerate(self.json_file)
+        entries = [os.path.join(d, f) for d, _, files in os.walk('cache') for f in files]
+        self.assertEqual(len(entries), 2)
+
+        # One entry unused for 60 days, then a second run uses the other one again
+        stale = time.time() - 60 * 86400
+        os.utime(entries[0], (stale, stale))
+        self.assertEqual(regenerator.prune_cache(max_age_days=30), 1)
+        self.assertFalse(os.path.exists(entries[0]))
+
+        outcome = ReportRegenerator(cache_dir='cache').regenerate(self.json_file)
+        self.assertEqual((outcome['cache_hits'], outcome['cache_misses']), (1, 1))
+        old = time.time() - 3600
+        os.utime(entries[1], (old, old))
+        self.assertEqual(regenerator.prune_cache(max_entries=1), 1)
+        self.assertFalse(os.path.exists(entries[1]))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,85 @@
+import os
+import sys
+import json
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'benchmarks'))
+
+import src.scanner
+from fake_nmap import FakePortScanner
+from src.metrics import ScanMetrics
+from src.models import HostRecord
+from src.reporter import ReportGenerator
+from src.scanner import NetworkScanner
+
+class TestNetworkScanner(unittest.TestCase):
+
+    def setUp(self):
+        self.cwd = os.getcwd()
+        self.workdir = tempfile.mkdtemp()
+        os.chdir(self.workdir)
+        self.resolve = src.scanner.RESOLVE_HOSTNAMES
+        src.scanner.RESOLVE_HOSTNAMES = False
+
+    def tearDown(self):
+        src.scanner.RESOLVE_HOSTNAMES = self.resolve
+        os.chdir(self.cwd)
+        shutil.rmtree(self.workdir, ignore_errors=True)
+
+    def test_scan_replayed_hosts(self):
+        fake = FakePortScanner.synthetic(4, '10.1.0.0/24', open_ports_per_host=3)
+        scanner = NetworkScanner(ScanMetrics(), port_scanner=fake)
+
+        results = scanner.scan_all_networks(networks=['10.1.0.0/24'])
+
+        hosts = results['results']['10.1.0.0/24']['hosts']
+        self.assertEqual(len(hosts), 4)
+        first = hosts['10.1.0.1']
+        self.assertIsInstance(first, HostRecord)
+        self.assertEqual(first.os_name, 'Linux')
+        self.assertEqual([port.key for port in first.open_ports()], ['22/tcp', '80/tcp', '443/tcp'])
+        self.assertEqual(scanner.metrics.counters['hosts_scanned'], 4)
+
+    def test_saved_results_round_trip(self):
+        fake = FakePortScanner.synthetic(3, '10.1.0.0/24')
+        scanner = NetworkScanner(ScanMetrics(), port_scanner=fake)
+        results = scanner.scan_all_networks(networks=['10.1.0.0/24'])
+
+        with open(scanner.save_results('results.json')) as f:
+            loaded = json.load(f)
+
+        reporter = ReportGenerator()
+        self.assertEqual(reporter.generate_summary_report(results), reporter.generate_summary_report(loaded))
+
+    def test_time_budget_stops_between_batches(self):
+        fake = FakePortScanner.synthetic(1, '10.1.0.0/24', open_ports_per_host=3)
+        scanner = NetworkScanner(ScanMetrics(), port_scanner=fake)
+        clock = [0.0]
+        calls = []
+        scan = fake.scan
+
+        def timed_scan(hosts, ports, arguments=''):
+            # Every nmap call takes one second
+            clock[0] += 1
+            calls.append(arguments)
+            return scan(hosts, ports, arguments=arguments)
+
+        fake.scan = timed_scan
+        ports = [22, 80, 443, 3389, 445, 3306, 8080, 21, 53, 5900]
+        with patch.object(src.scanner, 'HOST_SCAN_TIME_BUDGET', 2.5), \
+                patch.object(src.scanner, 'PORT_BATCH_SIZE', 2), \
+                patch.object(src.scanner.time, 'monotonic', lambda: clock[0]):
+            host = scanner._scan_host_ports('10.1.0.1', ports, '10.1.0.0/24')
+
+        self.assertTrue(host.scan_truncated)
+        self.assertEqual(len(calls), 3)
+        self.assertIn('-O', calls[0].split())
+        self.assertTrue(all('-O' not in arguments.split() for arguments in calls[1:]))
+        self.assertEqual([port.key for port in host.open_ports()], ['22/tcp', '80/tcp', '443/tcp'])
+        self.assertEqual(sorted(map(int, scanner.prioritizer.history['global']['probed'])),
+                         [22, 80, 443, 445, 3306, 3389])
+
+if __name__ == '__main__':
+    unittest.main()
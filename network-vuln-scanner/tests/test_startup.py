@@ -0,0 +1,91 @@
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Cumulative `python -X importtime -c "import main"` time for main, in
+# microseconds. Importing main took ~190ms with the scan stack loaded eagerly
+# and ~35ms with it deferred.
+IMPORT_BUDGET_US = 120000
+
+# Everything imported by a report-only command, from interpreter start to
+# exit, with the scan stack deferred. ~75ms for --trends and --archive;
+# --report-only renders HTML and so loads jinja2 as well, ~120ms.
+REPORT_PATH_BUDGET_US = {'--trends': 150000, '--archive': 150000, '--report-only': 200000}
+
+HEAVY_MODULES = ['nmap', 'psutil', 'jinja2', 'smtplib', 'schedule', 'http.server']
+
+def run_python(*args, cwd=PROJECT_DIR):
+    return subprocess.run([sys.executable, *args], cwd=cwd,
+                          capture_output=True, text=True, check=True)
+
+SAVED_RESULTS = {
+    'scan_metadata': {'start_time': '2024-01-01T02:00:00'},
+    'results': {'10.1.0.0/24': {
+        'scan_time': '2024-01-01T02:00:05', 'network_range': '10.1.0.0/24', 'total_hosts_scanned': 1,
+        'hosts': {'10.1.0.1': {'hostname': '', 'state': 'up', 'os_info': {'os': 'Linux', 'accuracy': 90},
+                               'ports': {'22/tcp': {'state': 'open', 'service': 'ssh', 'risk_level': 'MEDIUM'}},
+                               'vulnerabilities': []}}
+    }}
+}
+
+def run_main(arguments, workdir: str):
+    """Run main.py with arguments from workdir, returning its stdout and the import timing lines"""
+    script = (f"import sys, runpy; sys.path.insert(0, {PROJECT_DIR!r}); sys.argv = ['main.py', *{arguments!r}]; "
+              f"runpy.run_path({os.path.join(PROJECT_DIR, 'main.py')!r}, run_name='__main__')")
+    result = run_python('-X', 'importtime', '-c', script, cwd=workdir)
+    return result.stdout, [line for line in result.stderr.splitlines()
+                           if line.startswith('import time:') and line.split('|')[1].strip().isdigit()]
+
+class TestStartup(unittest.TestCase):
+
+    def test_import_main_skips_scan_stack(self):
+        probe = f"import sys, main; print(' '.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+        loaded = run_python('-c', probe).stdout.split()
+        self.assertEqual(loaded, [])
+
+    def test_import_main_within_budget(self):
+        for _ in range(3):
+            stderr = run_python('-X', 'importtime', '-c', 'import main').stderr
+            cumulative = [
+                int(line.split('|')[1])
+                for line in stderr.splitlines()
+                if line.rstrip().endswith('| main')
+            ]
+            self.assertTrue(cumulative, f"No '| main' line in the -X importtime output:\n{stderr}")
+            if cumulative[0] < IMPORT_BUDGET_US:
+                return
+        self.fail(f"import main took {cumulative[0] / 1000:.1f}ms, budget is {IMPORT_BUDGET_US / 1000:.0f}ms")
+
+    def test_report_only_commands_skip_scan_stack_within_budget(self):
+        commands = {'--trends': [], '--archive': [], '--report-only': ['results.json']}
+        for command, arguments in commands.items():
+            # Regenerating a report renders it with jinja2
+            heavy = [m for m in HEAVY_MODULES if not (command == '--report-only' and m == 'jinja2')]
+            budget = REPORT_PATH_BUDGET_US[command]
+            with self.subTest(command=command), tempfile.TemporaryDirectory() as workdir:
+                with open(os.path.join(workdir, 'results.json'), 'w') as f:
+                    json.dump(SAVED_RESULTS, f)
+                for _ in range(3):
+                    _, timings = run_main([command, *arguments], workdir)
+                    imported = {line.split('|')[2].strip() for line in timings}
+                    self.assertEqual([m for m in heavy if m in imported], [])
+                    # Top-level imports carry the time of everything they import
+                    total = sum(int(line.split('|')[1]) for line in timings
+                                if not line.split('|')[2][1:].startswith(' '))
+                    if total < budget:
+                        break
+                else:
+                    self.fail(f"main.py {command} imports took {total / 1000:.1f}ms, "
+                              f"budget is {budget / 1000:.0f}ms")
+
+    def test_help_does_not_need_scan_dependencies(self):
+        output = run_python('main.py', '--help').stdout
+        self.assertIn('--report-only', output)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,75 @@
+import os
+import shutil
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+
+from src.trends import TrendStore
+
+def host(*open_ports):
+    return {
+        'hostname': '', 'state': 'up', 'os_info': {'os': 'Linux', 'accuracy': 90},
+        'ports': {f'{port}/tcp': {'state': 'open', 'service': 'svc', 'risk_level': risk}
+                  for port, risk in open_ports},
+        'vulnerabilities': []
+    }
+
+def results(hosts):
+    return {'results': {'10.0.0.0/24': {'hosts': hosts, 'total_hosts_scanned': len(hosts)}}}
+
+class TestTrendStore(unittest.TestCase):
+
+    def setUp(self):
+        self.workdir = tempfile.mkdtemp()
+        self.trend_file = os.path.join(self.workdir, 'trends.json')
+
+    def tearDown(self):
+        shutil.rmtree(self.workdir, ignore_errors=True)
+
+    def test_weekly_rollups_and_churn(self):
+        monday = datetime(2024, 3, 4, 2, 0)
+        store = TrendStore(self.trend_file)
+        store.record_run(results({'10.0.0.1': host((23, 'HIGH'), (80, 'LOW')), '10.0.0.2': host((22, 'MEDIUM'))}), monday)
+        store.record_run(results({'10.0.0.1': host((80, 'LOW')), '10.0.0.3': host()}), monday + timedelta(days=2))
+        store.record_run(results({'10.0.0.1': host((80, 'LOW'))}), monday + timedelta(days=7))
+        store.save()
+
+        rows = TrendStore(self.trend_file).weekly()
+        self.assertEqual([row['week'] for row in rows], ['2024-W10', '2024-W11'])
+        self.assertEqual(rows[0]['runs'], 2)
+        self.assertEqual(rows[0]['open_ports'], 2.0)
+        self.assertEqual(rows[0]['findings']['HIGH'], 0.5)
+        self.assertEqual((rows[0]['new_hosts'], rows[0]['gone_hosts']), (1, 1))
+        self.assertEqual((rows[1]['new_hosts'], rows[1]['gone_hosts']), (0, 1))
+        self.assertEqual(TrendStore(self.trend_file).weekly('192.168.1.0/24'), [])
+
+    def test_high_risk_exposure(self):
+        start = datetime(2024, 3, 4, 2, 0)
+        store = TrendStore(self.trend_file)
+        store.record_run(results({'10.0.0.1': host((23, 'HIGH'), (3389, 'HIGH'))}), start)
+        store.record_run(results({'10.0.0.1': host((3389, 'HIGH'))}), start + timedelta(days=3))
+
+        exposure = store.high_risk_exposure(now=start + timedelta(days=5))
+        self.assertEqual(exposure['closed'], 1)
+        self.assertAlmostEqual(exposure['mean_days_open_when_closed'], 3.0)
+        self.assertEqual(exposure['still_open'], 1)
+        self.assertAlmostEqual(exposure['mean_days_open_so_far'], 5.0)
+
+    def test_failed_or_truncated_host_scans_keep_exposure_and_membership(self):
+        start = datetime(2024, 3, 4, 2, 0)
+        truncated = dict(host((80, 'LOW')), scan_truncated=True)
+        store = TrendStore(self.trend_file)
+        store.record_run(results({'10.0.0.1': host((23, 'HIGH')), '10.0.0.2': host((3389, 'HIGH'))}), start)
+        store.record_run(results({'10.0.0.1': {'error': 'nmap timed out'}, '10.0.0.2': truncated}),
+                         start + timedelta(days=1))
+        store.record_run(results({'10.0.0.1': host((23, 'HIGH')), '10.0.0.2': host((3389, 'HIGH'))}),
+                         start + timedelta(days=2))
+
+        exposure = store.high_risk_exposure(now=start + timedelta(days=4))
+        self.assertEqual((exposure['closed'], exposure['still_open']), (0, 2))
+        self.assertAlmostEqual(exposure['mean_days_open_so_far'], 4.0)
+        row = store.weekly()[0]
+        self.assertEqual((row['new_hosts'], row['gone_hosts']), (0, 0))
+
+if __name__ == '__main__':
+    unittest.main()
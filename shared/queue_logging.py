@@ -0,0 +1,157 @@
+"""Process-wide logging through a queue and a background writer thread.
+
+configure() installs one QueueHandler on the root logger. Log calls only
+put the record on an in-memory queue; a QueueListener thread formats it
+and does the console and file I/O, so callers never wait on the disk.
+The first call sets logging up for the whole process and later calls
+leave it as it is, so every class and module can ask for it without
+stacking handlers. Records are written as text or as one JSON object per
+line, and the log file is rotated by size or at a time of day.
+
+The tools in this repository put this directory on sys.path to use it.
+"""
+
+import atexit
+import copy
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+import threading
+from datetime import datetime
+from typing import Optional
+
+TEXT_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+DATE_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+# Attributes every LogRecord has; anything else was passed through `extra`
+_RECORD_ATTRIBUTES = set(vars(logging.LogRecord('', 0, '', 0, '', None, None))) | {'message', 'asctime'}
+
+_lock = threading.Lock()
+_listener: Optional[logging.handlers.QueueListener] = None
+_queue_handler: Optional[logging.Handler] = None
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per record, with the fields passed through `extra`."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            'time': datetime.fromtimestamp(record.created).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+            'thread': record.threadName
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRIBUTES and not key.startswith('_'):
+                entry[key] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry['exception'] = record.exc_text
+        if record.stack_info:
+            entry['stack'] = record.stack_info
+        return json.dumps(entry, default=str)
+
+class ConsoleHandler(logging.StreamHandler):
+    """Writes to whatever sys.stdout or sys.stderr is when the record is written.
+
+    The writer thread outlives the stream that was current at setup when
+    something (a test runner, a GUI) swaps the standard streams.
+    """
+
+    def __init__(self, stream_name: str = 'stderr'):
+        logging.Handler.__init__(self)
+        self.stream_name = stream_name
+
+    @property
+    def stream(self):
+        return getattr(sys, self.stream_name)
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    """Puts records on the queue with their message merged and the traceback rendered.
+
+    The stock prepare() folds the traceback into the message, which would
+    lose it as a separate field of JSON records.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        record.msg, record.args = record.message, None
+        if record.exc_info:
+            record.exc_text = record.exc_text or logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+def _file_handler(log_file: str, max_bytes: int, when: Optional[str], backup_count: int) -> logging.Handler:
+    os.makedirs(os.path.dirname(os.path.abspath(log_file)), exist_ok=True)
+    # Size wins when both are given: the handlers cannot be combined
+    if max_bytes:
+        return logging.handlers.RotatingFileHandler(log_file, maxBytes=max_bytes, backupCount=backup_count,
+                                                    encoding='utf-8')
+    if when:
+        return logging.handlers.TimedRotatingFileHandler(log_file, when=when, backupCount=backup_count,
+                                                         encoding='utf-8')
+    return logging.FileHandler(log_file, encoding='utf-8')
+
+def configure(log_file: Optional[str] = None, level='INFO', json_format: bool = False,
+              console: Optional[str] = 'stderr', fmt: str = TEXT_FORMAT, datefmt: str = DATE_FORMAT,
+              max_bytes: int = 0, when: Optional[str] = None, backup_count: int = 5,
+              force: bool = False) -> bool:
+    """Set up process-wide logging, returning False if it was already set up.
+
+    console names the standard stream to log to, or is None for no
+    console output. The log file is rotated at max_bytes if that is set,
+    else at `when` ('midnight', 'H', 'W0', ... as for
+    TimedRotatingFileHandler), keeping backup_count old files. force
+    replaces an earlier setup.
+    """
+    global _listener, _queue_handler
+    with _lock:
+        if _listener is not None:
+            if not force:
+                return False
+            _stop()
+
+        formatter = JsonFormatter() if json_format else logging.Formatter(fmt, datefmt=datefmt)
+        handlers = []
+        if console:
+            handlers.append(ConsoleHandler(console))
+        if log_file:
+            handlers.append(_file_handler(log_file, max_bytes, when, backup_count))
+        for handler in handlers:
+            handler.setFormatter(formatter)
+
+        log_queue = queue.SimpleQueue()
+        _listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+        _queue_handler = _QueueHandler(log_queue)
+        root = logging.getLogger()
+        root.addHandler(_queue_handler)
+        root.setLevel(level.upper() if isinstance(level, str) else level)
+        _listener.start()
+        return True
+
+def is_configured() -> bool:
+    """Whether configure() has set up logging in this process."""
+    return _listener is not None
+
+def shutdown():
+    """Write every queued record, stop the writer thread and close the handlers."""
+    with _lock:
+        _stop()
+
+def _stop():
+    global _listener, _queue_handler
+    if _listener is None:
+        return
+    logging.getLogger().removeHandler(_queue_handler)
+    _listener.stop()
+    for handler in _listener.handlers:
+        handler.close()
+    _listener = None
+    _queue_handler = None
+
+atexit.register(shutdown)
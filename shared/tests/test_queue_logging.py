@@ -0,0 +1,75 @@
+import json
+import logging
+import os
+import shutil
+import tempfile
+import unittest
+import queue_logging
+
+class TestQueueLogging(unittest.TestCase):
+
+    def setUp(self):
+        self.log_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.log_dir, ignore_errors=True)
+        self.log_file = os.path.join(self.log_dir, 'logs', 'tool.log')
+        self.addCleanup(queue_logging.shutdown)
+        self.logger = logging.getLogger('tests.queue_logging')
+
+    def read_lines(self):
+        with open(self.log_file, encoding='utf-8') as f:
+            return f.read().splitlines()
+
+    def test_configures_the_process_once(self):
+        self.assertTrue(queue_logging.configure(self.log_file, console=None))
+        self.assertFalse(queue_logging.configure(os.path.join(self.log_dir, 'other.log'), console=None))
+        self.assertTrue(queue_logging.is_configured())
+
+        self.logger.info("scan %d of %d", 1, 3)
+        queue_logging.shutdown()
+
+        self.assertEqual(len(self.read_lines()), 1)
+        self.assertTrue(self.read_lines()[0].endswith('tests.queue_logging - INFO - scan 1 of 3'))
+        self.assertFalse(os.path.exists(os.path.join(self.log_dir, 'other.log')))
+        self.assertFalse(queue_logging.is_configured())
+
+    def test_json_records_keep_extra_fields_and_traceback(self):
+        queue_logging.configure(self.log_file, json_format=True, console=None)
+
+        self.logger.info("switched", extra={'ssid': 'HomeNet', 'channel': 36})
+        try:
+            raise ValueError("bad output")
+        except ValueError:
+            self.logger.exception("parse failed")
+        queue_logging.shutdown()
+
+        switched, failed = [json.loads(line) for line in self.read_lines()]
+        self.assertEqual((switched['message'], switched['ssid'], switched['channel']), ('switched', 'HomeNet', 36))
+        self.assertEqual(switched['logger'], 'tests.queue_logging')
+        self.assertEqual(failed['level'], 'ERROR')
+        self.assertIn('ValueError: bad output', failed['exception'])
+        self.assertEqual(failed['message'], 'parse failed')
+
+    def test_rotates_by_size(self):
+        queue_logging.configure(self.log_file, console=None, max_bytes=200, backup_count=2)
+
+        for i in range(20):
+            self.logger.warning("line %02d", i)
+        queue_logging.shutdown()
+
+        self.assertTrue(os.path.exists(f'{self.log_file}.1'))
+        self.assertTrue(os.path.exists(f'{self.log_file}.2'))
+        self.assertFalse(os.path.exists(f'{self.log_file}.3'))
+        self.assertTrue(self.read_lines()[-1].endswith('line 19'))
+
+    def test_force_replaces_the_setup(self):
+        queue_logging.configure(console=None, level='WARNING')
+        self.assertTrue(queue_logging.configure(self.log_file, console=None, level='DEBUG', force=True))
+
+        self.logger.debug("verbose")
+        queue_logging.shutdown()
+
+        self.assertEqual(len(self.read_lines()), 1)
+        self.assertEqual(sum(isinstance(h, queue_logging._QueueHandler) for h in logging.getLogger().handlers), 0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,218 @@
+"""Replays recorded netsh output with simulated per-command latency.
+
+A NetshEnvironment holds what netsh prints for one machine: either a
+recorded corpus directory with one file per query (networks, interfaces,
+profiles, profile, as in tests/fixtures/netsh/<locale>) or a synthetic
+dense environment with many access points and profiles. Its runner() is a
+FakeRunner that sleeps for the latency of each command before answering,
+writes profile XML for 'export profile' and follows 'connect' and
+'disconnect', so the next 'show interfaces' reports the new link.
+"""
+import os
+import subprocess
+import threading
+import time
+from typing import Dict, List, Optional
+
+from src.command_runner import FakeRunner
+from src.netsh_parser import parse_interfaces, parse_networks, parse_profiles
+
+CORPUS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'tests', 'fixtures', 'netsh')
+
+# Representative netsh response times in seconds, scaled by NetshEnvironment.latency_scale
+NETSH_LATENCY = {
+    'networks': 0.25,
+    'interfaces': 0.04,
+    'profiles': 0.05,
+    'profile': 0.05,
+    'export': 0.3,
+    'connect': 0.15,
+    'disconnect': 0.05
+}
+
+# netsh names mapped back to the values of an exported profile
+PROFILE_AUTHENTICATION = {'Open': 'open', 'WPA2-Personal': 'WPA2PSK', 'WPA2-Enterprise': 'WPA2',
+                          'WPA3-Personal': 'WPA3SAE', 'WPA-Personal': 'WPAPSK'}
+PROFILE_ENCRYPTION = {'None': 'none', 'CCMP': 'AES', 'TKIP': 'TKIP', 'WEP': 'WEP'}
+
+PROFILE_XML = """<?xml version="1.0"?>
+<WLANProfile xmlns="http://www.microsoft.com/networking/WLAN/profile/v1">
+    <name>{name}</name>
+    <SSIDConfig><SSID><name>{name}</name></SSID></SSIDConfig>
+    <MSM><security><authEncryption>
+        <authentication>{authentication}</authentication>
+        <encryption>{encryption}</encryption>
+        <useOneX>false</useOneX>
+    </authEncryption></security></MSM>
+</WLANProfile>
+"""
+
+INTERFACE_TEMPLATE = """
+There is 1 interface on the system:
+
+    Name                   : Wi-Fi
+    Description            : Replayed adapter
+    State                  : {state}
+{link}    Radio status           : Hardware On
+"""
+
+LINK_TEMPLATE = """    SSID                   : {ssid}
+    AP BSSID               : {bssid}
+    Band                   : {band}
+    Channel                : {channel}
+    Radio type             : {radio_type}
+    Authentication         : {authentication}
+    Cipher                 : {encryption}
+    Signal                 : {signal_strength}%
+    Profile                : {ssid}
+"""
+
+RADIO_TYPES = {'2.4 GHz': '802.11n', '5 GHz': '802.11ac', '6 GHz': '802.11ax'}
+CHANNELS_24 = [1, 6, 11, 3, 9]
+CHANNELS_5 = [36, 40, 44, 48, 149, 153, 157, 161]
+
+def command_kind(cmd: List[str]) -> str:
+    """NETSH_LATENCY key of a netsh wlan command."""
+    verb, noun = cmd[2], cmd[3] if len(cmd) > 3 else ''
+    if verb == 'show':
+        if noun == 'profile':
+            return 'profile' if any(arg.startswith('name=') for arg in cmd[4:]) else 'profiles'
+        return noun
+    return verb
+
+def dense_networks(ssids: int, aps_per_ssid: int) -> str:
+    """'show networks mode=bssid' output for ssids networks of aps_per_ssid access points each."""
+    lines = [' ', 'Interface name : Wi-Fi', f'There are {ssids} networks currently visible.', '']
+    for s in range(ssids):
+        secured = s % 5 != 4
+        lines += [f"SSID {s + 1} : Net{s:03d}",
+                  "    Network type            : Infrastructure",
+                  f"    Authentication          : {'WPA2-Personal' if secured else 'Open'}",
+                  f"    Encryption              : {'CCMP' if secured else 'None'}"]
+        for a in range(aps_per_ssid):
+            band = '2.4 GHz' if a % 3 == 0 else '5 GHz'
+            channels = CHANNELS_24 if band == '2.4 GHz' else CHANNELS_5
+            lines += [f"    BSSID {a + 1}                 : 02:00:00:{s >> 8:02x}:{s & 0xff:02x}:{a:02x}",
+                      f"         Signal             : {20 + (s * 37 + a * 11) % 80}%",
+                      f"         Radio type         : {RADIO_TYPES[band]}",
+                      f"         Band               : {band}",
+                      f"         Channel            : {channels[(s + a) % len(channels)]}",
+                      "         Basic rates (Mbps) : 6 12 24",
+                      "         Other rates (Mbps) : 9 18 36 48 54"]
+    return '\n'.join(lines) + '\n'
+
+def profile_list(names: List[str]) -> str:
+    """'show profiles' output listing names."""
+    lines = ['', 'Profiles on interface Wi-Fi:', '', 'Group policy profiles (read only)',
+             '---------------------------------', '    <None>', '', 'User profiles', '-------------']
+    lines += [f"    All User Profile     : {name}" for name in names]
+    return '\n'.join(lines) + '\n'
+
+class NetshEnvironment:
+    """netsh output of one machine, replayed by runner()."""
+
+    def __init__(self, name: str, outputs: Dict[str, str], latency_scale: float = 0.0,
+                 latency: Optional[Dict[str, float]] = None):
+        self.name = name
+        self.outputs = outputs
+        self.latency_scale = latency_scale
+        self.latency = dict(NETSH_LATENCY, **(latency or {}))
+        self.access_points = parse_networks(outputs['networks'])
+        self.profiles = parse_profiles(outputs['profiles'])
+        # None replays the recorded 'show interfaces' output until the first connect
+        self.initial_link = None
+        self._lock = threading.Lock()
+        self.reset()
+
+    @classmethod
+    def from_corpus(cls, locale: str, corpus_dir: str = CORPUS_DIR, **kwargs) -> 'NetshEnvironment':
+        """Outputs recorded under one display language."""
+        outputs = {}
+        for kind in ('networks', 'interfaces', 'profiles', 'profile'):
+            with open(os.path.join(corpus_dir, locale, f'{kind}.txt'), encoding='utf-8') as f:
+                outputs[kind] = f.read()
+        return cls(locale, outputs, **kwargs)
+
+    @classmethod
+    def dense(cls, ssids: int, aps_per_ssid: int, profiles: int, **kwargs) -> 'NetshEnvironment':
+        """Synthetic environment, connected to a weak access point of the first profile."""
+        outputs = {
+            'networks': dense_networks(ssids, aps_per_ssid),
+            'profiles': profile_list([f"Net{s:03d}" for s in range(min(profiles, ssids))]),
+            'profile': ''
+        }
+        environment = cls(f"{ssids}x{aps_per_ssid}", outputs, **kwargs)
+        weakest = min(environment.access_points_for('Net000'), key=lambda ap: ap['signal_strength'])
+        environment.initial_link = weakest
+        environment.reset()
+        return environment
+
+    def reset(self):
+        """Back to the recorded link, before any connect."""
+        with self._lock:
+            self.link = self.initial_link
+            self.connects = 0
+
+    def access_points_for(self, ssid: str) -> List[Dict]:
+        return [ap for ap in self.access_points if ap['ssid'] == ssid]
+
+    def interfaces_output(self) -> str:
+        if self.link is None:
+            if self.connects == 0 and 'interfaces' in self.outputs:
+                return self.outputs['interfaces']
+            return INTERFACE_TEMPLATE.format(state='disconnected', link='')
+        return INTERFACE_TEMPLATE.format(state='connected', link=LINK_TEMPLATE.format(**self.link))
+
+    def respond(self, cmd: List[str]) -> subprocess.CompletedProcess:
+        """What netsh prints for cmd, after its simulated latency."""
+        kind = command_kind(cmd)
+        delay = self.latency.get(kind, 0.0) * self.latency_scale
+        if delay:
+            time.sleep(delay)
+
+        with self._lock:
+            if kind == 'interfaces':
+                stdout = self.interfaces_output()
+            elif kind in ('networks', 'profiles'):
+                stdout = self.outputs[kind]
+            elif kind == 'profile':
+                stdout = self.outputs.get('profile', '')
+            elif kind == 'export':
+                self._export(cmd)
+                stdout = ''
+            elif kind == 'connect':
+                ssid = cmd[3].split('=', 1)[1]
+                candidates = self.access_points_for(ssid)
+                if ssid not in self.profiles or not candidates:
+                    return subprocess.CompletedProcess(cmd, 1, '', 'There is no profile assigned to the specified interface.')
+                self.link = max(candidates, key=lambda ap: ap['signal_strength'])
+                self.connects += 1
+                stdout = 'Connection request was completed successfully.'
+            elif kind == 'disconnect':
+                self.link = None
+                self.connects += 1
+                stdout = 'Disconnection request was completed successfully for interface "Wi-Fi".'
+            else:
+                return subprocess.CompletedProcess(cmd, 1, '', f"Unknown command {' '.join(cmd)}")
+        return subprocess.CompletedProcess(cmd, 0, stdout, '')
+
+    def _export(self, cmd: List[str]):
+        folder = next(arg.split('=', 1)[1] for arg in cmd if arg.startswith('folder='))
+        for index, name in enumerate(self.profiles):
+            access_points = self.access_points_for(name)
+            authentication = access_points[0]['authentication'] if access_points else 'WPA2-Personal'
+            encryption = access_points[0]['encryption'] if access_points else 'CCMP'
+            with open(os.path.join(folder, f'Wi-Fi-{index}.xml'), 'w', encoding='utf-8') as f:
+                f.write(PROFILE_XML.format(name=name,
+                                           authentication=PROFILE_AUTHENTICATION.get(authentication, 'WPA2PSK'),
+                                           encryption=PROFILE_ENCRYPTION.get(encryption, 'AES')))
+
+    def runner(self) -> FakeRunner:
+        """A runner answering every netsh wlan command from this environment."""
+        return FakeRunner({('netsh', 'wlan'): self.respond})
+
+    def connected_link(self) -> Optional[Dict]:
+        """The link a fresh 'show interfaces' reports."""
+        connected = [interface for interface in parse_interfaces(self.interfaces_output())
+                     if interface.get('state') == 'connected']
+        return connected[0] if connected else None
@@ -0,0 +1,275 @@
+#!/usr/bin/env python3
+"""Scan-to-decision benchmarks for the Wi-Fi optimizer.
+
+Every environment (the recorded corpus in tests/fixtures/netsh for each
+display language, plus synthetic dense environments) is replayed through
+NetshEnvironment with simulated netsh latency. For each one this measures
+parser throughput, the number of netsh commands and the end-to-end latency
+of optimize_wifi_connection, get_network_status and the one-shot
+QuickConnect, cold (empty cache directory) and warm (profile and scan
+cache left by the previous run).
+
+QuickConnect also has budgets: the netsh queries its decision waits on,
+the start-up time of a fresh interpreter importing it, and the total time
+of each run.
+
+Usage:
+    python benchmarks/run_benchmarks.py --output bench.json
+    python benchmarks/run_benchmarks.py --baseline bench.json
+    python benchmarks/run_benchmarks.py --dense 500x16x200 --latency-scale 0
+
+Exits with status 1 if any result is slower than the baseline by more than
+--tolerance, runs more netsh commands than it did in the baseline, or
+exceeds a QuickConnect budget.
+"""
+import sys
+import os
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.dirname(BENCH_DIR))
+sys.path.append(BENCH_DIR)
+
+import argparse
+import json
+import platform
+import shutil
+import subprocess
+import tempfile
+import time
+from collections import Counter
+from datetime import datetime
+from typing import Dict, List
+
+from replay_netsh import CORPUS_DIR, NetshEnvironment, command_kind
+from src.netsh_parser import parse_interfaces, parse_networks, parse_profiles
+from src.network_manager import NetworkManager
+from src.quick_connect import QuickConnect
+from config.settings import Config
+
+# Lines parsed per timed run, so small corpora still take measurable time
+PARSE_LINES = 200000
+
+# netsh queries QuickConnect may run before connecting. Every environment
+# starts with a link up; only without one does a cold run list the profiles
+# as a third query.
+QUICK_MAX_QUERIES = 2
+
+PARSERS = {
+    'parse_networks': ('networks', parse_networks),
+    'parse_interfaces': ('interfaces', parse_interfaces),
+    'parse_profiles': ('profiles', parse_profiles)
+}
+
+def timed(items: int, function, *args, **kwargs):
+    """Run function once, returning (result, stats)"""
+    start = time.perf_counter()
+    result = function(*args, **kwargs)
+    seconds = time.perf_counter() - start
+    return result, {
+        'seconds': seconds,
+        'items': items,
+        'items_per_second': items / seconds if seconds > 0 else float('inf')
+    }
+
+def best_of(repeat: int, items: int, function, *args, **kwargs):
+    """Run a benchmark repeat times and keep the fastest run"""
+    best_result, best_stats = None, None
+    for _ in range(repeat):
+        result, stats = timed(items, function, *args, **kwargs)
+        if best_stats is None or stats['seconds'] < best_stats['seconds']:
+            best_result, best_stats = result, stats
+    return best_result, best_stats
+
+def bench_parsers(environment: NetshEnvironment, repeat: int) -> Dict:
+    """Lines per second of each parser on the environment's output"""
+    results = {}
+    for name, (kind, parser) in PARSERS.items():
+        output = environment.outputs.get(kind) or environment.interfaces_output()
+        lines = output.count('\n') + 1
+        iterations = max(1, PARSE_LINES // lines)
+
+        def parse():
+            for _ in range(iterations):
+                parser(output)
+        _, results[name] = best_of(repeat, lines * iterations, parse)
+    return results
+
+def bench_config(cache_dir: str) -> Config:
+    config = Config()
+    config.set('cache_dir', cache_dir)
+    config.set('log_level', 'WARNING')
+    return config
+
+def run_manager(environment: NetshEnvironment, cache_dir: str, action: str, **kwargs) -> Dict:
+    """One CLI invocation against the environment, returning what it did"""
+    environment.reset()
+    runner = environment.runner()
+    client = (QuickConnect if action == 'quick' else NetworkManager)(bench_config(cache_dir), runner)
+    try:
+        result = client.run(**kwargs) if action == 'quick' else getattr(client, action)(**kwargs)
+    finally:
+        client.close()
+    link = environment.connected_link()
+    kinds = [command_kind(cmd) for cmd in runner.commands]
+    return {
+        'result': bool(result),
+        'commands': len(runner.commands),
+        # Queries run before the first connect or disconnect, that is before the decision
+        'queries': next((i for i, kind in enumerate(kinds) if kind in ('connect', 'disconnect')), len(kinds)),
+        'command_kinds': dict(Counter(command_kind(cmd) for cmd in runner.commands)),
+        'link': link.get('ssid') if link else None
+    }
+
+def bench_manager(environment: NetshEnvironment, repeat: int) -> Dict:
+    """Latency and netsh command count of cold and warm invocations"""
+    scenarios = [
+        # (name, action, kwargs, whether the cache directory is kept from the previous scenario)
+        ('optimize_cold', 'optimize_wifi_connection', {}, False),
+        ('optimize_warm', 'optimize_wifi_connection', {}, True),
+        ('optimize_rescan', 'optimize_wifi_connection', {'refresh': True}, True),
+        ('quick_cold', 'quick', {}, False),
+        ('status_cold', 'get_network_status', {}, False),
+        ('status_cached', 'get_network_status', {}, True),
+        ('quick_warm', 'quick', {}, True)
+    ]
+    results = {}
+    scratch = tempfile.mkdtemp(prefix='wifi-bench-cache-')
+    cache_dir = None
+    for name, action, kwargs, warm in scenarios:
+        best = None
+        for run in range(repeat):
+            # Each repeat of a warm scenario starts from a copy of the same cache
+            run_dir = os.path.join(scratch, f"{name}-{run}")
+            if warm and cache_dir:
+                shutil.copytree(cache_dir, run_dir)
+            outcome, stats = timed(1, run_manager, environment, run_dir, action, **kwargs)
+            stats.update(outcome)
+            if best is None or stats['seconds'] < best[0]['seconds']:
+                best = (stats, run_dir)
+        results[name], cache_dir = best
+    shutil.rmtree(scratch, ignore_errors=True)
+    return results
+
+def bench_environment(environment: NetshEnvironment, repeat: int) -> Dict:
+    """Every benchmark for one environment, keyed 'benchmark/environment'"""
+    results = {}
+    for name, stats in {**bench_parsers(environment, repeat), **bench_manager(environment, repeat)}.items():
+        stats['environment'] = environment.name
+        results[f"{name}/{environment.name}"] = stats
+    return results
+
+def bench_startup(repeat: int) -> Dict:
+    """Wall time of a fresh interpreter importing QuickConnect"""
+    root = os.path.dirname(BENCH_DIR)
+    command = [sys.executable, '-c', 'import src.quick_connect']
+    _, stats = best_of(repeat, 1, subprocess.run, command, cwd=root, check=True)
+    return {'startup/quick': stats}
+
+def check_budgets(results: Dict, startup_budget: float, quick_budget: float) -> List[str]:
+    """List QuickConnect results over their query, start-up or latency budget"""
+    violations = []
+    for name, stats in results.items():
+        if name.startswith('startup/') and stats['seconds'] > startup_budget:
+            violations.append(f"{name}: {stats['seconds']:.3f}s start-up, budget {startup_budget:.3f}s")
+        if name.startswith('quick_'):
+            if stats['queries'] > QUICK_MAX_QUERIES:
+                violations.append(f"{name}: {stats['queries']} netsh queries before connecting, "
+                                  f"budget {QUICK_MAX_QUERIES}")
+            if stats['seconds'] > quick_budget:
+                violations.append(f"{name}: {stats['seconds']:.3f}s, budget {quick_budget:.3f}s")
+    return violations
+
+def parse_dense(spec: str) -> List[int]:
+    """'200x10x100' -> 200 SSIDs of 10 access points each, 100 of them with a profile"""
+    ssids, aps_per_ssid, profiles = (int(value) for value in spec.split('x'))
+    return [ssids, aps_per_ssid, profiles]
+
+def compare(results: Dict, baseline: Dict, tolerance: float) -> List[str]:
+    """List benchmarks that got slower than tolerance allows or run more netsh commands"""
+    regressions = []
+    for name, stats in results.items():
+        previous = baseline.get(name)
+        if not previous:
+            continue
+        if 'commands' in previous and stats.get('commands', 0) > previous['commands']:
+            regressions.append(f"{name}: {stats['commands']} netsh commands vs baseline {previous['commands']}")
+        if not previous.get('items_per_second'):
+            continue
+        ratio = stats['items_per_second'] / previous['items_per_second']
+        stats['baseline_ratio'] = ratio
+        if ratio < 1 - tolerance:
+            regressions.append(f"{name}: {stats['items_per_second']:.1f}/s vs baseline "
+                               f"{previous['items_per_second']:.1f}/s ({ratio:.0%})")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="Wi-Fi optimizer benchmark suite")
+    parser.add_argument("--locales", default=','.join(sorted(os.listdir(CORPUS_DIR))),
+                        help="Comma separated recorded corpora to replay")
+    parser.add_argument("--dense", default="50x4x20,200x10x100",
+                        help="Comma separated synthetic environments, SSIDSxAPSxPROFILES")
+    parser.add_argument("--latency-scale", type=float, default=1.0,
+                        help="Multiplier for the simulated netsh latency (0 disables it)")
+    parser.add_argument("--startup-budget", type=float, default=0.25,
+                        help="Seconds a fresh interpreter may take to import QuickConnect")
+    parser.add_argument("--quick-budget", type=float, default=1.0,
+                        help="Seconds a QuickConnect run may take, simulated netsh latency included")
+    parser.add_argument("--repeat", type=int, default=3, help="Keep the best of N runs")
+    parser.add_argument("--output", help="Write machine-readable results to this JSON file")
+    parser.add_argument("--baseline", help="Previous results to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed slowdown vs baseline (0.25 = 25%%)")
+    args = parser.parse_args()
+
+    output = os.path.abspath(args.output) if args.output else None
+    baseline_path = os.path.abspath(args.baseline) if args.baseline else None
+
+    environments = [NetshEnvironment.from_corpus(locale, latency_scale=args.latency_scale)
+                    for locale in args.locales.split(',') if locale]
+    environments += [NetshEnvironment.dense(*parse_dense(spec), latency_scale=args.latency_scale)
+                     for spec in args.dense.split(',') if spec]
+
+    # Log files go to a scratch directory
+    workdir = tempfile.mkdtemp(prefix='wifi-bench-')
+    os.chdir(workdir)
+
+    results = bench_startup(args.repeat)
+    for environment in environments:
+        results.update(bench_environment(environment, args.repeat))
+        print(f"Finished {environment.name}")
+
+    for name, stats in results.items():
+        commands = f"{stats['commands']:4d} cmds" if 'commands' in stats else ''
+        print(f"{name:36} {stats['seconds']:9.4f}s {stats['items_per_second']:14.1f}/s {commands}")
+
+    regressions = check_budgets(results, args.startup_budget, args.quick_budget)
+    if baseline_path:
+        with open(baseline_path) as f:
+            regressions += compare(results, json.load(f)['results'], args.tolerance)
+
+    report = {
+        'meta': {
+            'timestamp': datetime.now().isoformat(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'latency_scale': args.latency_scale,
+            'startup_budget': args.startup_budget,
+            'quick_budget': args.quick_budget,
+            'repeat': args.repeat
+        },
+        'results': results,
+        'regressions': regressions
+    }
+    if output:
+        with open(output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"Results written to {output}")
+
+    shutil.rmtree(workdir, ignore_errors=True)
+
+    if regressions:
+        print("Regressions:")
+        for line in regressions:
+            print(f"  {line}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -7,11 +7,46 @@ from typing import List, Dict, Any
 DEFAULT_CONFIG = {
     'scan_timeout': 30,
     'connection_timeout': 15,
-    'retry_attempts': 3,
+    'retry_attempts': 3,  # Connection attempts per network
+    'verify_poll_interval': 0.1,  # First delay between connection checks, doubled up to the maximum
+    'verify_max_poll_interval': 1.0,
     'signal_threshold': -70,  # dBm
     'preferred_networks': [],
+    'band_capacity_mbps': {'2.4 GHz': 144, '5 GHz': 866, '6 GHz': 1201, 'Unknown': 144},  # Best-case rate per band
     'blacklisted_networks': [],
-    'log_level': 'INFO'
+    'cache_dir': '.wifi_optimizer_cache',
+    'scan_cache_ttl': 10,  # Seconds a scan is reused by later invocations
+    'scan_cache_file': 'scan_cache.json',  # In cache_dir; empty to always scan
+    'command_runner': 'session',  # 'session' (long-lived shells) or 'subprocess'
+    'session_pool_size': 3,  # Shell sessions for concurrent netsh queries
+    'monitor_interval': 10,  # Seconds between link samples while the signal is healthy
+    'monitor_fast_interval': 2,  # Seconds between link samples while degraded
+    'signal_smoothing': 0.3,  # Weight of the newest sample in the smoothed signal
+    'roam_trigger_signal': 50,  # Smoothed signal (%) below which the link is degraded
+    'roam_recover_signal': 60,  # Smoothed signal (%) at which a degraded link is healthy again
+    'roam_margin': 15,  # Percent a network's expected throughput must beat the current link by
+    'min_dwell_time': 60,  # Seconds to stay on a network before roaming away
+    'min_scan_interval': 15,  # Seconds between full scans while degraded
+    'max_scan_interval': 240,  # Backoff limit when scans find nothing better
+    'signal_history_size': 32,  # Signal samples kept per access point
+    'signal_history_max_aps': 256,  # Access points kept in the signal history
+    'signal_history_file': 'signal_history.bin',  # In cache_dir; empty to keep it in memory only
+    'probe_enabled': False,  # Measure RTT, jitter and throughput of links before trusting their signal
+    'probe_host': '',  # Echo service (UDP and TCP) used by the link probe
+    'probe_port': 7,
+    'probe_count': 5,  # UDP round trips per probe
+    'probe_bytes': 65536,  # Bytes echoed over TCP for the throughput sample
+    'probe_timeout': 2,  # Seconds
+    'probe_ttl': 600,  # Seconds a probe result stays valid
+    'probe_margin': 0.2,  # Fraction a measured network must be faster by to switch
+    'cycle_metrics_file': 'cycles.jsonl',  # In cache_dir, one JSON line per cycle; empty to turn off
+    'cycle_metrics_max_bytes': 1048576,  # Size at which the cycle log is rotated to a .1 file
+    'log_level': 'INFO',
+    'log_file': 'wifi_optimizer.log',  # Empty to log to the console only
+    'log_format': 'text',  # 'text' or 'json' (one object per line)
+    'log_rotate_when': 'midnight',  # When the log file is rotated (TimedRotatingFileHandler 'when')
+    'log_max_bytes': 0,  # Rotate at this size instead of by time; 0 to rotate by time only
+    'log_backup_count': 7  # Rotated log files kept
 }
 
 class Config:
@@ -3,10 +3,8 @@
 import sys
 import argparse
 import json
-from pathlib import Path
 from config.settings import Config
-from src.network_manager import NetworkManager
-from utils.logger import setup_logger
+from utils.logger import configure_logging, setup_logger
 
 def main():
     """Main function."""
@@ -15,6 +13,14 @@ def main():
     parser.add_argument('--scan-only', action='store_true', help='Only scan networks, do not connect')
     parser.add_argument('--status', action='store_true', help='Show current network status')
     parser.add_argument('--optimize', action='store_true', help='Optimize Wi-Fi connection')
+    parser.add_argument('--quick', action='store_true',
+                        help='Connect to the best known network with the fewest netsh calls (for logon)')
+    parser.add_argument('--all-interfaces', action='store_true',
+                        help='Optimize every wireless adapter, spreading them over different channels')
+    parser.add_argument('--monitor', action='store_true', help='Keep monitoring and optimizing the connection')
+    parser.add_argument('--max-age', type=float, metavar='SECONDS',
+                        help='Reuse a scan up to this old (default: scan_cache_ttl)')
+    parser.add_argument('--refresh', action='store_true', help='Always run a new scan')
     parser.add_argument('--verbose', action='store_true', help='Enable verbose logging')
     
     args = parser.parse_args()
@@ -25,27 +31,59 @@ def main():
     if args.verbose:
         config.set('log_level', 'DEBUG')
     
+    # Once for the process, before any component asks for a logger
+    configure_logging(config)
     logger = setup_logger(__name__, config.get('log_level'))
     
+    network_manager = None
     try:
+        if args.quick:
+            # Imports only what the one-shot connect needs
+            from src.quick_connect import QuickConnect
+            quick_connect = QuickConnect(config)
+            try:
+                success = quick_connect.run()
+            finally:
+                quick_connect.close()
+            sys.exit(0 if success else 1)
+        
         # Initialize network manager
+        from src.network_manager import NetworkManager
         network_manager = NetworkManager(config)
         
         if args.status:
             # Show network status
-            status = network_manager.get_network_status()
+            status = network_manager.get_network_status(args.max_age, args.refresh)
+            # Timings of the optimization cycles logged on this machine
+            from src.cycle_metrics import summarize_cycles
+            status['cycle_stats'] = summarize_cycles(config)
             print(json.dumps(status, indent=2))
             
         elif args.scan_only:
             # Scan networks only
-            networks = network_manager.scanner.scan_networks()
+            networks = network_manager.scan_networks(args.max_age, args.refresh)
             print(f"Found {len(networks)} networks:")
             for network in networks:
                 print(f"  {network['ssid']}: {network.get('signal_strength', 'N/A')}% signal")
                 
+        elif args.all_interfaces:
+            # One network per adapter
+            success = network_manager.optimize_all_interfaces()
+            if success:
+                print("Wi-Fi adapters optimized successfully!")
+                sys.exit(0)
+            else:
+                print("Failed to optimize the Wi-Fi adapters.")
+                sys.exit(1)
+                
+        elif args.monitor:
+            # Run until interrupted
+            from src.monitor import ConnectionMonitor
+            ConnectionMonitor(config, network_manager).run()
+            
         elif args.optimize:
             # Optimize connection
-            success = network_manager.optimize_wifi_connection()
+            success = network_manager.optimize_wifi_connection(args.max_age, args.refresh)
             if success:
                 print("Wi-Fi connection optimized successfully!")
                 sys.exit(0)
@@ -54,7 +92,7 @@ def main():
                 sys.exit(1)
         else:
             # Default: optimize connection
-            success = network_manager.optimize_wifi_connection()
+            success = network_manager.optimize_wifi_connection(args.max_age, args.refresh)
             if success:
                 print("Wi-Fi connection optimized successfully!")
             else:
@@ -67,6 +105,9 @@ def main():
     except Exception as e:
         logger.error(f"Application error: {e}")
         sys.exit(1)
+    finally:
+        if network_manager:
+            network_manager.close()
 
 if __name__ == '__main__':
     main()
\ No newline at end of file
@@ -0,0 +1,317 @@
+"""Command runners used to execute netsh.
+
+ShellSessionRunner keeps shell processes alive and frames the output of
+each command with a sentinel line, so repeated netsh calls do not pay for a
+new process every time. SubprocessRunner starts one process per command and
+FakeRunner replays scripted output so the whole stack runs without netsh.
+MeteredRunner wraps any of them to count commands for the cycle metrics.
+"""
+
+import abc
+import functools
+import locale
+import os
+import queue
+import shlex
+import subprocess
+import threading
+import time
+import uuid
+from typing import Callable, Dict, List, Optional, Sequence, Tuple, Union
+from utils.logger import setup_logger
+from config.settings import Config
+
+# cmd.exe acts on these even inside quotes, so they are caret-escaped
+CMD_SPECIAL_CHARACTERS = set('^&|<>()"')
+# Variable expansion cannot be escaped reliably on an interactive cmd.exe
+CMD_UNSAFE_CHARACTERS = set('%!\r\n')
+
+def cmd_command_line(cmd: Sequence[str]) -> Optional[str]:
+    """Command line for cmd.exe that passes every argument through literally, or None if none does.
+
+    Quotes are escaped too, so cmd.exe sees no quoted sections and every
+    escape applies, while the program still gets them in its command line.
+    """
+    line = subprocess.list2cmdline(list(cmd))
+    if any(c in CMD_UNSAFE_CHARACTERS for c in line):
+        return None
+    return ''.join(f'^{c}' if c in CMD_SPECIAL_CHARACTERS else c for c in line)
+
+def console_encoding() -> str:
+    """Encoding netsh writes its output in."""
+    # netsh writes in the OEM code page, not the ANSI one text=True would decode with
+    return 'oem' if os.name == 'nt' else locale.getpreferredencoding(False)
+
+class CommandRunner(abc.ABC):
+    """Runs a command and returns a subprocess.CompletedProcess."""
+
+    @abc.abstractmethod
+    def run(self, cmd: Sequence[str], timeout: Optional[float] = None) -> subprocess.CompletedProcess:
+        """Run a command, raising subprocess.TimeoutExpired if it takes longer than timeout."""
+
+    async def run_async(self, cmd: Sequence[str], timeout: Optional[float] = None) -> subprocess.CompletedProcess:
+        """Run a command on a worker thread so several can be awaited concurrently."""
+        # Imported here so that callers without an event loop do not pay for asyncio
+        import asyncio
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, functools.partial(self.run, cmd, timeout))
+
+    def close(self):
+        """Release any process held by the runner."""
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+class SubprocessRunner(CommandRunner):
+    """Starts a new process for every command."""
+
+    def __init__(self, encoding: Optional[str] = None):
+        self.encoding = encoding or console_encoding()
+
+    def run(self, cmd: Sequence[str], timeout: Optional[float] = None) -> subprocess.CompletedProcess:
+        return subprocess.run(list(cmd), capture_output=True, encoding=self.encoding, errors='replace',
+                              timeout=timeout)
+
+class _ShellSession:
+    """One long-lived shell whose per-command output is framed by sentinel lines.
+
+    After each command the shell echoes '<sentinel> <exit code>' on stdout
+    and '<sentinel>' on stderr; reader threads queue lines so reads can time
+    out.
+    """
+
+    def __init__(self, startup_timeout: Optional[float], encoding: str):
+        self.windows = os.name == 'nt'
+        shell = ['cmd.exe', '/Q', '/K'] if self.windows else ['/bin/sh']
+        self.process = subprocess.Popen(
+            shell,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            encoding=encoding,
+            errors='replace',
+            bufsize=1
+        )
+        self.stdout_lines = self._reader(self.process.stdout)
+        self.stderr_lines = self._reader(self.process.stderr)
+        try:
+            # Skip the banner and prompt output printed before the first command
+            self._exchange('echo.' if self.windows else 'true', startup_timeout)
+        except (subprocess.TimeoutExpired, OSError):
+            self.kill()
+            raise
+
+    def _reader(self, stream) -> queue.Queue:
+        lines = queue.Queue()
+
+        def pump():
+            for line in stream:
+                lines.put(line)
+            lines.put(None)
+
+        threading.Thread(target=pump, daemon=True).start()
+        return lines
+
+    @property
+    def alive(self) -> bool:
+        return self.process.poll() is None
+
+    def run(self, cmd: Sequence[str], timeout: Optional[float]) -> subprocess.CompletedProcess:
+        # stdin is redirected so a command can never consume the framing lines
+        if self.windows:
+            command_line = cmd_command_line(cmd)
+            if command_line is None:
+                raise ValueError(f"Command cannot be passed safely through cmd.exe: {list(cmd)}")
+            command_line += ' <NUL'
+        else:
+            command_line = ' '.join(shlex.quote(arg) for arg in cmd) + ' </dev/null'
+        returncode, stdout, stderr = self._exchange(command_line, timeout)
+        return subprocess.CompletedProcess(list(cmd), returncode, stdout, stderr)
+
+    def _exchange(self, command_line: str, timeout: Optional[float]) -> Tuple[int, str, str]:
+        """Send one command line and collect its framed output."""
+        sentinel = f"__wifi_optimizer_{uuid.uuid4().hex}__"
+        status = '%ERRORLEVEL%' if self.windows else '$?'
+        # On cmd.exe %ERRORLEVEL% must be on its own line to expand after the command ran
+        self.process.stdin.write(
+            f"{command_line}\n"
+            f"echo {sentinel} {status}\n"
+            f"echo {sentinel} 1>&2\n"
+        )
+        self.process.stdin.flush()
+
+        deadline = None if timeout is None else time.monotonic() + timeout
+        stdout, returncode = self._read_until(self.stdout_lines, sentinel, deadline, command_line, timeout)
+        stderr, _ = self._read_until(self.stderr_lines, sentinel, deadline, command_line, timeout)
+        return int(returncode or 0), ''.join(stdout), ''.join(stderr)
+
+    def _read_until(self, lines: queue.Queue, sentinel: str, deadline: Optional[float],
+                    command_line: str, timeout: Optional[float]) -> Tuple[List[str], str]:
+        output = []
+        while True:
+            remaining = None if deadline is None else deadline - time.monotonic()
+            try:
+                if remaining is not None and remaining <= 0:
+                    raise queue.Empty
+                line = lines.get(timeout=remaining)
+            except queue.Empty:
+                raise subprocess.TimeoutExpired(command_line, timeout)
+            if line is None:
+                raise OSError("Shell session exited unexpectedly")
+            # Output without a trailing newline puts the sentinel mid-line
+            index = line.find(sentinel)
+            if index >= 0:
+                if index:
+                    output.append(line[:index])
+                return output, line[index + len(sentinel):].strip()
+            output.append(line)
+
+    def kill(self):
+        if self.alive:
+            self.process.kill()
+        self.process.wait()
+
+    def close(self):
+        if self.alive:
+            try:
+                self.process.stdin.write('exit\n')
+                self.process.stdin.flush()
+                self.process.wait(timeout=5)
+            except (OSError, subprocess.TimeoutExpired):
+                pass
+        self.kill()
+
+class ShellSessionRunner(CommandRunner):
+    """Runs commands in a small pool of long-lived shell sessions.
+
+    Each session runs one command at a time; up to 'session_pool_size'
+    sessions are started on demand so concurrent queries do not wait for
+    each other. A session whose command times out is killed and replaced.
+    Commands that cmd.exe cannot carry literally, such as an SSID with a
+    '%', get a process of their own instead.
+    """
+
+    def __init__(self, config: Config, encoding: Optional[str] = None):
+        self.config = config
+        self.encoding = encoding or console_encoding()
+        self.logger = setup_logger(__name__, config.get('log_level'))
+        self.startup_timeout = config.get('connection_timeout')
+        self.slots = threading.BoundedSemaphore(max(1, config.get('session_pool_size', 1)))
+        self.idle = queue.LifoQueue()
+        self.sessions_started = 0
+        self.closed = False
+        self.fallback = SubprocessRunner(self.encoding)
+        # Start the first session eagerly so an unusable shell is detected up front
+        self.idle.put(self._new_session())
+
+    def _new_session(self) -> _ShellSession:
+        session = _ShellSession(self.startup_timeout, self.encoding)
+        self.sessions_started += 1
+        return session
+
+    def _acquire(self) -> _ShellSession:
+        self.slots.acquire()
+        try:
+            while True:
+                try:
+                    session = self.idle.get_nowait()
+                except queue.Empty:
+                    return self._new_session()
+                if session.alive:
+                    return session
+        except BaseException:
+            self.slots.release()
+            raise
+
+    def _release(self, session: Optional[_ShellSession]):
+        if session is not None:
+            if self.closed:
+                session.close()
+            else:
+                self.idle.put(session)
+        self.slots.release()
+
+    def run(self, cmd: Sequence[str], timeout: Optional[float] = None) -> subprocess.CompletedProcess:
+        if os.name == 'nt' and cmd_command_line(cmd) is None:
+            return self.fallback.run(cmd, timeout)
+        session = self._acquire()
+        try:
+            return session.run(cmd, timeout)
+        except (subprocess.TimeoutExpired, OSError):
+            # The shell may still be busy with the command; replace it next time
+            session.kill()
+            session = None
+            raise
+        finally:
+            self._release(session)
+
+    def close(self):
+        self.closed = True
+        while True:
+            try:
+                self.idle.get_nowait().close()
+            except queue.Empty:
+                break
+
+class MeteredRunner(CommandRunner):
+    """Counts the netsh commands run by another runner and the output bytes they return.
+
+    Commands are counted whether or not they start a process; a shell
+    session runs them without one.
+    """
+
+    def __init__(self, runner: CommandRunner, metrics):
+        self.runner = runner
+        self.metrics = metrics
+
+    def run(self, cmd: Sequence[str], timeout: Optional[float] = None) -> subprocess.CompletedProcess:
+        self.metrics.increment('commands')
+        result = self.runner.run(cmd, timeout)
+        if result.stdout:
+            self.metrics.increment('bytes_parsed', len(result.stdout.encode('utf-8')))
+        return result
+
+    def close(self):
+        self.runner.close()
+
+Response = Union[subprocess.CompletedProcess, Callable[[List[str]], subprocess.CompletedProcess]]
+
+class FakeRunner(CommandRunner):
+    """Replays scripted responses, matched on the longest command prefix.
+
+    A response is either a CompletedProcess or a callable taking the command
+    and returning one. Every command run is recorded in `commands`.
+    """
+
+    def __init__(self, responses: Optional[Dict[Tuple[str, ...], Response]] = None):
+        self.responses = dict(responses or {})
+        self.commands = []
+
+    def add(self, prefix: Sequence[str], stdout: str = '', returncode: int = 0, stderr: str = ''):
+        """Script the output of every command starting with prefix."""
+        self.responses[tuple(prefix)] = subprocess.CompletedProcess(list(prefix), returncode, stdout, stderr)
+
+    def run(self, cmd: Sequence[str], timeout: Optional[float] = None) -> subprocess.CompletedProcess:
+        cmd = list(cmd)
+        self.commands.append(cmd)
+        matches = [prefix for prefix in self.responses if tuple(cmd[:len(prefix)]) == prefix]
+        if not matches:
+            return subprocess.CompletedProcess(cmd, 1, '', f"No scripted response for {' '.join(cmd)}")
+        response = self.responses[max(matches, key=len)]
+        if callable(response):
+            return response(cmd)
+        return subprocess.CompletedProcess(cmd, response.returncode, response.stdout, response.stderr)
+
+def create_runner(config: Config) -> CommandRunner:
+    """Create the runner selected by the 'command_runner' setting."""
+    logger = setup_logger(__name__, config.get('log_level'))
+    if config.get('command_runner') == 'session':
+        try:
+            return ShellSessionRunner(config)
+        except (OSError, subprocess.TimeoutExpired) as e:
+            logger.warning(f"Shell session unavailable, starting a process per command: {e}")
+    return SubprocessRunner()
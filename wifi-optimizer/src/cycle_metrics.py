@@ -0,0 +1,173 @@
+"""Per-phase timings and counters of optimization cycles.
+
+A cycle is one optimize, status, quick connect or roaming decision. While
+it is open, the scanner, connector and command runner add the time spent
+in their phases (profiles, scan, interfaces, select, connect, verify) and
+count events (netsh commands, bytes of netsh output parsed, connect
+retries, verification polls). A closed cycle is appended as one JSON line
+to 'cycle_metrics_file', so files from many machines can be concatenated
+and analysed together; summarize_cycles() aggregates a file for
+`main.py --status`. Phases of concurrent queries overlap, so their sum
+can exceed the cycle's total time.
+"""
+
+import json
+import math
+import os
+import platform
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional
+from utils.logger import setup_logger
+from config.settings import Config
+
+def metrics_path(config: Config) -> Optional[str]:
+    """Location of the cycle log, or None if recording is off."""
+    name = config.get('cycle_metrics_file')
+    if not name:
+        return None
+    return os.path.join(config.get('cache_dir'), name)
+
+class CycleMetrics:
+    """Collects the phases and counters of the open cycle and logs closed ones."""
+
+    def __init__(self, config: Config, clock=time.perf_counter):
+        self.config = config
+        self.logger = setup_logger(__name__, config.get('log_level'))
+        self.clock = clock
+        self.path = metrics_path(config)
+        self.max_bytes = config.get('cycle_metrics_max_bytes')
+        self.current: Optional[Dict] = None
+        self.last: Optional[Dict] = None
+        self._started = 0.0
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def cycle(self, kind: str) -> Iterator[Dict]:
+        """Record the enclosed block as one cycle; inside another cycle it is part of that one.
+
+        The yielded record takes extra fields such as 'outcome' and 'ssid'.
+        """
+        if self.current is not None:
+            yield self.current
+            return
+        self._started = self.clock()
+        self.current = {
+            'time': datetime.now().isoformat(timespec='seconds'),
+            'host': platform.node(),
+            'kind': kind,
+            'outcome': None,
+            'total_seconds': 0.0,
+            'phases': {},
+            'counters': {}
+        }
+        record = self.current
+        try:
+            yield record
+        except Exception:
+            record['outcome'] = 'error'
+            raise
+        finally:
+            with self._lock:
+                record['total_seconds'] = self.clock() - self._started
+                self.current = None
+            self.last = record
+            self._write(record)
+
+    @contextmanager
+    def phase(self, name: str):
+        """Add the time spent in the enclosed block to a phase of the open cycle."""
+        start = self.clock()
+        try:
+            yield
+        finally:
+            self.add_time(name, self.clock() - start)
+
+    def add_time(self, name: str, seconds: float):
+        with self._lock:
+            if self.current is not None:
+                phases = self.current['phases']
+                phases[name] = phases.get(name, 0.0) + seconds
+
+    def increment(self, name: str, amount: int = 1):
+        """Increase a counter of the open cycle."""
+        with self._lock:
+            if self.current is not None:
+                counters = self.current['counters']
+                counters[name] = counters.get(name, 0) + amount
+
+    def _write(self, record: Dict):
+        if not self.path:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            # Keep one previous file once the log reaches its size limit
+            if self.max_bytes and os.path.exists(self.path) and os.path.getsize(self.path) >= self.max_bytes:
+                os.replace(self.path, f"{self.path}.1")
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(record, sort_keys=True) + '\n')
+        except OSError as e:
+            self.logger.warning(f"Could not write cycle metrics to {self.path}: {e}")
+
+def read_cycles(path: str) -> List[Dict]:
+    """Cycle records from a JSON lines file, skipping lines that do not parse."""
+    cycles = []
+    if not os.path.exists(path):
+        return cycles
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            try:
+                cycles.append(json.loads(line))
+            except ValueError:
+                # A line cut short by a crash or a concurrent writer
+                continue
+    return cycles
+
+def _distribution(values: List[float]) -> Dict[str, float]:
+    values = sorted(values)
+
+    def percentile(fraction: float) -> float:
+        # Nearest rank
+        return values[max(0, math.ceil(fraction * len(values)) - 1)]
+
+    return {
+        'count': len(values),
+        'mean': sum(values) / len(values),
+        'p50': percentile(0.5),
+        'p95': percentile(0.95),
+        'max': values[-1]
+    }
+
+def summarize(cycles: List[Dict]) -> Dict:
+    """Aggregate cycle records: counts per kind and outcome, time distributions and counter totals."""
+    summary = {'cycles': len(cycles), 'kinds': {}, 'outcomes': {}, 'total_seconds': None,
+               'phases': {}, 'counters': {}}
+    if not cycles:
+        return summary
+
+    phases: Dict[str, List[float]] = {}
+    counters: Dict[str, List[int]] = {}
+    for cycle in cycles:
+        kind, outcome = cycle.get('kind'), cycle.get('outcome')
+        summary['kinds'][kind] = summary['kinds'].get(kind, 0) + 1
+        summary['outcomes'][outcome] = summary['outcomes'].get(outcome, 0) + 1
+        for name, seconds in cycle.get('phases', {}).items():
+            phases.setdefault(name, []).append(seconds)
+        for name, value in cycle.get('counters', {}).items():
+            counters.setdefault(name, []).append(value)
+
+    summary['total_seconds'] = _distribution([cycle.get('total_seconds', 0.0) for cycle in cycles])
+    summary['phases'] = {name: _distribution(values) for name, values in sorted(phases.items())}
+    # Counters are averaged over every cycle, counting 0 where a cycle did not have them
+    summary['counters'] = {
+        name: {'total': sum(values), 'mean': sum(values) / len(cycles), 'max': max(values)}
+        for name, values in sorted(counters.items())
+    }
+    return summary
+
+def summarize_cycles(config: Config) -> Dict:
+    """Summary of the cycles logged on this machine."""
+    path = metrics_path(config)
+    return summarize(read_cycles(path) if path else [])
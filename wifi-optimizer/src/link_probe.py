@@ -0,0 +1,144 @@
+"""Active measurements of the current link.
+
+LinkProbe sends a few UDP datagrams to an echo service to measure
+round-trip time and jitter, then echoes a short burst over TCP for a
+throughput sample. Results are kept per SSID/BSSID in a ProbeCache that
+expires them after 'probe_ttl' seconds, so a network is re-measured
+only once its last measurement has gone stale.
+"""
+
+import json
+import os
+import socket
+import time
+from typing import Callable, Dict, Optional
+from utils.logger import setup_logger
+from config.settings import Config
+
+CHUNK_SIZE = 16 * 1024
+
+def probe_score(result: Dict) -> float:
+    """Throughput in kbit/s discounted by latency; higher is better.
+
+    Every 100 ms of round-trip time plus jitter halves the score, so a fast
+    but laggy link does not beat a slightly slower responsive one.
+    """
+    delay_ms = result['rtt_ms'] + result['jitter_ms']
+    return result['throughput_kbps'] / (1 + delay_ms / 100)
+
+class LinkProbe:
+    """Measures RTT, jitter and throughput against the configured echo target."""
+
+    def __init__(self, config: Config):
+        self.config = config
+        self.logger = setup_logger(__name__, config.get('log_level'))
+        self.target = (config.get('probe_host'), config.get('probe_port'))
+        self.count = config.get('probe_count')
+        self.sample_bytes = config.get('probe_bytes')
+        self.timeout = config.get('probe_timeout')
+
+    def measure(self) -> Optional[Dict]:
+        """Measure the link, returning None if the target did not answer."""
+        try:
+            rtts = self._round_trips()
+            throughput = self._throughput()
+        except OSError as e:
+            self.logger.warning(f"Link probe to {self.target[0]}:{self.target[1]} failed: {e}")
+            return None
+        if not rtts:
+            self.logger.warning(f"No echo from {self.target[0]}:{self.target[1]}")
+            return None
+
+        # Mean difference between consecutive round trips, as in RFC 3550
+        jitter = 0.0
+        if len(rtts) > 1:
+            jitter = sum(abs(b - a) for a, b in zip(rtts, rtts[1:])) / (len(rtts) - 1)
+        return {
+            'rtt_ms': round(sum(rtts) / len(rtts), 3),
+            'jitter_ms': round(jitter, 3),
+            'loss': round(1 - len(rtts) / self.count, 3),
+            'throughput_kbps': round(throughput, 1)
+        }
+
+    def _round_trips(self) -> list:
+        """UDP echo round-trip times in milliseconds; lost datagrams are skipped."""
+        rtts = []
+        with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+            sock.settimeout(self.timeout)
+            sock.connect(self.target)
+            for sequence in range(self.count):
+                payload = f"wifi-optimizer {sequence}".encode('ascii')
+                start = time.perf_counter()
+                sock.send(payload)
+                try:
+                    # Drop late replies to earlier datagrams
+                    while sock.recv(2048) != payload:
+                        pass
+                except socket.timeout:
+                    continue
+                rtts.append((time.perf_counter() - start) * 1000)
+        return rtts
+
+    def _throughput(self) -> float:
+        """Echo probe_bytes over TCP and return the rate in kbit/s."""
+        payload = bytes(min(CHUNK_SIZE, self.sample_bytes))
+        received = 0
+        with socket.create_connection(self.target, timeout=self.timeout) as sock:
+            start = time.perf_counter()
+            # Send in chunks and read each one back, so neither side's buffers fill up
+            while received < self.sample_bytes:
+                chunk = payload[:self.sample_bytes - received]
+                sock.sendall(chunk)
+                pending = len(chunk)
+                while pending:
+                    data = sock.recv(pending)
+                    if not data:
+                        raise OSError("Echo connection closed")
+                    pending -= len(data)
+                received += len(chunk)
+            elapsed = time.perf_counter() - start
+        return received * 8 / 1000 / max(elapsed, 1e-6)
+
+class ProbeCache:
+    """Probe results per SSID/BSSID that expire after a TTL, saved as JSON."""
+
+    def __init__(self, path: Optional[str], ttl: float, clock: Callable[[], float] = time.time):
+        self.path = path
+        self.ttl = ttl
+        self.clock = clock
+        self.entries = self._load()
+
+    def _load(self) -> Dict:
+        if not self.path or not os.path.exists(self.path):
+            return {}
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    @staticmethod
+    def _key(ssid: str, bssid: Optional[str]) -> str:
+        return f"{ssid}|{bssid or ''}"
+
+    def get(self, ssid: str, bssid: Optional[str]) -> Optional[Dict]:
+        """Fresh result for an access point, or None if missing or expired."""
+        entry = self.entries.get(self._key(ssid, bssid))
+        if entry is None or self.clock() - entry['time'] > self.ttl:
+            return None
+        return entry
+
+    def put(self, ssid: str, bssid: Optional[str], result: Dict):
+        """Store a result and drop expired ones."""
+        now = self.clock()
+        self.entries = {key: entry for key, entry in self.entries.items() if now - entry['time'] <= self.ttl}
+        self.entries[self._key(ssid, bssid)] = dict(result, time=now)
+
+    def save(self):
+        if not self.path:
+            return
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.entries, f)
+        os.replace(tmp_path, self.path)
@@ -0,0 +1,151 @@
+"""Continuous monitoring of the Wi-Fi link.
+
+The monitor samples the current connection with one 'show interfaces'
+query per interval and smooths its signal. Full scans only run while the
+link is degraded, and their interval backs off when they find nothing
+better. Separate trigger and recovery thresholds, a minimum dwell time
+after every switch and a roaming margin keep it from flapping between
+networks or access points.
+"""
+
+import threading
+import time
+from typing import Callable, Dict, Optional
+from utils.logger import setup_logger
+from config.settings import Config
+
+HEALTHY = 'healthy'
+DEGRADED = 'degraded'
+DISCONNECTED = 'disconnected'
+
+class ConnectionMonitor:
+    """Keeps the connection optimized with cheap link samples and occasional scans."""
+
+    def __init__(self, config: Config, network_manager, clock: Callable[[], float] = time.monotonic):
+        self.config = config
+        self.logger = setup_logger(__name__, config.get('log_level'))
+        self.manager = network_manager
+        self.clock = clock
+        self.stop_event = threading.Event()
+
+        self.state = HEALTHY
+        self.link = None
+        self.smoothed_signal = None
+        self.last_switch = None
+        self.next_scan = 0.0
+        self.scan_interval = config.get('min_scan_interval')
+        self.samples = 0
+        self.scans = 0
+        self.switches = 0
+
+    def run(self, max_cycles: Optional[int] = None):
+        """Monitor until stop() is called or max_cycles samples were taken."""
+        self.logger.info("Starting Wi-Fi monitor...")
+        cycles = 0
+        try:
+            while not self.stop_event.is_set():
+                delay = self.step()
+                cycles += 1
+                if max_cycles is not None and cycles >= max_cycles:
+                    break
+                self.stop_event.wait(delay)
+        finally:
+            self.logger.info(f"Wi-Fi monitor stopped after {self.samples} samples, "
+                             f"{self.scans} scans and {self.switches} switches")
+
+    def stop(self):
+        """Ask a running monitor to stop after the current cycle."""
+        self.stop_event.set()
+
+    def step(self) -> float:
+        """Take one link sample, scan and switch if warranted, and return the delay until the next one."""
+        now = self.clock()
+        connection = self.manager.connector.get_current_connection()
+        self.samples += 1
+        self._update_link(connection, now)
+
+        if self.state != HEALTHY and self._may_scan(now):
+            self._scan_and_switch(now)
+
+        if self.state == HEALTHY:
+            return self.config.get('monitor_interval')
+        return self.config.get('monitor_fast_interval')
+
+    def _update_link(self, connection: Optional[Dict], now: float):
+        """Fold a link sample into the smoothed signal and the link state."""
+        if connection is None:
+            if self.state != DISCONNECTED:
+                self.logger.warning("Wi-Fi link lost")
+            self.state = DISCONNECTED
+            self.link = None
+            self.smoothed_signal = None
+            return
+
+        link = (connection.get('ssid'), connection.get('bssid'))
+        signal = self.manager._extract_signal_percentage(connection.get('signal', '0%'))
+        self.manager.history.record(link[0], link[1], signal)
+        if link != self.link:
+            # A new network or AP, whether we switched or Windows roamed on its own
+            if self.link is not None:
+                self.logger.info(f"Link changed to {link[0]} ({link[1]})")
+                self.last_switch = now
+            self.link = link
+            self.smoothed_signal = signal
+        else:
+            alpha = self.config.get('signal_smoothing')
+            self.smoothed_signal += alpha * (signal - self.smoothed_signal)
+
+        # Hysteresis: degrade below the trigger, recover only above the higher recovery level
+        if self.smoothed_signal < self.config.get('roam_trigger_signal'):
+            if self.state != DEGRADED:
+                self.logger.info(f"Signal on {link[0]} degraded to {self.smoothed_signal:.0f}%")
+            self.state = DEGRADED
+        elif self.smoothed_signal >= self.config.get('roam_recover_signal') or self.state == DISCONNECTED:
+            if self.state != HEALTHY:
+                self.logger.info(f"Signal on {link[0]} is healthy at {self.smoothed_signal:.0f}%")
+                self.scan_interval = self.config.get('min_scan_interval')
+                self.next_scan = 0.0
+            self.state = HEALTHY
+
+    def _may_scan(self, now: float) -> bool:
+        """Whether a full scan is allowed now, given the dwell time and scan backoff."""
+        if now < self.next_scan:
+            return False
+        # A lost link is always worth a scan; a weak one only after the dwell time
+        if self.state == DEGRADED and self.last_switch is not None:
+            return now - self.last_switch >= self.config.get('min_dwell_time')
+        return True
+
+    def _scan_and_switch(self, now: float):
+        """Scan, switch if a network clears the roaming margin, and schedule the next scan."""
+        self.scans += 1
+        with self.manager.metrics.cycle('roam') as cycle:
+            # A scan another invocation made since the last sample is recent enough
+            networks = self.manager.scan_networks(max_age=self.config.get('monitor_fast_interval'))
+            current = None
+            if self.link is not None:
+                current = {'ssid': self.link[0], 'bssid': self.link[1], 'signal': f"{self.smoothed_signal:.0f}%"}
+            with self.manager.metrics.phase('select'):
+                best = self.manager._select_best_network(networks, current, self.config.get('roam_margin'))
+
+            switched = False
+            if best:
+                cycle['ssid'] = best['ssid']
+                self.logger.info(f"Switching to {best['ssid']} ({best.get('signal_strength')}% signal)")
+                try:
+                    switched = self.manager.switch_to_network(best, current)
+                except Exception as e:
+                    self.logger.error(f"Switch to {best['ssid']} failed: {e}")
+            cycle['outcome'] = 'switched' if switched else ('failed' if best else 'stayed')
+
+        if switched:
+            self.switches += 1
+            self.last_switch = now
+            self.scan_interval = self.config.get('min_scan_interval')
+            # Force a fresh baseline from the next sample of the new link
+            self.link = None
+            self.next_scan = now + self.scan_interval
+        else:
+            # Nothing better nearby: scan less often until the link changes
+            self.next_scan = now + self.scan_interval
+            self.scan_interval = min(self.scan_interval * 2, self.config.get('max_scan_interval'))
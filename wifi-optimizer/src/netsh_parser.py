@@ -0,0 +1,251 @@
+"""Single-pass parsers for netsh wlan output.
+
+netsh prints 'Label : value' lines whose labels are translated with the
+Windows display language. Each output kind has a table of labels per
+locale, compiled at import into one case-insensitive lookup from label to
+field name; a label that meant different fields in two locales would be a
+conflict and fails the import. Structural markers that netsh does not
+translate ('SSID n', 'BSSID n', the dashed rule above the profile list)
+drive the record boundaries, so every line is split once and looked up
+once. Values are converted to their types on the way: signal and channel
+become ints, BSSIDs are lowercased and interface states are normalized
+to the English names.
+"""
+
+from typing import Dict, Iterable, List, Optional, Tuple
+try:
+    from typing import TypedDict
+except ImportError:  # Python < 3.8
+    TypedDict = dict
+
+class AccessPointRecord(TypedDict):
+    ssid: str
+    bssid: str
+    signal_strength: int
+    channel: Optional[int]
+    band: str
+    radio_type: str
+    authentication: str
+    encryption: str
+
+class InterfaceRecord(TypedDict, total=False):
+    interface: str
+    state: str
+    ssid: str
+    bssid: str
+    channel: Optional[int]
+    band: str
+    radio_type: str
+    authentication: str
+    encryption: str
+    profile: str
+    signal: str
+    signal_strength: int
+
+class ProfileRecord(TypedDict):
+    name: str
+    authentication: str
+    encryption: str
+
+# 'show networks mode=bssid': network fields, then per-BSSID fields
+NETWORK_LABELS = {
+    'en': {'Network type': 'network_type', 'Authentication': 'authentication', 'Encryption': 'encryption',
+           'Signal': 'signal', 'Radio type': 'radio_type', 'Band': 'band', 'Channel': 'channel'},
+    'de': {'Netzwerktyp': 'network_type', 'Authentifizierung': 'authentication', 'Verschlüsselung': 'encryption',
+           'Signal': 'signal', 'Funktyp': 'radio_type', 'Band': 'band', 'Kanal': 'channel'},
+    'fr': {'Type de réseau': 'network_type', 'Authentification': 'authentication', 'Chiffrement': 'encryption',
+           'Signal': 'signal', 'Type de radio': 'radio_type', 'Bande': 'band', 'Canal': 'channel'},
+    'es': {'Tipo de red': 'network_type', 'Autenticación': 'authentication', 'Cifrado': 'encryption',
+           'Señal': 'signal', 'Tipo de radio': 'radio_type', 'Banda': 'band', 'Canal': 'channel'}
+}
+
+# 'show interfaces'; the 'interface' field starts a new interface
+INTERFACE_LABELS = {
+    'en': {'Name': 'interface', 'State': 'state', 'SSID': 'ssid', 'BSSID': 'bssid', 'AP BSSID': 'bssid',
+           'Radio type': 'radio_type', 'Authentication': 'authentication', 'Cipher': 'encryption',
+           'Band': 'band', 'Channel': 'channel', 'Signal': 'signal', 'Profile': 'profile'},
+    'de': {'Name': 'interface', 'Status': 'state', 'SSID': 'ssid', 'BSSID': 'bssid', 'AP BSSID': 'bssid',
+           'Funktyp': 'radio_type', 'Authentifizierung': 'authentication', 'Verschlüsselung': 'encryption',
+           'Band': 'band', 'Kanal': 'channel', 'Signal': 'signal', 'Profil': 'profile'},
+    'fr': {'Nom': 'interface', 'État': 'state', 'SSID': 'ssid', 'BSSID': 'bssid', 'AP BSSID': 'bssid',
+           'Type de radio': 'radio_type', 'Authentification': 'authentication', 'Chiffrement': 'encryption',
+           'Bande': 'band', 'Canal': 'channel', 'Signal': 'signal', 'Profil': 'profile'},
+    'es': {'Nombre': 'interface', 'Estado': 'state', 'SSID': 'ssid', 'BSSID': 'bssid', 'AP BSSID': 'bssid',
+           'Tipo de radio': 'radio_type', 'Autenticación': 'authentication', 'Cifrado': 'encryption',
+           'Banda': 'band', 'Canal': 'channel', 'Señal': 'signal', 'Perfil': 'profile'}
+}
+
+# 'show profile name=...'; only the first security pair is kept
+PROFILE_LABELS = {
+    'en': {'Authentication': 'authentication', 'Cipher': 'encryption'},
+    'de': {'Authentifizierung': 'authentication', 'Verschlüsselung': 'encryption'},
+    'fr': {'Authentification': 'authentication', 'Chiffrement': 'encryption'},
+    'es': {'Autenticación': 'authentication', 'Cifrado': 'encryption'}
+}
+
+STATE_VALUES = {
+    'en': {'connected': 'connected', 'disconnected': 'disconnected', 'associating': 'associating',
+           'authenticating': 'authenticating', 'disconnecting': 'disconnecting'},
+    'de': {'Verbunden': 'connected', 'Getrennt': 'disconnected', 'Zuordnen': 'associating',
+           'Authentifizierung': 'authenticating', 'Wird getrennt': 'disconnecting'},
+    'fr': {'connecté': 'connected', 'déconnecté': 'disconnected', 'association': 'associating',
+           'authentification': 'authenticating', 'déconnexion': 'disconnecting'},
+    'es': {'conectado': 'connected', 'desconectado': 'disconnected', 'asociando': 'associating',
+           'autenticando': 'authenticating', 'desconectando': 'disconnecting'}
+}
+
+def _compile(tables: Dict[str, Dict[str, str]]) -> Dict[str, str]:
+    """Merge per-locale tables into one case-insensitive lookup."""
+    compiled = {}
+    for locale, table in tables.items():
+        for label, field in table.items():
+            key = label.casefold()
+            if compiled.get(key, field) != field:
+                raise ValueError(f"netsh label '{label}' ({locale}) maps to both {compiled[key]} and {field}")
+            compiled[key] = field
+    return compiled
+
+NETWORK_FIELDS = _compile(NETWORK_LABELS)
+INTERFACE_FIELDS = _compile(INTERFACE_LABELS)
+PROFILE_FIELDS = _compile(PROFILE_LABELS)
+STATES = _compile(STATE_VALUES)
+
+def band_for_channel(channel: int) -> str:
+    """Band of a Wi-Fi channel, for netsh versions that do not print it."""
+    if 1 <= channel <= 14:
+        return '2.4 GHz'
+    if 32 <= channel <= 177:
+        return '5 GHz'
+    return 'Unknown'
+
+def _fields(output: str) -> Iterable[Tuple[str, str]]:
+    """(label, value) of every 'label : value' line, splitting each line once."""
+    for line in output.splitlines():
+        label, colon, value = line.partition(':')
+        if colon:
+            yield label.strip(), value.strip()
+
+def _percent(value: str) -> int:
+    # French puts a (non-breaking) space before the percent sign
+    digits = value.split('%', 1)[0].strip()
+    return int(digits) if digits.isdigit() else 0
+
+def _channel(value: str) -> Optional[int]:
+    return int(value) if value.isdigit() else None
+
+def _numbered(label: str) -> Optional[str]:
+    """'SSID' or 'BSSID' for the untranslated 'SSID n' / 'BSSID n' labels."""
+    head, _, number = label.rpartition(' ')
+    if number.isdigit() and head in ('SSID', 'BSSID'):
+        return head
+    return None
+
+def parse_networks(output: str) -> List[AccessPointRecord]:
+    """Access points from 'netsh wlan show networks mode=bssid'."""
+    access_points = []
+    network = None
+    access_point = None
+
+    for label, value in _fields(output):
+        numbered = _numbered(label)
+        if numbered == 'SSID':
+            network = {'ssid': value, 'authentication': 'Unknown', 'encryption': 'Unknown'}
+            access_point = None
+            continue
+        if network is None:
+            continue
+        if numbered == 'BSSID':
+            access_point = {
+                'ssid': network['ssid'],
+                'bssid': value.lower(),
+                'signal_strength': 0,
+                'channel': None,
+                'band': 'Unknown',
+                'radio_type': 'Unknown',
+                'authentication': network['authentication'],
+                'encryption': network['encryption']
+            }
+            access_points.append(access_point)
+            continue
+
+        field = NETWORK_FIELDS.get(label.casefold())
+        if field is None:
+            continue
+        if access_point is None:
+            # Network-level fields come before the first BSSID
+            if field in ('authentication', 'encryption'):
+                network[field] = value
+        elif field == 'signal':
+            access_point['signal_strength'] = _percent(value)
+        elif field == 'channel':
+            access_point['channel'] = _channel(value)
+        elif field in ('band', 'radio_type'):
+            access_point[field] = value
+
+    for access_point in access_points:
+        if access_point['band'] == 'Unknown' and access_point['channel'] is not None:
+            access_point['band'] = band_for_channel(access_point['channel'])
+    return access_points
+
+def parse_interfaces(output: str) -> List[InterfaceRecord]:
+    """Wireless interfaces from 'netsh wlan show interfaces', in the order printed."""
+    interfaces = []
+    interface = None
+
+    for label, value in _fields(output):
+        field = INTERFACE_FIELDS.get(label.casefold())
+        if field is None:
+            continue
+        if field == 'interface':
+            interface = {'interface': value}
+            interfaces.append(interface)
+        elif interface is None:
+            continue
+        elif field == 'state':
+            interface['state'] = STATES.get(value.casefold(), value.casefold())
+        elif field == 'bssid':
+            interface['bssid'] = value.lower()
+        elif field == 'channel':
+            interface['channel'] = _channel(value)
+        elif field == 'signal':
+            interface['signal'] = value
+            interface['signal_strength'] = _percent(value)
+        else:
+            interface[field] = value
+
+    return interfaces
+
+def parse_profiles(output: str) -> List[str]:
+    """Profile names from 'netsh wlan show profiles'.
+
+    Profiles are the 'label : name' lines below a dashed rule, whatever the
+    label says, so this works in every display language.
+    """
+    profiles = []
+    listing = False
+    for line in output.splitlines():
+        stripped = line.strip()
+        if stripped.startswith('---'):
+            listing = True
+            continue
+        if not listing:
+            continue
+        label, colon, value = stripped.partition(':')
+        value = value.strip()
+        # The same profile is listed again under every interface
+        if colon and value and value not in profiles:
+            profiles.append(value)
+    return profiles
+
+def parse_profile_details(output: str, profile_name: str) -> ProfileRecord:
+    """Authentication and cipher from 'netsh wlan show profile name=...'."""
+    details = {
+        'name': profile_name,
+        'authentication': 'Unknown',
+        'encryption': 'Unknown'
+    }
+    for label, value in _fields(output):
+        field = PROFILE_FIELDS.get(label.casefold())
+        if field and details[field] == 'Unknown':
+            details[field] = value
+    return details
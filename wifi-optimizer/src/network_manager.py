@@ -1,8 +1,17 @@
 """Main network management orchestrator."""
 
+import asyncio
+import os
 from typing import List, Dict, Optional
 from src.wifi_scanner import WiFiScanner
 from src.wifi_connector import WiFiConnector
+from src.command_runner import CommandRunner, MeteredRunner, create_runner
+from src.cycle_metrics import CycleMetrics
+from src.signal_history import SignalHistory, history_path
+from src.link_probe import LinkProbe, ProbeCache, probe_score
+from src.scoring import ScoringEngine
+from src.selection import assign_networks, rank_candidates, should_switch
+from src.scan_cache import ScanCache
 from utils.logger import setup_logger
 from utils.exceptions import WiFiOptimizerError
 from config.settings import Config
@@ -10,102 +19,289 @@ from config.settings import Config
 class NetworkManager:
     """Main class that orchestrates Wi-Fi scanning and connection."""
     
-    def __init__(self, config: Config):
+    def __init__(self, config: Config, runner: Optional[CommandRunner] = None):
         self.config = config
         self.logger = setup_logger(__name__, config.get('log_level'))
-        self.scanner = WiFiScanner(config)
-        self.connector = WiFiConnector(config)
+        self.metrics = CycleMetrics(config)
+        # One runner (and shell session) shared by scanning and connecting
+        self.runner = MeteredRunner(runner or create_runner(config), self.metrics)
+        self.scanner = WiFiScanner(config, self.runner, self.metrics)
+        self.connector = WiFiConnector(config, self.runner, self.metrics)
+        self.history = SignalHistory.from_config(config)
+        self.scoring = ScoringEngine(config, self.history)
+        self.scan_cache = ScanCache(config)
+        # Link probes are optional and need an echo target
+        self.prober = None
+        self.probes = None
+        if config.get('probe_enabled') and config.get('probe_host'):
+            self.prober = LinkProbe(config)
+            self.probes = ProbeCache(os.path.join(config.get('cache_dir'), 'probes.json'), config.get('probe_ttl'))
     
-    def optimize_wifi_connection(self) -> bool:
-        """Find and connect to the strongest available Wi-Fi network."""
+    def close(self):
+        """Save the signal history and probe results and stop the command runner."""
         try:
-            self.logger.info("Starting Wi-Fi optimization...")
-            
-            # Get current connection info
-            current_connection = self.connector.get_current_connection()
-            if current_connection:
-                self.logger.info(f"Currently connected to: {current_connection.get('ssid')}")
-            
-            # Scan for available networks
-            networks = self.scanner.scan_networks()
-            if not networks:
-                self.logger.warning("No Wi-Fi networks found")
-                return False
-            
-            # Filter and sort networks
-            best_network = self._select_best_network(networks, current_connection)
-            if not best_network:
-                self.logger.info("No better network found")
-                return False
-            
-            # Connect to the best network
-            if self.connector.connect_to_network(best_network):
-                self.logger.info(f"Successfully optimized connection to: {best_network['ssid']}")
-                return True
-            else:
-                self.logger.error(f"Failed to connect to optimal network: {best_network['ssid']}")
-                return False
+            path = history_path(self.config)
+            if path and len(self.history):
+                self.history.save(path)
+            if self.probes is not None:
+                self.probes.save()
+        except OSError as e:
+            self.logger.warning(f"Could not save signal history or probe results: {e}")
+        self.runner.close()
+    
+    def scan_networks(self, max_age: Optional[float] = None, refresh: bool = False) -> List[Dict]:
+        """Networks from a scan at most max_age seconds old, scanning (and recording the signal) if needed."""
+        networks, scanned = self.scan_cache.get_or_scan(self.scanner.scan_networks, max_age, refresh)
+        if scanned:
+            self.history.record_networks(networks)
+        else:
+            self.metrics.increment('scan_cache_hits')
+        return networks
+    
+    def optimize_wifi_connection(self, max_age: Optional[float] = None, refresh: bool = False) -> bool:
+        """Find and connect to the strongest available Wi-Fi network."""
+        with self.metrics.cycle('optimize') as cycle:
+            try:
+                self.logger.info("Starting Wi-Fi optimization...")
                 
-        except Exception as e:
-            self.logger.error(f"Wi-Fi optimization failed: {e}")
-            return False
+                # One interface snapshot and one scan, queried concurrently
+                with self.metrics.phase('survey'):
+                    interfaces_snapshot, networks = asyncio.run(self._survey(max_age, refresh))
+                
+                # Get current connection info
+                current_connection = self.connector.get_current_connection(interfaces_snapshot)
+                if current_connection:
+                    self.logger.info(f"Currently connected to: {current_connection.get('ssid')}")
+                    if self.prober is not None:
+                        self.measure_link(current_connection)
+                
+                if not networks:
+                    self.logger.warning("No Wi-Fi networks found")
+                    cycle['outcome'] = 'no_networks'
+                    return False
+                
+                # Filter and sort networks
+                with self.metrics.phase('select'):
+                    best_network = self._select_best_network(networks, current_connection)
+                if not best_network:
+                    self.logger.info("No better network found")
+                    cycle['outcome'] = 'stayed'
+                    return False
+                
+                # Connect to the best network
+                cycle['ssid'] = best_network['ssid']
+                if self.switch_to_network(best_network, current_connection, interfaces_snapshot):
+                    self.logger.info(f"Successfully optimized connection to: {best_network['ssid']}")
+                    cycle['outcome'] = 'switched'
+                    return True
+                else:
+                    self.logger.error(f"Failed to switch to optimal network: {best_network['ssid']}")
+                    cycle['outcome'] = 'failed'
+                    return False
+                    
+            except Exception as e:
+                self.logger.error(f"Wi-Fi optimization failed: {e}")
+                cycle['outcome'] = 'error'
+                return False
     
-    def _select_best_network(self, networks: List[Dict], current_connection: Optional[Dict]) -> Optional[Dict]:
-        """Select the best network based on signal strength and preferences."""
-        
-        # Filter networks
-        valid_networks = []
-        blacklisted = self.config.get('blacklisted_networks', [])
-        signal_threshold = self.config.get('signal_threshold', -70)
+    def optimize_all_interfaces(self, min_improvement: int = 10) -> bool:
+        """Choose a network for every wireless adapter, spreading them over channels, and connect each.
         
-        for network in networks:
-            # Skip blacklisted networks
-            if network['ssid'] in blacklisted:
-                continue
+        Every adapter scans at the same time; the scans are not taken from or
+        written to the scan cache, which holds the default adapter's view.
+        With fewer than two adapters this is optimize_wifi_connection.
+        """
+        with self.metrics.cycle('optimize_all') as cycle:
+            try:
+                interfaces_snapshot = self.connector.snapshot_interfaces()
+                if interfaces_snapshot is None:
+                    self.logger.error("Could not list wireless interfaces")
+                    cycle['outcome'] = 'failed'
+                    return False
+                names = [interface['interface'] for interface in self.connector.list_interfaces(interfaces_snapshot)]
+                if len(names) < 2:
+                    return self.optimize_wifi_connection()
                 
-            # Skip networks with weak signal
-            signal_strength = network.get('signal_strength', 0)
-            if signal_strength < abs(signal_threshold):  # Convert dBm to percentage comparison
-                continue
+                self.logger.info(f"Optimizing {len(names)} wireless adapters: {', '.join(names)}")
+                adapters = {
+                    name: (WiFiScanner(self.config, self.runner, self.metrics, name),
+                           WiFiConnector(self.config, self.runner, self.metrics, name))
+                    for name in names
+                }
+                with self.metrics.phase('survey'):
+                    scans = asyncio.run(self._scan_interfaces(adapters))
+                if not any(scans.values()):
+                    self.logger.warning("No Wi-Fi networks found")
+                    cycle['outcome'] = 'no_networks'
+                    return False
                 
-            # Only include networks we have profiles for
-            if not network.get('has_profile'):
-                continue
+                current_connections = {
+                    name: connector.get_current_connection(interfaces_snapshot)
+                    for name, (_, connector) in adapters.items()
+                }
+                with self.metrics.phase('select'):
+                    assignments = assign_networks(self.config, self.scoring, scans, current_connections,
+                                                  min_improvement)
+                switches = {name: network for name, network in assignments.items() if network}
+                if not switches:
+                    self.logger.info("No better network found for any adapter")
+                    cycle['outcome'] = 'stayed'
+                    return False
+                
+                cycle['assignments'] = {name: network['ssid'] for name, network in switches.items()}
+                results = asyncio.run(self._connect_interfaces(adapters, switches, interfaces_snapshot))
+                failed = [name for name, connected in results.items() if not connected]
+                if failed:
+                    self.logger.error(f"Failed to switch {', '.join(failed)} to the assigned networks")
+                    cycle['outcome'] = 'failed'
+                    return False
+                for name, network in switches.items():
+                    self.logger.info(f"{name} now on {network['ssid']} ({network.get('bssid')}, "
+                                     f"channel {network.get('channel')})")
+                cycle['outcome'] = 'switched'
+                return True
                 
-            valid_networks.append(network)
+            except Exception as e:
+                self.logger.error(f"Multi-adapter optimization failed: {e}")
+                cycle['outcome'] = 'error'
+                return False
+    
+    async def _scan_interfaces(self, adapters: Dict) -> Dict[str, List[Dict]]:
+        """Scan with every adapter at once; an adapter whose scan fails sees no networks."""
+        names = list(adapters)
+        results = await asyncio.gather(*(adapters[name][0].scan_networks_async() for name in names),
+                                       return_exceptions=True)
+        scans = {}
+        for name, networks in zip(names, results):
+            if isinstance(networks, Exception):
+                self.logger.warning(f"Scan on {name} failed: {networks}")
+                networks = []
+            self.history.record_networks(networks)
+            scans[name] = networks
+        return scans
+    
+    async def _connect_interfaces(self, adapters: Dict, switches: Dict[str, Dict],
+                                  interfaces_snapshot: Optional[str]) -> Dict[str, bool]:
+        """Connect the adapters to their assigned networks concurrently, returning which succeeded."""
+        loop = asyncio.get_running_loop()
+        names = list(switches)
+        results = await asyncio.gather(*(
+            loop.run_in_executor(None, adapters[name][1].connect_to_network, switches[name], interfaces_snapshot)
+            for name in names
+        ), return_exceptions=True)
+        connected = {}
+        for name, result in zip(names, results):
+            if isinstance(result, Exception):
+                self.logger.error(f"Connecting {name} failed: {result}")
+            connected[name] = result is True
+        return connected
+    
+    def switch_to_network(self, network: Dict, current_connection: Optional[Dict],
+                          interfaces_snapshot: Optional[str] = None) -> bool:
+        """Connect to a network and, with probing on, keep it only if it is not slower than the old link."""
+        if not self.connector.connect_to_network(network, interfaces_snapshot):
+            return False
+        if self.prober is None or not current_connection:
+            return True
         
-        if not valid_networks:
+        previous = self.probes.get(current_connection.get('ssid'), current_connection.get('bssid'))
+        result = self.measure_link(self.connector.get_current_connection())
+        if previous and result and probe_score(result) < probe_score(previous):
+            self.logger.info(f"{network['ssid']} measured slower than {current_connection.get('ssid')}; switching back")
+            self.connector.connect_to_network(current_connection)
+            return False
+        return True
+    
+    def measure_link(self, connection: Optional[Dict]) -> Optional[Dict]:
+        """Probe result for the current link, measuring it unless a fresh one is cached."""
+        if self.prober is None or not connection:
             return None
+        ssid, bssid = connection.get('ssid'), connection.get('bssid')
+        result = self.probes.get(ssid, bssid)
+        if result is None:
+            with self.metrics.phase('probe'):
+                result = self.prober.measure()
+            if result:
+                self.logger.info(f"Measured {ssid}: {result['rtt_ms']:.1f} ms RTT, "
+                                 f"{result['jitter_ms']:.1f} ms jitter, {result['throughput_kbps']:.0f} kbit/s")
+                self.probes.put(ssid, bssid, result)
+        return result
+    
+    async def _survey(self, max_age: Optional[float] = None, refresh: bool = False):
+        """Take the interface snapshot and get the networks for one cycle, scanning concurrently if needed."""
+        if not refresh:
+            networks = self.scan_cache.get(max_age)
+            if networks is not None:
+                self.metrics.increment('scan_cache_hits')
+                return await self.connector.snapshot_interfaces_async(), networks
+        # The cached scan waits on other invocations' scans, so it runs on a worker thread
+        loop = asyncio.get_running_loop()
+        return await asyncio.gather(
+            self.connector.snapshot_interfaces_async(),
+            loop.run_in_executor(None, self.scan_networks, max_age, refresh)
+        )
+    
+    def _select_best_network(self, networks: List[Dict], current_connection: Optional[Dict],
+                             min_improvement: int = 10) -> Optional[Dict]:
+        """Select the access point with the best expected throughput, preferred networks first.
         
-        # Sort by preference and signal strength
-        preferred_networks = self.config.get('preferred_networks', [])
-        
-        def network_score(network):
-            score = network.get('signal_strength', 0)
-            
-            # Boost score for preferred networks
-            if network['ssid'] in preferred_networks:
-                score += 1000  # High boost for preferred
-            
-            return score
+        The returned network carries the BSSID, channel and signal of the chosen
+        access point. To replace the current link it must score at least
+        min_improvement percent higher.
+        """
+        ranked, scores, current_score = rank_candidates(self.config, self.scoring, networks, current_connection)
+        if not ranked:
+            return None
         
-        # Sort networks by score (descending)
-        valid_networks.sort(key=network_score, reverse=True)
+        best_network = ranked[0]
+        best_score = scores[0]
+        self.logger.debug(f"Best access point {best_network['ssid']} ({best_network.get('bssid')}): "
+                          f"{best_score:.0f} Mbit/s expected")
         
-        best_network = valid_networks[0]
+        if self.probes is not None:
+            best_network = self._fastest_measured(ranked, best_network)
+            best_score = scores[ranked.index(best_network)]
         
         # Check if we should switch
-        if current_connection:
-            current_ssid = current_connection.get('ssid')
-            current_signal = self._extract_signal_percentage(current_connection.get('signal', '0%'))
-            
-            # Only switch if the improvement is significant (>10%)
-            if (current_ssid == best_network['ssid'] or 
-                best_network['signal_strength'] - current_signal < 10):
-                return None
+        if current_connection and self.probes is not None:
+            best_result = self.probes.get(best_network['ssid'], best_network.get('bssid'))
+            current_result = self.probes.get(current_connection.get('ssid'), current_connection.get('bssid'))
+            if best_result and current_result:
+                # Both links were measured: switch on speed, not signal
+                if (current_connection.get('ssid') == best_network['ssid'] and
+                    current_connection.get('bssid') == best_network.get('bssid')):
+                    return None
+                margin = 1 + self.config.get('probe_margin')
+                if probe_score(best_result) < probe_score(current_result) * margin:
+                    return None
+                return best_network
+        
+        if not should_switch(self.config, best_network, best_score, current_connection, current_score,
+                             min_improvement):
+            return None
         
         return best_network
     
+    def _fastest_measured(self, ranked_networks: List[Dict], best_network: Dict) -> Dict:
+        """The measured network that is fastest, if the top-scored one was measured too.
+        
+        An unmeasured top-scored network is kept so that new networks get tried
+        and measured; preferred networks still win over others.
+        """
+        if self.probes.get(best_network['ssid'], best_network.get('bssid')) is None:
+            return best_network
+        preferred_networks = self.config.get('preferred_networks', [])
+        preferred = best_network['ssid'] in preferred_networks
+        fastest, fastest_score = best_network, None
+        for network in ranked_networks:
+            result = self.probes.get(network['ssid'], network.get('bssid'))
+            if result is None or (network['ssid'] in preferred_networks) != preferred:
+                continue
+            score = probe_score(result)
+            if fastest_score is None or score > fastest_score:
+                fastest, fastest_score = network, score
+        return fastest
+    
     def _extract_signal_percentage(self, signal_str: str) -> int:
         """Extract signal percentage from string like '85%'."""
         try:
@@ -113,19 +309,25 @@ class NetworkManager:
         except:
             return 0
     
-    def get_network_status(self) -> Dict:
+    def get_network_status(self, max_age: Optional[float] = None, refresh: bool = False) -> Dict:
         """Get comprehensive network status information."""
         status = {
-            'current_connection': self.connector.get_current_connection(),
+            'current_connection': None,
             'available_networks': [],
             'timestamp': None
         }
         
-        try:
-            import datetime
-            status['timestamp'] = datetime.datetime.now().isoformat()
-            status['available_networks'] = self.scanner.scan_networks()
-        except Exception as e:
-            self.logger.error(f"Error getting network status: {e}")
+        with self.metrics.cycle('status') as cycle:
+            try:
+                import datetime
+                status['timestamp'] = datetime.datetime.now().isoformat()
+                with self.metrics.phase('survey'):
+                    interfaces_snapshot, status['available_networks'] = asyncio.run(self._survey(max_age, refresh))
+                status['current_connection'] = self.connector.get_current_connection(interfaces_snapshot)
+                cycle['outcome'] = 'ok'
+            except Exception as e:
+                self.logger.error(f"Error getting network status: {e}")
+                status['current_connection'] = self.connector.get_current_connection()
+                cycle['outcome'] = 'error'
         
         return status
\ No newline at end of file
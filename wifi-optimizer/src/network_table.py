@@ -0,0 +1,75 @@
+"""Access-point table built from 'netsh wlan show networks mode=bssid'."""
+
+from typing import Dict, Iterator, List, Optional, Tuple
+from src.netsh_parser import parse_networks
+
+class NetworkTable:
+    """Visible access points indexed by (SSID, BSSID) and by SSID.
+
+    Each access point is a dict with ssid, bssid, signal_strength (%),
+    channel, band, radio_type, authentication and encryption; the last two
+    are network-level values repeated on every AP of an SSID.
+    """
+
+    def __init__(self):
+        self.access_points: Dict[Tuple[str, str], Dict] = {}
+        self.by_ssid: Dict[str, List[Dict]] = {}
+
+    @classmethod
+    def from_netsh(cls, output: str) -> 'NetworkTable':
+        """Build the table from 'show networks mode=bssid' output."""
+        table = cls()
+        for access_point in parse_networks(output):
+            table.add(access_point)
+        return table
+
+    def add(self, access_point: Dict):
+        """Add or replace an access point."""
+        key = (access_point['ssid'], access_point['bssid'])
+        previous = self.access_points.get(key)
+        self.access_points[key] = access_point
+        access_points = self.by_ssid.setdefault(access_point['ssid'], [])
+        if previous is not None:
+            access_points.remove(previous)
+        access_points.append(access_point)
+
+    def get(self, ssid: str, bssid: str) -> Optional[Dict]:
+        return self.access_points.get((ssid, bssid.lower()))
+
+    def ssids(self) -> List[str]:
+        return list(self.by_ssid)
+
+    def access_points_for(self, ssid: str) -> List[Dict]:
+        """Access points of an SSID, strongest first."""
+        return sorted(self.by_ssid.get(ssid, []), key=lambda ap: ap['signal_strength'], reverse=True)
+
+    def best_access_point(self, ssid: str) -> Optional[Dict]:
+        return max(self.by_ssid.get(ssid, []), key=lambda ap: ap['signal_strength'], default=None)
+
+    def merge_profiles(self, profiles: List[Dict]) -> List[Dict]:
+        """One entry per visible SSID we have a profile for, with its access points strongest first."""
+        merged = []
+        for profile in profiles:
+            access_points = self.access_points_for(profile['name'])
+            if not access_points:
+                continue
+            best = access_points[0]
+            merged.append({
+                'ssid': profile['name'],
+                'signal_strength': best['signal_strength'],
+                'bssid': best['bssid'],
+                'channel': best['channel'],
+                'band': best['band'],
+                'authentication': profile.get('authentication', 'Unknown'),
+                'encryption': profile.get('encryption', 'Unknown'),
+                'available': True,
+                'has_profile': True,
+                'access_points': access_points
+            })
+        return merged
+
+    def __len__(self) -> int:
+        return len(self.access_points)
+
+    def __iter__(self) -> Iterator[Dict]:
+        return iter(self.access_points.values())
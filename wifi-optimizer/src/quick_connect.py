@@ -0,0 +1,144 @@
+"""One-shot connect to the best known network with as few netsh calls as possible.
+
+Meant to run at logon. It sends the access point scan and the interface
+query concurrently, takes the known profiles from the profile cache left
+by full scans, and chooses with the same ranking as NetworkManager, so
+the decision waits on two netsh queries. When there is no profile cache
+yet, no other network is known to work, so a connected adapter stays
+where it is; only without a link to lose is the profile list queried as
+well. Only the modules this path needs are imported: no
+asyncio, no profile export and no link probing.
+"""
+
+import json
+import os
+import subprocess
+import threading
+from typing import Dict, List, Optional
+from utils.logger import setup_logger
+from config.settings import Config
+from src.command_runner import CommandRunner, MeteredRunner, SubprocessRunner
+from src.cycle_metrics import CycleMetrics
+from src.netsh_parser import parse_profiles
+from src.network_table import NetworkTable
+from src.scan_cache import ScanCache
+from src.scoring import ScoringEngine
+from src.selection import rank_candidates, should_switch
+from src.signal_history import SignalHistory, history_path
+from src.wifi_connector import WiFiConnector
+
+NETWORKS_COMMAND = ['netsh', 'wlan', 'show', 'networks', 'mode=bssid']
+INTERFACES_COMMAND = ['netsh', 'wlan', 'show', 'interfaces']
+PROFILES_COMMAND = ['netsh', 'wlan', 'show', 'profile']
+
+class QuickConnect:
+    """Connects to the best known network after two concurrent netsh queries while a link is up."""
+
+    def __init__(self, config: Config, runner: Optional[CommandRunner] = None):
+        self.config = config
+        self.logger = setup_logger(__name__, config.get('log_level'))
+        self.metrics = CycleMetrics(config)
+        # Two short-lived processes cost less than starting a shell session
+        self.runner = MeteredRunner(runner or SubprocessRunner(), self.metrics)
+        self.connector = WiFiConnector(config, self.runner, self.metrics)
+        self.history = SignalHistory.from_config(config)
+        self.scoring = ScoringEngine(config, self.history)
+
+    def close(self):
+        """Save the signal history and stop the command runner."""
+        try:
+            path = history_path(self.config)
+            if path and len(self.history):
+                self.history.save(path)
+        except OSError as e:
+            self.logger.warning(f"Could not save signal history: {e}")
+        self.runner.close()
+
+    def run(self, min_improvement: int = 10) -> bool:
+        """Connect to the best known network, returning whether we end up on a good one."""
+        with self.metrics.cycle('quick') as cycle:
+            connected = self._run(cycle, min_improvement)
+            if cycle['outcome'] is None:
+                cycle['outcome'] = 'switched' if connected else 'failed'
+            return connected
+
+    def _run(self, cycle: Dict, min_improvement: int) -> bool:
+        profiles = self._cached_profiles()
+        outputs = self._query({'scan': NETWORKS_COMMAND, 'interfaces': INTERFACES_COMMAND})
+
+        if outputs['scan'] is None:
+            self.logger.error("Network scan failed")
+            return False
+        interfaces_snapshot = outputs['interfaces']
+        if interfaces_snapshot is None:
+            # Without the current link any switch could drop a working connection
+            self.logger.error("Could not query the Wi-Fi interfaces")
+            return False
+        current_connection = self.connector.get_current_connection(interfaces_snapshot)
+
+        if profiles is None and current_connection:
+            # Without the profile list no other network is known to work
+            self.logger.info(f"Staying on {current_connection.get('ssid')} until a full scan caches the profiles")
+            cycle['outcome'] = 'stayed'
+            return True
+        if profiles is None:
+            # There is no link to lose, so the profile list may follow the other queries
+            outputs.update(self._query({'profiles': PROFILES_COMMAND}))
+            if outputs['profiles'] is None:
+                self.logger.error("Could not list Wi-Fi profiles")
+                return False
+            profiles = [{'name': name} for name in parse_profiles(outputs['profiles'])]
+
+        with self.metrics.phase('select'):
+            networks = NetworkTable.from_netsh(outputs['scan']).merge_profiles(profiles)
+            self.history.record_networks(networks)
+            ScanCache(self.config).put(networks)
+            ranked, scores, current_score = rank_candidates(self.config, self.scoring, networks, current_connection)
+        if not ranked:
+            self.logger.warning("No known Wi-Fi network is in range")
+            cycle['outcome'] = 'no_networks'
+            return False
+        best_network = ranked[0]
+        if not should_switch(self.config, best_network, scores[0], current_connection, current_score,
+                             min_improvement):
+            self.logger.info(f"Staying on {current_connection.get('ssid')}")
+            cycle['outcome'] = 'stayed'
+            return True
+
+        self.logger.info(f"Best known network: {best_network['ssid']} ({scores[0]:.0f} Mbit/s expected)")
+        cycle['ssid'] = best_network['ssid']
+        return self.connector.connect_to_network(best_network, interfaces_snapshot)
+
+    def _cached_profiles(self) -> Optional[List[Dict]]:
+        """Profile details from the cache written by WiFiScanner, or None if there is none."""
+        cache_file = os.path.join(self.config.get('cache_dir'), 'profiles.json')
+        try:
+            with open(cache_file, 'r', encoding='utf-8') as f:
+                cached = json.load(f)
+            details = cached['details']
+            return [details[name] for name in cached['profiles'] if name in details]
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            self.logger.warning(f"Ignoring unreadable profile cache {cache_file}: {e}")
+            return None
+
+    def _query(self, queries: Dict[str, List[str]]) -> Dict[str, Optional[str]]:
+        """Run the queries concurrently, each timed as the phase it is keyed by; a failed query gives None."""
+        outputs = {}
+
+        def run(name: str, cmd: List[str]):
+            try:
+                with self.metrics.phase(name):
+                    result = self.runner.run(cmd, timeout=self.config.get('scan_timeout'))
+                outputs[name] = result.stdout if result.returncode == 0 else None
+            except (subprocess.TimeoutExpired, OSError) as e:
+                self.logger.error(f"{' '.join(cmd[2:])} failed: {e}")
+                outputs[name] = None
+
+        threads = [threading.Thread(target=run, args=query) for query in queries.items()]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return outputs
@@ -0,0 +1,149 @@
+"""Scan results shared between invocations of the optimizer.
+
+The merged network list of the last scan is written atomically to a JSON
+file in the cache directory together with its scan time, so a status
+query within the TTL is answered without running netsh. A lock file next
+to it makes concurrent invocations wait for a scan that is already
+running instead of starting another one.
+"""
+
+import json
+import os
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+from utils.logger import setup_logger
+from config.settings import Config
+
+CACHE_FORMAT = 1
+LOCK_POLL_INTERVAL = 0.05
+
+class ScanCache:
+    """Last scan result on disk, valid for 'scan_cache_ttl' seconds."""
+
+    def __init__(self, config: Config, clock: Callable[[], float] = time.time):
+        self.config = config
+        self.logger = setup_logger(__name__, config.get('log_level'))
+        self.clock = clock
+        self.ttl = config.get('scan_cache_ttl')
+        name = config.get('scan_cache_file')
+        self.path = os.path.join(config.get('cache_dir'), name) if name else None
+        self.lock_path = f"{self.path}.lock" if self.path else None
+        self.holds_lock = False
+
+    def load(self) -> Optional[Tuple[float, List[Dict]]]:
+        """Scan time and networks of the cached scan, or None."""
+        if not self.path or not os.path.exists(self.path):
+            return None
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+            if entry.get('format') != CACHE_FORMAT:
+                return None
+            return entry['time'], entry['networks']
+        except (OSError, ValueError, KeyError) as e:
+            self.logger.warning(f"Ignoring unreadable scan cache {self.path}: {e}")
+            return None
+
+    def get(self, max_age: Optional[float] = None) -> Optional[List[Dict]]:
+        """Cached networks if they are at most max_age (default: the TTL) seconds old."""
+        max_age = self.ttl if max_age is None else max_age
+        cached = self.load()
+        if cached is None:
+            return None
+        scanned_at, networks = cached
+        age = self.clock() - scanned_at
+        if age < 0 or age > max_age:
+            return None
+        self.logger.debug(f"Using scan from {age:.1f}s ago")
+        return networks
+
+    def put(self, networks: List[Dict], scanned_at: Optional[float] = None):
+        """Replace the cached scan atomically."""
+        if not self.path:
+            return
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        entry = {
+            'format': CACHE_FORMAT,
+            'time': self.clock() if scanned_at is None else scanned_at,
+            'networks': networks
+        }
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(entry, f)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            self.logger.warning(f"Could not write scan cache {self.path}: {e}")
+
+    def get_or_scan(self, scan: Callable[[], List[Dict]], max_age: Optional[float] = None,
+                    refresh: bool = False) -> Tuple[List[Dict], bool]:
+        """Cached networks, or the result of scan(); the flag tells whether scan() ran.
+
+        Only one invocation scans at a time. One that waited for another's
+        scan uses its result if it is recent enough, or with refresh, if that
+        scan started after the request.
+        """
+        if not refresh:
+            networks = self.get(max_age)
+            if networks is not None:
+                return networks, False
+        if not self.path:
+            return scan(), True
+
+        requested_at = self.clock()
+        waited = self._acquire_lock()
+        try:
+            if waited:
+                if refresh:
+                    cached = self.load()
+                    if cached is not None and cached[0] >= requested_at:
+                        return cached[1], False
+                else:
+                    networks = self.get(max_age)
+                    if networks is not None:
+                        return networks, False
+            scanned_at = self.clock()
+            networks = scan()
+            self.put(networks, scanned_at)
+            return networks, True
+        finally:
+            self._release_lock()
+
+    def _acquire_lock(self) -> bool:
+        """Take the scan lock, returning whether another scan had to be waited for."""
+        os.makedirs(os.path.dirname(self.lock_path) or '.', exist_ok=True)
+        timeout = self.config.get('scan_timeout')
+        deadline = time.monotonic() + timeout
+        waited = False
+        while True:
+            try:
+                fd = os.open(self.lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+                os.write(fd, str(os.getpid()).encode('ascii'))
+                os.close(fd)
+                self.holds_lock = True
+                return waited
+            except FileExistsError:
+                pass
+            waited = True
+            try:
+                # A lock older than two scan timeouts was left by a process that died
+                if time.time() - os.path.getmtime(self.lock_path) > 2 * timeout:
+                    self.logger.warning(f"Removing stale scan lock {self.lock_path}")
+                    os.remove(self.lock_path)
+                    continue
+            except OSError:
+                continue
+            if time.monotonic() >= deadline:
+                self.logger.warning("Timed out waiting for another scan; scanning anyway")
+                return waited
+            time.sleep(LOCK_POLL_INTERVAL)
+
+    def _release_lock(self):
+        # After a lock timeout the lock file belongs to the other scan
+        if not self.holds_lock:
+            return
+        self.holds_lock = False
+        try:
+            os.remove(self.lock_path)
+        except OSError:
+            pass
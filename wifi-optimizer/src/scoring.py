@@ -0,0 +1,144 @@
+"""Expected-throughput scoring of candidate access points.
+
+A candidate's score estimates the throughput it would give us in Mbit/s:
+the capacity of its band, scaled by what its signal allows, by the share
+of airtime left after the other access points on overlapping channels,
+and by the rate limit of its security type. Each of these is a factor
+computed for the whole candidate set at once from column lists; more
+factors can be added with ScoringEngine.add_factor.
+"""
+
+from collections import defaultdict
+from typing import Callable, Dict, List, Optional
+from config.settings import Config
+from src.netsh_parser import band_for_channel
+
+# Windows reports link quality as a percentage that is linear in RSSI:
+# 0% at -100 dBm and 100% at -50 dBm
+MIN_DBM = -100
+MAX_DBM = -50
+
+# Usable throughput falls from its maximum at -50 dBm to nothing at -90 dBm
+RATE_FLOOR_DBM = -90
+
+# Legacy ciphers limit 802.11n and later radios to 54 Mbit/s rates
+LEGACY_CIPHERS = ('TKIP', 'WEP')
+
+Columns = Dict[str, List]
+Factor = Callable[[Columns, Dict], List[float]]
+
+def percent_to_dbm(percent: float) -> float:
+    """Convert a Windows signal quality percentage to dBm."""
+    percent = min(max(percent, 0), 100)
+    return MIN_DBM + percent * (MAX_DBM - MIN_DBM) / 100
+
+def dbm_to_percent(dbm: float) -> float:
+    """Convert dBm to a Windows signal quality percentage."""
+    dbm = min(max(dbm, MIN_DBM), MAX_DBM)
+    return (dbm - MIN_DBM) * 100 / (MAX_DBM - MIN_DBM)
+
+def channel_overlap(band: str, channel: int, other_band: str, other_channel: int) -> float:
+    """Fraction of a 20 MHz channel shared with another one."""
+    if band != other_band:
+        return 0.0
+    if band == '2.4 GHz':
+        # 2.4 GHz channels are 5 MHz apart, so 20 MHz channels overlap up to four away
+        return max(0.0, 1 - abs(channel - other_channel) / 5)
+    return 1.0 if channel == other_channel else 0.0
+
+def access_point_band(access_point: Dict) -> str:
+    """Band of an access point, derived from its channel when netsh did not print it."""
+    band = access_point.get('band') or 'Unknown'
+    if band == 'Unknown' and access_point.get('channel'):
+        band = band_for_channel(int(access_point['channel']))
+    return band
+
+def rate_factor(columns: Columns, context: Dict) -> List[float]:
+    """Band capacity in Mbit/s scaled by the signal margin above RATE_FLOOR_DBM."""
+    capacity = context['band_capacity']
+    default = capacity.get('Unknown', min(capacity.values()))
+    return [
+        capacity.get(band, default) * min(max((dbm - RATE_FLOOR_DBM) / (MAX_DBM - RATE_FLOOR_DBM), 0.0), 1.0)
+        for band, dbm in zip(columns['band'], columns['signal_dbm'])
+    ]
+
+def congestion_factor(columns: Columns, context: Dict) -> List[float]:
+    """Airtime share left by the other access points on overlapping channels.
+
+    Each other access point counts with its overlap and its relative signal,
+    so a faint neighbour costs less airtime than a loud one.
+    """
+    load = context['channel_load']
+    shares = []
+    for band, channel, weight in zip(columns['band'], columns['channel'], columns['weight']):
+        if channel is None:
+            shares.append(1.0)
+            continue
+        competing = sum(
+            channel_overlap(band, channel, other_band, other_channel) * other_load
+            for (other_band, other_channel), other_load in load.items()
+        )
+        # The candidate itself is part of the load on its own channel
+        shares.append(1 / (1 + max(competing - weight, 0.0)))
+    return shares
+
+def security_factor(columns: Columns, context: Dict) -> List[float]:
+    """Rate limit of legacy ciphers."""
+    return [0.5 if encryption.upper() in LEGACY_CIPHERS else 1.0 for encryption in columns['encryption']]
+
+DEFAULT_FACTORS = {
+    'rate': rate_factor,
+    'congestion': congestion_factor,
+    'security': security_factor
+}
+
+class ScoringEngine:
+    """Scores candidate access points by expected throughput in Mbit/s."""
+
+    def __init__(self, config: Config, history=None):
+        self.config = config
+        self.history = history
+        self.factors: Dict[str, Factor] = dict(DEFAULT_FACTORS)
+
+    def add_factor(self, name: str, factor: Factor):
+        """Add or replace a factor; it returns one multiplier per candidate."""
+        self.factors[name] = factor
+
+    def columns(self, candidates: List[Dict]) -> Columns:
+        """Per-candidate values the factors work on, one list per attribute."""
+        columns = defaultdict(list)
+        for candidate in candidates:
+            percent = candidate.get('signal_strength', 0)
+            if self.history is not None:
+                # Smoothed and penalized for instability once there is history
+                percent = self.history.expected_signal(candidate['ssid'], candidate.get('bssid'), percent)
+            channel = candidate.get('channel')
+            columns['signal_dbm'].append(percent_to_dbm(percent))
+            columns['weight'].append(candidate.get('signal_strength', 0) / 100)
+            columns['band'].append(access_point_band(candidate))
+            columns['channel'].append(int(channel) if channel else None)
+            columns['encryption'].append(candidate.get('encryption') or '')
+        return columns
+
+    def context(self, scan: List[Dict]) -> Dict:
+        """Values shared by every candidate: the band capacities and the load per channel."""
+        load = defaultdict(float)
+        for access_point in scan:
+            if access_point.get('channel'):
+                key = (access_point_band(access_point), int(access_point['channel']))
+                load[key] += access_point.get('signal_strength', 0) / 100
+        return {
+            'band_capacity': self.config.get('band_capacity_mbps'),
+            'channel_load': dict(load)
+        }
+
+    def score(self, candidates: List[Dict], scan: Optional[List[Dict]] = None) -> List[float]:
+        """Expected throughput of each candidate; scan is every visible access point."""
+        if not candidates:
+            return []
+        columns = self.columns(candidates)
+        context = self.context(candidates if scan is None else scan)
+        scores = [1.0] * len(candidates)
+        for factor in self.factors.values():
+            scores = [score * value for score, value in zip(scores, factor(columns, context))]
+        return scores
@@ -0,0 +1,154 @@
+"""Choice of the access point to connect to.
+
+Candidates are the visible access points of known, non-blacklisted
+networks whose signal reaches 'signal_threshold'. They are ranked with
+preferred networks first and then by expected throughput, and the
+current link is scored alongside so that a switch has to beat it by a
+margin. NetworkManager and the one-shot quick connect both choose this way.
+
+With several adapters, assign_networks() chooses for one adapter at a
+time, discounting access points on channels that overlap the links
+already given to the other adapters, since our own adapters would then
+take turns on the same airtime.
+"""
+
+from typing import Dict, List, Optional, Tuple
+from config.settings import Config
+from src.scoring import ScoringEngine, access_point_band, channel_overlap, dbm_to_percent
+
+# Fields of the chosen access point copied over the network's best-AP values
+ACCESS_POINT_FIELDS = ('bssid', 'signal_strength', 'channel', 'band', 'radio_type')
+
+def signal_percentage(connection: Dict) -> int:
+    """Signal of a connection from 'show interfaces', as an int percentage."""
+    if isinstance(connection.get('signal_strength'), int):
+        return connection['signal_strength']
+    try:
+        return int(str(connection.get('signal', '0%')).replace('%', '').strip())
+    except ValueError:
+        return 0
+
+def rank_candidates(config: Config, scoring: ScoringEngine, networks: List[Dict],
+                    current_connection: Optional[Dict]) -> Tuple[List[Dict], List[float], Optional[float]]:
+    """Candidate access points best first, their scores, and the score of the current link.
+
+    Each candidate is its network's entry carrying the BSSID, channel and
+    signal of one access point. Other access points of the connected
+    network are left out, as netsh cannot move the link to one of them.
+    The current link's score is None when not connected.
+    """
+    blacklisted = config.get('blacklisted_networks', [])
+    preferred_networks = config.get('preferred_networks', [])
+    min_signal = dbm_to_percent(config.get('signal_threshold', -70))
+
+    # Every visible access point loads its channel, usable or not
+    scan = [ap for network in networks for ap in network.get('access_points') or [network]]
+
+    candidates = []
+    for network in networks:
+        # Skip blacklisted networks and those we have no profile for
+        if network['ssid'] in blacklisted or not network.get('has_profile'):
+            continue
+        for access_point in network.get('access_points') or [network]:
+            # Skip access points with weak signal
+            if access_point.get('signal_strength', 0) < min_signal:
+                continue
+            # netsh connects by SSID and cannot pin a BSSID, so other access
+            # points of the current network cannot be targeted
+            if (current_connection and network['ssid'] == current_connection.get('ssid') and
+                access_point.get('bssid') != current_connection.get('bssid')):
+                continue
+            candidates.append(dict(network, **{
+                field: access_point[field] for field in ACCESS_POINT_FIELDS if field in access_point
+            }))
+
+    if not candidates:
+        return [], [], None
+
+    # The current link is scored alongside, from the scan if it is visible there
+    current = None
+    if current_connection:
+        current = next((ap for ap in scan if ap.get('ssid') == current_connection.get('ssid') and
+                        ap.get('bssid') == current_connection.get('bssid')), None)
+        if current is None:
+            current = {
+                'ssid': current_connection.get('ssid'),
+                'bssid': current_connection.get('bssid'),
+                'signal_strength': signal_percentage(current_connection),
+                'channel': current_connection.get('channel')
+            }
+
+    scores = scoring.score(candidates + ([current] if current else []), scan)
+    ranked = sorted(range(len(candidates)),
+                    key=lambda i: (candidates[i]['ssid'] in preferred_networks, scores[i]), reverse=True)
+    return [candidates[i] for i in ranked], [scores[i] for i in ranked], scores[-1] if current else None
+
+def should_switch(config: Config, best_network: Dict, best_score: float, current_connection: Optional[Dict],
+                  current_score: Optional[float], min_improvement: int = 10) -> bool:
+    """Whether best_network should replace the current link.
+
+    It must be a different network and score at least min_improvement
+    percent higher, unless it is preferred and the current network is not.
+    Another access point of the current network does not count: netsh
+    reconnects by SSID, so Windows would pick the access point itself.
+    """
+    if not current_connection:
+        return True
+    if current_connection.get('ssid') == best_network['ssid']:
+        return False
+    preferred_networks = config.get('preferred_networks', [])
+    # A preferred network always replaces a non-preferred one
+    if (best_network['ssid'] in preferred_networks) > (current_connection.get('ssid') in preferred_networks):
+        return True
+    # Otherwise only switch if the improvement is significant
+    return current_score is None or best_score >= current_score * (1 + min_improvement / 100)
+
+def airtime_share(access_point: Dict, links: List[Dict]) -> float:
+    """Share of its channel an access point leaves us next to our other links on overlapping channels."""
+    if not access_point.get('channel'):
+        return 1.0
+    band, channel = access_point_band(access_point), int(access_point['channel'])
+    overlap = sum(channel_overlap(band, channel, access_point_band(link), int(link['channel']))
+                  for link in links if link.get('channel'))
+    return 1 / (1 + overlap)
+
+def assign_networks(config: Config, scoring: ScoringEngine, scans: Dict[str, List[Dict]],
+                    current_connections: Dict[str, Optional[Dict]],
+                    min_improvement: int = 10) -> Dict[str, Optional[Dict]]:
+    """The access point each adapter should switch to, or None where it should stay.
+
+    scans and current_connections are keyed by interface name. Connected
+    adapters choose first, so that an idle adapter does not push one off
+    its link, then those with the best candidates; every later adapter
+    scores its candidates, and its current link, by the airtime they leave
+    next to the links chosen so far.
+    """
+    rankings = {
+        name: rank_candidates(config, scoring, networks, current_connections.get(name))
+        for name, networks in scans.items()
+    }
+    preferred_networks = config.get('preferred_networks', [])
+    order = sorted(rankings, key=lambda name: (rankings[name][2] is not None,
+                                               rankings[name][1][0] if rankings[name][1] else 0.0), reverse=True)
+
+    links: List[Dict] = []
+    assignments: Dict[str, Optional[Dict]] = {}
+    for name in order:
+        ranked, scores, current_score = rankings[name]
+        current = current_connections.get(name)
+        assignments[name] = None
+        if not ranked:
+            if current:
+                links.append(current)
+            continue
+
+        shared = [score * airtime_share(candidate, links) for candidate, score in zip(ranked, scores)]
+        best = max(range(len(ranked)), key=lambda i: (ranked[i]['ssid'] in preferred_networks, shared[i]))
+        if current_score is not None:
+            current_score *= airtime_share(current, links)
+        if should_switch(config, ranked[best], shared[best], current, current_score, min_improvement):
+            assignments[name] = ranked[best]
+            links.append(ranked[best])
+        elif current:
+            links.append(current)
+    return assignments
@@ -0,0 +1,232 @@
+"""Fixed-size signal history per access point.
+
+Every (SSID, BSSID) pair gets a ring buffer of its most recent signal
+samples in two preallocated arrays, plus running sums and an EWMA that
+are updated in constant time per sample. The number of access points is
+capped as well, so memory stays flat however long the optimizer runs.
+The whole history can be saved to and loaded from a compact binary file.
+"""
+
+import math
+import os
+import struct
+import time
+from array import array
+from typing import Dict, Iterable, Optional, Tuple
+from utils.logger import setup_logger
+from config.settings import Config
+
+# Header: magic, format version, ring capacity, number of access points
+FILE_HEADER = struct.Struct('<4sHHI')
+FILE_MAGIC = b'WSH1'
+FILE_VERSION = 1
+# Per access point: key lengths, head, count, ewma, running sum and sum of squares
+ENTRY_HEADER = struct.Struct('<HHHHddd')
+
+class SignalRing:
+    """Ring buffer of (timestamp, signal %) samples for one access point."""
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.times = array('d', bytes(8 * capacity))
+        self.signals = array('f', bytes(4 * capacity))
+        self.head = 0
+        self.count = 0
+        self.ewma = 0.0
+        self.total = 0.0
+        self.total_squares = 0.0
+
+    def append(self, signal: float, when: float, alpha: float):
+        """Add a sample, overwriting the oldest one when the buffer is full."""
+        if self.count == self.capacity:
+            oldest = self.signals[self.head]
+            self.total -= oldest
+            self.total_squares -= oldest * oldest
+        else:
+            self.count += 1
+        self.times[self.head] = when
+        self.signals[self.head] = signal
+        self.head = (self.head + 1) % self.capacity
+        self.total += signal
+        self.total_squares += signal * signal
+        self.ewma = signal if self.count == 1 else self.ewma + alpha * (signal - self.ewma)
+
+    @property
+    def last_time(self) -> float:
+        return self.times[(self.head - 1) % self.capacity] if self.count else 0.0
+
+    @property
+    def last_signal(self) -> float:
+        return self.signals[(self.head - 1) % self.capacity] if self.count else 0.0
+
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def variance(self) -> float:
+        """Population variance of the samples in the buffer."""
+        if self.count < 2:
+            return 0.0
+        mean = self.total / self.count
+        # Clamp rounding error from the running sums
+        return max(self.total_squares / self.count - mean * mean, 0.0)
+
+    def trend(self) -> float:
+        """Least-squares slope of the samples in signal % per minute."""
+        if self.count < 2:
+            return 0.0
+        start = (self.head - self.count) % self.capacity
+        origin = self.times[start]
+        mean_t = mean_s = 0.0
+        for i in range(self.count):
+            index = (start + i) % self.capacity
+            mean_t += self.times[index] - origin
+            mean_s += self.signals[index]
+        mean_t /= self.count
+        mean_s /= self.count
+        covariance = spread = 0.0
+        for i in range(self.count):
+            index = (start + i) % self.capacity
+            dt = self.times[index] - origin - mean_t
+            covariance += dt * (self.signals[index] - mean_s)
+            spread += dt * dt
+        return covariance / spread * 60 if spread else 0.0
+
+class SignalHistory:
+    """Signal rings for up to max_access_points access points, keyed by (SSID, BSSID)."""
+
+    def __init__(self, capacity: int = 32, max_access_points: int = 256, alpha: float = 0.3):
+        self.capacity = capacity
+        self.max_access_points = max_access_points
+        self.alpha = alpha
+        self.rings: Dict[Tuple[str, str], SignalRing] = {}
+
+    @classmethod
+    def from_config(cls, config: Config) -> 'SignalHistory':
+        """Create a history sized by the configuration, loading the saved one if present."""
+        history = cls(
+            config.get('signal_history_size'),
+            config.get('signal_history_max_aps'),
+            config.get('signal_smoothing')
+        )
+        path = history_path(config)
+        if path and os.path.exists(path):
+            try:
+                history.load(path)
+            except (OSError, ValueError, EOFError, struct.error) as e:
+                setup_logger(__name__, config.get('log_level')).warning(
+                    f"Ignoring unreadable signal history {path}: {e}")
+                history.rings.clear()
+        return history
+
+    def record(self, ssid: str, bssid: Optional[str], signal: float, when: Optional[float] = None):
+        """Add one signal sample for an access point."""
+        key = (ssid, bssid or '')
+        ring = self.rings.get(key)
+        if ring is None:
+            if len(self.rings) >= self.max_access_points:
+                # Forget the access point that has not been seen the longest
+                stale = min(self.rings, key=lambda k: self.rings[k].last_time)
+                del self.rings[stale]
+            ring = self.rings[key] = SignalRing(self.capacity)
+        ring.append(signal, time.time() if when is None else when, self.alpha)
+
+    def record_networks(self, networks: Iterable[Dict], when: Optional[float] = None):
+        """Add a sample for every access point of scanned networks."""
+        when = time.time() if when is None else when
+        for network in networks:
+            access_points = network.get('access_points') or [network]
+            for access_point in access_points:
+                self.record(network['ssid'], access_point.get('bssid'),
+                            access_point.get('signal_strength', 0), when)
+
+    def get(self, ssid: str, bssid: Optional[str] = None) -> Optional[SignalRing]:
+        return self.rings.get((ssid, bssid or ''))
+
+    def ewma(self, ssid: str, bssid: Optional[str] = None) -> Optional[float]:
+        ring = self.get(ssid, bssid)
+        return ring.ewma if ring else None
+
+    def variance(self, ssid: str, bssid: Optional[str] = None) -> Optional[float]:
+        ring = self.get(ssid, bssid)
+        return ring.variance() if ring else None
+
+    def trend(self, ssid: str, bssid: Optional[str] = None) -> Optional[float]:
+        ring = self.get(ssid, bssid)
+        return ring.trend() if ring else None
+
+    def expected_signal(self, ssid: str, bssid: Optional[str], fallback: float, min_samples: int = 3) -> float:
+        """Smoothed signal less one standard deviation, or fallback without enough samples.
+
+        Penalizing the spread makes a steady AP win over one that is
+        occasionally strong but fluctuates.
+        """
+        ring = self.get(ssid, bssid)
+        if ring is None or ring.count < min_samples:
+            return fallback
+        return ring.ewma - math.sqrt(ring.variance())
+
+    def __len__(self) -> int:
+        return len(self.rings)
+
+    def save(self, path: str):
+        """Write the history to a binary file."""
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(FILE_HEADER.pack(FILE_MAGIC, FILE_VERSION, self.capacity, len(self.rings)))
+            for (ssid, bssid), ring in self.rings.items():
+                ssid_bytes = ssid.encode('utf-8')
+                bssid_bytes = bssid.encode('utf-8')
+                f.write(ENTRY_HEADER.pack(len(ssid_bytes), len(bssid_bytes), ring.head, ring.count,
+                                          ring.ewma, ring.total, ring.total_squares))
+                f.write(ssid_bytes)
+                f.write(bssid_bytes)
+                ring.times.tofile(f)
+                ring.signals.tofile(f)
+        os.replace(tmp_path, path)
+
+    def load(self, path: str):
+        """Replace the history with the one saved in a binary file."""
+        with open(path, 'rb') as f:
+            magic, version, capacity, entries = FILE_HEADER.unpack(f.read(FILE_HEADER.size))
+            if magic != FILE_MAGIC or version != FILE_VERSION:
+                raise ValueError("Not a signal history file")
+            rings = {}
+            for _ in range(entries):
+                ssid_length, bssid_length, head, count, ewma, total, total_squares = \
+                    ENTRY_HEADER.unpack(f.read(ENTRY_HEADER.size))
+                ssid = f.read(ssid_length).decode('utf-8')
+                bssid = f.read(bssid_length).decode('utf-8')
+                ring = SignalRing(capacity)
+                ring.times = array('d')
+                ring.times.fromfile(f, capacity)
+                ring.signals = array('f')
+                ring.signals.fromfile(f, capacity)
+                ring.head, ring.count = head, count
+                ring.ewma, ring.total, ring.total_squares = ewma, total, total_squares
+                rings[(ssid, bssid)] = ring
+
+        if capacity != self.capacity:
+            # Replay into rings of the configured size, oldest sample first
+            for key, ring in rings.items():
+                rings[key] = self._resized(ring)
+        self.rings = rings
+        while len(self.rings) > self.max_access_points:
+            del self.rings[min(self.rings, key=lambda k: self.rings[k].last_time)]
+
+    def _resized(self, ring: SignalRing) -> SignalRing:
+        resized = SignalRing(self.capacity)
+        start = (ring.head - ring.count) % ring.capacity
+        for i in range(ring.count):
+            index = (start + i) % ring.capacity
+            resized.append(ring.signals[index], ring.times[index], self.alpha)
+        return resized
+
+def history_path(config: Config) -> Optional[str]:
+    """Location of the saved signal history, or None if persistence is off."""
+    name = config.get('signal_history_file')
+    if not name:
+        return None
+    return os.path.join(config.get('cache_dir'), name)
@@ -1,20 +1,39 @@
 
 import subprocess
 import time
-from typing import Dict, Optional
+from typing import Dict, List, Optional
 from utils.logger import setup_logger
 from utils.exceptions import ConnectionError, NetworkNotFoundError
 from config.settings import Config
+from src.command_runner import CommandRunner, create_runner
+from src.cycle_metrics import CycleMetrics
+from src.netsh_parser import parse_interfaces
 
 class WiFiConnector:
     """Manages Wi-Fi connections using Windows netsh."""
     
-    def __init__(self, config: Config):
+    def __init__(self, config: Config, runner: Optional[CommandRunner] = None,
+                 metrics: Optional[CycleMetrics] = None, interface: Optional[str] = None):
         self.config = config
         self.logger = setup_logger(__name__, config.get('log_level'))
+        self.runner = runner or create_runner(config)
+        self.metrics = metrics or CycleMetrics(config)
+        # Name of the adapter to manage; None leaves the choice to netsh
+        self.interface = interface
     
-    def connect_to_network(self, network: Dict[str, str]) -> bool:
-        """Connect to a specific Wi-Fi network."""
+    def _command(self, *args: str) -> List[str]:
+        """Build a netsh wlan command, restricted to this connector's interface if it has one."""
+        cmd = ['netsh', 'wlan', *args]
+        if self.interface:
+            cmd.append(f'interface={self.interface}')
+        return cmd
+    
+    def connect_to_network(self, network: Dict[str, str], interfaces_snapshot: Optional[str] = None) -> bool:
+        """Connect to a specific Wi-Fi network.
+        
+        interfaces_snapshot is 'show interfaces' output already taken in this
+        cycle; it is used for the already-connected check instead of a new query.
+        """
         ssid = network.get('ssid')
         if not ssid:
             raise ValueError("Network SSID is required")
@@ -23,12 +42,23 @@ class WiFiConnector:
         
         try:
             # Check if we're already connected to this network
-            if self._is_connected_to_network(ssid):
-                self.logger.info(f"Already connected to {ssid}")
+            current = self.get_current_connection(interfaces_snapshot)
+            if current and current.get('ssid') == ssid:
+                target_bssid = network.get('bssid')
+                if target_bssid and current.get('bssid') != target_bssid:
+                    # Reconnecting would drop the link and let Windows choose the AP again
+                    self.logger.info(f"Already connected to {ssid} via {current.get('bssid')}; "
+                                     f"netsh cannot pin access point {target_bssid}")
+                else:
+                    self.logger.info(f"Already connected to {ssid}")
                 return True
             
             # Attempt connection using existing profile
-            if self._connect_using_profile(ssid):
+            connected = self._connect_using_profile(ssid)
+            if connected:
+                target_bssid = network.get('bssid')
+                if target_bssid and connected.get('bssid') not in (None, target_bssid):
+                    self.logger.info(f"Connected to {ssid} via {connected.get('bssid')} instead of {target_bssid}")
                 return True
             
             self.logger.warning(f"Failed to connect to {ssid}")
@@ -37,97 +67,122 @@ class WiFiConnector:
         except Exception as e:
             raise ConnectionError(f"Failed to connect to {ssid}: {str(e)}")
     
-    def _connect_using_profile(self, ssid: str) -> bool:
-        """Connect using existing network profile."""
+    def _connect_using_profile(self, ssid: str) -> Optional[Dict[str, str]]:
+        """Connect using existing network profile, returning the verified connection."""
+        attempts = max(1, self.config.get('retry_attempts'))
+        for attempt in range(1, attempts + 1):
+            if attempt > 1:
+                self.metrics.increment('retries')
+            try:
+                cmd = self._command('connect', f'name={ssid}')
+                with self.metrics.phase('connect'):
+                    result = self.runner.run(cmd, timeout=self.config.get('connection_timeout'))
+                
+                if result.returncode == 0:
+                    with self.metrics.phase('verify'):
+                        connection = self._wait_for_connection(ssid)
+                    if connection:
+                        self.logger.info(f"Successfully connected to {ssid}")
+                        return connection
+                    self.logger.warning(f"Connection to {ssid} was not established (attempt {attempt}/{attempts})")
+                else:
+                    self.logger.warning(f"Connection attempt {attempt}/{attempts} failed: "
+                                        f"{result.stderr or result.stdout}")
+                
+            except subprocess.TimeoutExpired:
+                self.logger.error(f"Connection to {ssid} timed out (attempt {attempt}/{attempts})")
+            except Exception as e:
+                self.logger.error(f"Connection error: {e}")
+                return None
+        
+        return None
+    
+    def _wait_for_connection(self, ssid: str) -> Optional[Dict[str, str]]:
+        """Poll the interface until it is connected to ssid or connection_timeout passes."""
+        timeout = self.config.get('connection_timeout')
+        delay = self.config.get('verify_poll_interval')
+        max_delay = self.config.get('verify_max_poll_interval')
+        deadline = time.monotonic() + timeout
+        waited = 0.0
+        
+        while True:
+            self.metrics.increment('verify_polls')
+            connection = self.get_current_connection()
+            if connection and connection.get('ssid') == ssid:
+                return connection
+            # The slept time bounds the loop too, in case the clock does not advance
+            remaining = min(deadline - time.monotonic(), timeout - waited)
+            if remaining <= 0:
+                return None
+            pause = min(delay, remaining)
+            time.sleep(pause)
+            waited += pause
+            delay = min(delay * 2, max_delay)
+    
+    def snapshot_interfaces(self) -> Optional[str]:
+        """Return 'netsh wlan show interfaces' output, or None if the query failed."""
         try:
-            cmd = ['netsh', 'wlan', 'connect', f'name={ssid}']
-            result = subprocess.run(
-                cmd, 
-                capture_output=True, 
-                text=True, 
-                timeout=self.config.get('connection_timeout')
-            )
-            
-            if result.returncode == 0:
-                # Wait a moment and verify connection
-                time.sleep(3)
-                if self._is_connected_to_network(ssid):
-                    self.logger.info(f"Successfully connected to {ssid}")
-                    return True
-            
-            self.logger.warning(f"Connection attempt failed: {result.stderr}")
-            return False
-            
-        except subprocess.TimeoutExpired:
-            self.logger.error(f"Connection to {ssid} timed out")
-            return False
+            cmd = ['netsh', 'wlan', 'show', 'interfaces']
+            with self.metrics.phase('interfaces'):
+                result = self.runner.run(cmd, timeout=10)
+            return result.stdout if result.returncode == 0 else None
         except Exception as e:
-            self.logger.error(f"Connection error: {e}")
-            return False
+            self.logger.error(f"Error querying interfaces: {e}")
+            return None
     
-    def _is_connected_to_network(self, ssid: str) -> bool:
-        """Check if currently connected to specific network."""
+    async def snapshot_interfaces_async(self) -> Optional[str]:
+        """Asynchronous version of snapshot_interfaces."""
         try:
             cmd = ['netsh', 'wlan', 'show', 'interfaces']
-            result = subprocess.run(cmd, capture_output=True, text=True, timeout=10)
-            
-            if result.returncode == 0:
-                lines = result.stdout.split('\n')
-                for line in lines:
-                    if 'SSID' in line and ssid in line:
-                        # Check if this interface is connected
-                        return True
-            
-            return False
-            
+            with self.metrics.phase('interfaces'):
+                result = await self.runner.run_async(cmd, timeout=10)
+            return result.stdout if result.returncode == 0 else None
         except Exception as e:
-            self.logger.error(f"Error checking connection status: {e}")
-            return False
+            self.logger.error(f"Error querying interfaces: {e}")
+            return None
     
-    def get_current_connection(self) -> Optional[Dict[str, str]]:
+    def get_current_connection(self, interfaces_snapshot: Optional[str] = None) -> Optional[Dict[str, str]]:
         """Get information about current Wi-Fi connection."""
         try:
-            cmd = ['netsh', 'wlan', 'show', 'interfaces']
-            result = subprocess.run(cmd, capture_output=True, text=True, timeout=10)
+            if interfaces_snapshot is None:
+                interfaces_snapshot = self.snapshot_interfaces()
             
-            if result.returncode != 0:
+            if interfaces_snapshot is None:
                 return None
             
-            return self._parse_interface_info(result.stdout)
+            return self._parse_interface_info(interfaces_snapshot)
             
         except Exception as e:
             self.logger.error(f"Error getting current connection: {e}")
             return None
     
+    def list_interfaces(self, interfaces_snapshot: Optional[str] = None) -> List[Dict[str, str]]:
+        """Every wireless interface, connected or not."""
+        if interfaces_snapshot is None:
+            interfaces_snapshot = self.snapshot_interfaces()
+        if interfaces_snapshot is None:
+            return []
+        return parse_interfaces(interfaces_snapshot)
+    
     def _parse_interface_info(self, output: str) -> Optional[Dict[str, str]]:
-        """Parse interface information from netsh output."""
-        lines = output.split('\n')
-        interface_info = {}
-        
-        for line in lines:
-            line = line.strip()
-            if 'Name' in line and ':' in line:
-                interface_info['interface'] = line.split(':', 1)[1].strip()
-            elif 'State' in line and ':' in line:
-                interface_info['state'] = line.split(':', 1)[1].strip()
-            elif 'SSID' in line and ':' in line:
-                interface_info['ssid'] = line.split(':', 1)[1].strip()
-            elif 'Signal' in line and ':' in line:
-                interface_info['signal'] = line.split(':', 1)[1].strip()
-        
-        if interface_info.get('state') == 'connected' and interface_info.get('ssid'):
-            return interface_info
+        """Return this connector's interface if it is connected, else the first connected one, or None."""
+        for interface in parse_interfaces(output):
+            if self.interface and interface.get('interface') != self.interface:
+                continue
+            if interface.get('state') == 'connected' and interface.get('ssid'):
+                return interface
         
         return None
     
     def disconnect(self) -> bool:
         """Disconnect from current Wi-Fi network."""
         try:
-            cmd = ['netsh', 'wlan', 'disconnect']
-            result = subprocess.run(cmd, capture_output=True, text=True, timeout=10)
+            cmd = self._command('disconnect')
+            with self.metrics.phase('disconnect'):
+                result = self.runner.run(cmd, timeout=10)
             
             if result.returncode == 0:
-                self.logger.info("Successfully disconnected from Wi-Fi")
+                self.logger.info(f"Successfully disconnected {self.interface or 'from Wi-Fi'}")
                 return True
             else:
                 self.logger.warning(f"Disconnect failed: {result.stderr}")
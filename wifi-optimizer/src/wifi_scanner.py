@@ -1,47 +1,85 @@
 """Wi-Fi network scanner using netsh commands."""
 
+import asyncio
 import subprocess
-import re
+import os
 import json
+import tempfile
+import xml.etree.ElementTree as ET
 from typing import List, Dict, Optional
 from utils.logger import setup_logger
 from utils.exceptions import ScanError
 from config.settings import Config
+from src.command_runner import CommandRunner, create_runner
+from src.cycle_metrics import CycleMetrics
+from src.network_table import NetworkTable
+from src.netsh_parser import parse_profile_details, parse_profiles
+
+PROFILE_NAMESPACE = '{http://www.microsoft.com/networking/WLAN/profile/v1}'
+
+# Profile XML values mapped to the names netsh prints for the same profile
+AUTHENTICATION_NAMES = {
+    'open': 'Open',
+    'shared': 'Shared',
+    'WPA': 'WPA-Enterprise',
+    'WPAPSK': 'WPA-Personal',
+    'WPA2': 'WPA2-Enterprise',
+    'WPA2PSK': 'WPA2-Personal',
+    'WPA3': 'WPA3-Enterprise 192 Bits',
+    'WPA3ENT192': 'WPA3-Enterprise 192 Bits',
+    'WPA3ENT': 'WPA3-Enterprise',
+    'WPA3SAE': 'WPA3-Personal',
+    'OWE': 'OWE'
+}
+ENCRYPTION_NAMES = {
+    'none': 'None',
+    'WEP': 'WEP',
+    'TKIP': 'TKIP',
+    'AES': 'CCMP',
+    'GCMP256': 'GCMP-256'
+}
 
 class WiFiScanner:
     """Scans for available Wi-Fi networks using Windows netsh."""
     
-    def __init__(self, config: Config):
+    def __init__(self, config: Config, runner: Optional[CommandRunner] = None,
+                 metrics: Optional[CycleMetrics] = None, interface: Optional[str] = None):
         self.config = config
         self.logger = setup_logger(__name__, config.get('log_level'))
+        self.runner = runner or create_runner(config)
+        self.metrics = metrics or CycleMetrics(config)
+        # Name of the adapter to scan with; None leaves the choice to netsh
+        self.interface = interface
         
+    def _command(self, *args: str) -> List[str]:
+        """Build a netsh wlan command, restricted to this scanner's interface if it has one."""
+        cmd = ['netsh', 'wlan', *args]
+        if self.interface:
+            cmd.append(f'interface={self.interface}')
+        return cmd
+    
     def scan_networks(self) -> List[Dict[str, str]]:
         """Scan for available Wi-Fi networks."""
+        return asyncio.run(self.scan_networks_async())
+    
+    async def scan_networks_async(self) -> List[Dict[str, str]]:
+        """Scan for available Wi-Fi networks, querying profiles and networks concurrently."""
         try:
-            self.logger.info("Starting Wi-Fi network scan...")
+            self.logger.info(f"Starting Wi-Fi network scan on {self.interface or 'the default interface'}...")
             
-            # Execute netsh command to scan for networks
-            cmd = ['netsh', 'wlan', 'show', 'profile']
-            result = subprocess.run(
-                cmd, 
-                capture_output=True, 
-                text=True, 
-                timeout=self.config.get('scan_timeout')
+            # The profile list and the visible networks are independent queries
+            result, available_networks = await asyncio.gather(
+                self._list_profiles(),
+                self._get_available_networks()
             )
             
             if result.returncode != 0:
                 raise ScanError(f"Failed to scan networks: {result.stderr}")
             
             profiles = self._parse_profiles(result.stdout)
-            networks = []
-            
-            for profile in profiles:
-                network_info = self._get_network_details(profile)
-                if network_info:
-                    networks.append(network_info)
-            
-            # Get current available networks
-            available_networks = self._get_available_networks()
+            loop = asyncio.get_running_loop()
+            with self.metrics.phase('profiles'):
+                networks = await loop.run_in_executor(None, self._get_profile_details, profiles)
             
             # Merge profile info with available networks
             merged_networks = self._merge_network_data(networks, available_networks)
@@ -54,25 +92,118 @@ class WiFiScanner:
         except Exception as e:
             raise ScanError(f"Scan failed: {str(e)}")
     
+    async def _list_profiles(self) -> subprocess.CompletedProcess:
+        """Run 'netsh wlan show profile'."""
+        cmd = self._command('show', 'profile')
+        with self.metrics.phase('profiles'):
+            return await self.runner.run_async(cmd, timeout=self.config.get('scan_timeout'))
+    
     def _parse_profiles(self, output: str) -> List[str]:
         """Parse network profiles from netsh output."""
-        profiles = []
-        lines = output.split('\n')
+        return parse_profiles(output)
+    
+    def _get_profile_details(self, profiles: List[str]) -> List[Dict[str, str]]:
+        """Get details of all profiles, exporting them only when the profile list changed."""
+        cache_file = os.path.join(self.config.get('cache_dir'), self._profile_cache_name())
+        cached = self._load_profile_cache(cache_file)
+        if cached is not None and cached.get('profiles') == sorted(profiles):
+            self.logger.debug("Profile list unchanged, using cached profile details")
+            return [cached['details'][name] for name in profiles if name in cached['details']]
+        
+        details = self._export_profiles()
+        if details is None:
+            # Export unavailable: fall back to one query per profile
+            details = {}
+            for profile in profiles:
+                network_info = self._get_network_details(profile)
+                if network_info:
+                    details[profile] = network_info
+        
+        self._save_profile_cache(cache_file, {'profiles': sorted(profiles), 'details': details})
+        return [details[name] for name in profiles if name in details]
+    
+    def _profile_cache_name(self) -> str:
+        """Each adapter has its own profiles, so each gets its own cache file."""
+        if not self.interface:
+            return 'profiles.json'
+        slug = ''.join(c if c.isalnum() else '_' for c in self.interface)
+        return f'profiles-{slug}.json'
+    
+    def _load_profile_cache(self, cache_file: str) -> Optional[Dict]:
+        """Load cached profile details, if any."""
+        try:
+            with open(cache_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            self.logger.warning(f"Ignoring unreadable profile cache {cache_file}: {e}")
+            return None
+    
+    def _save_profile_cache(self, cache_file: str, cache: Dict):
+        """Write profile details to the cache."""
+        try:
+            os.makedirs(os.path.dirname(cache_file), exist_ok=True)
+            tmp_file = f"{cache_file}.tmp"
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                json.dump(cache, f)
+            os.replace(tmp_file, cache_file)
+        except OSError as e:
+            self.logger.warning(f"Failed to write profile cache {cache_file}: {e}")
+    
+    def _export_profiles(self) -> Optional[Dict[str, Dict[str, str]]]:
+        """Export every profile with a single netsh call and parse the XML files."""
+        try:
+            with tempfile.TemporaryDirectory() as folder:
+                cmd = self._command('export', 'profile', f'folder={folder}')
+                result = self.runner.run(cmd, timeout=self.config.get('scan_timeout'))
+                
+                if result.returncode != 0:
+                    self.logger.warning(f"Profile export failed: {result.stderr}")
+                    return None
+                
+                details = {}
+                for filename in os.listdir(folder):
+                    if filename.lower().endswith('.xml'):
+                        with open(os.path.join(folder, filename), 'rb') as f:
+                            profile = self._parse_profile_xml(f.read())
+                        if profile:
+                            details[profile['name']] = profile
+                return details
+                
+        except Exception as e:
+            self.logger.warning(f"Failed to export profiles: {e}")
+            return None
+    
+    def _parse_profile_xml(self, xml_data: bytes) -> Optional[Dict[str, str]]:
+        """Parse an exported WLANProfile XML document."""
+        try:
+            root = ET.fromstring(xml_data)
+        except ET.ParseError as e:
+            self.logger.warning(f"Skipping malformed profile export: {e}")
+            return None
         
-        for line in lines:
-            if 'All User Profile' in line:
-                # Extract profile name using regex
-                match = re.search(r':\s*(.+)$', line.strip())
-                if match:
-                    profiles.append(match.group(1).strip())
+        name = root.findtext(f'{PROFILE_NAMESPACE}name')
+        if not name:
+            return None
+        
+        auth_encryption = root.find(f'{PROFILE_NAMESPACE}MSM/{PROFILE_NAMESPACE}security/{PROFILE_NAMESPACE}authEncryption')
+        authentication = encryption = 'Unknown'
+        if auth_encryption is not None:
+            authentication = auth_encryption.findtext(f'{PROFILE_NAMESPACE}authentication', 'Unknown')
+            encryption = auth_encryption.findtext(f'{PROFILE_NAMESPACE}encryption', 'Unknown')
         
-        return profiles
+        return {
+            'name': name,
+            'authentication': AUTHENTICATION_NAMES.get(authentication, authentication),
+            'encryption': ENCRYPTION_NAMES.get(encryption, encryption)
+        }
     
     def _get_network_details(self, profile_name: str) -> Optional[Dict[str, str]]:
         """Get detailed information about a specific network profile."""
         try:
-            cmd = ['netsh', 'wlan', 'show', 'profile', f'name={profile_name}', 'key=clear']
-            result = subprocess.run(cmd, capture_output=True, text=True, timeout=10)
+            cmd = self._command('show', 'profile', f'name={profile_name}')
+            result = self.runner.run(cmd, timeout=10)
             
             if result.returncode != 0:
                 return None
@@ -85,98 +216,24 @@ class WiFiScanner:
     
     def _parse_profile_details(self, output: str, profile_name: str) -> Dict[str, str]:
         """Parse detailed profile information."""
-        details = {
-            'name': profile_name,
-            'authentication': 'Unknown',
-            'encryption': 'Unknown',
-            'key': None
-        }
-        
-        lines = output.split('\n')
-        for line in lines:
-            line = line.strip()
-            if 'Authentication' in line and ':' in line:
-                details['authentication'] = line.split(':', 1)[1].strip()
-            elif 'Cipher' in line and ':' in line:
-                details['encryption'] = line.split(':', 1)[1].strip()
-            elif 'Key Content' in line and ':' in line:
-                details['key'] = line.split(':', 1)[1].strip()
-        
-        return details
+        return dict(parse_profile_details(output, profile_name))
     
-    def _get_available_networks(self) -> List[Dict[str, str]]:
-        """Get currently available networks with signal strength."""
+    async def _get_available_networks(self) -> NetworkTable:
+        """Get currently visible access points with signal strength, channel and band."""
         try:
-            cmd = ['netsh', 'wlan', 'show', 'interfaces']
-            result = subprocess.run(cmd, capture_output=True, text=True, timeout=10)
-            
-            if result.returncode != 0:
-                return []
-            
-            # Also get available networks
-            cmd2 = ['netsh', 'wlan', 'show', 'networks', 'mode=bssid']
-            result2 = subprocess.run(cmd2, capture_output=True, text=True, timeout=15)
-            
-            if result2.returncode != 0:
-                return []
-            
-            return self._parse_available_networks(result2.stdout)
+            cmd = self._command('show', 'networks', 'mode=bssid')
+            with self.metrics.phase('scan'):
+                result = await self.runner.run_async(cmd, timeout=15)
+                
+                if result.returncode != 0:
+                    return NetworkTable()
+                
+                return NetworkTable.from_netsh(result.stdout)
             
         except Exception as e:
             self.logger.warning(f"Failed to get available networks: {e}")
-            return []
-    
-    def _parse_available_networks(self, output: str) -> List[Dict[str, str]]:
-        """Parse available networks from netsh output."""
-        networks = []
-        lines = output.split('\n')
-        current_network = {}
-        
-        for line in lines:
-            line = line.strip()
-            if line.startswith('SSID'):
-                if current_network and current_network.get('ssid'):
-                    networks.append(current_network.copy())
-                current_network = {}
-                ssid_match = re.search(r':\s*(.+)$', line)
-                if ssid_match:
-                    current_network['ssid'] = ssid_match.group(1).strip()
-            elif 'Signal' in line and ':' in line:
-                signal_match = re.search(r':\s*(\d+)%', line)
-                if signal_match:
-                    current_network['signal_strength'] = int(signal_match.group(1))
-            elif 'Authentication' in line and ':' in line:
-                current_network['authentication'] = line.split(':', 1)[1].strip()
-            elif 'Encryption' in line and ':' in line:
-                current_network['encryption'] = line.split(':', 1)[1].strip()
-        
-        if current_network and current_network.get('ssid'):
-            networks.append(current_network)
-        
-        return networks
+            return NetworkTable()
     
-    def _merge_network_data(self, profiles: List[Dict], available: List[Dict]) -> List[Dict]:
-        """Merge profile data with available network data."""
-        merged = []
-        
-        for profile in profiles:
-            # Find matching available network
-            matching_available = None
-            for avail in available:
-                if avail.get('ssid') == profile.get('name'):
-                    matching_available = avail
-                    break
-            
-            if matching_available:
-                # Merge data
-                network = {
-                    'ssid': profile['name'],
-                    'signal_strength': matching_available.get('signal_strength', 0),
-                    'authentication': profile.get('authentication', 'Unknown'),
-                    'encryption': profile.get('encryption', 'Unknown'),
-                    'available': True,
-                    'has_profile': True
-                }
-                merged.append(network)
-        
-        return merged
\ No newline at end of file
+    def _merge_network_data(self, profiles: List[Dict], available: NetworkTable) -> List[Dict]:
+        """Join profile data with the visible access points, one entry per SSID."""
+        return available.merge_profiles(profiles)
@@ -0,0 +1,69 @@
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'benchmarks'))
+
+from replay_netsh import NetshEnvironment
+from run_benchmarks import compare, run_manager, timed
+from tests.test_netsh_parser import LOCALES
+
+class TestReplayedEnvironments(unittest.TestCase):
+
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.cache_dir, ignore_errors=True)
+
+    def test_recorded_corpus_in_every_locale(self):
+        for locale in LOCALES:
+            with self.subTest(locale=locale):
+                cache_dir = os.path.join(self.cache_dir, locale)
+                outcome = run_manager(NetshEnvironment.from_corpus(locale), cache_dir, 'optimize_wifi_connection')
+
+                # Already on the strongest network
+                self.assertFalse(outcome['result'])
+                self.assertEqual(outcome['link'], 'HomeNet')
+                self.assertEqual(outcome['command_kinds'], {'interfaces': 1, 'profiles': 1, 'networks': 1, 'export': 1})
+
+    def test_dense_environment_netsh_commands(self):
+        environment = NetshEnvironment.dense(50, 4, 20)
+
+        cold = run_manager(environment, self.cache_dir, 'optimize_wifi_connection')
+        self.assertTrue(cold['result'])
+        self.assertNotEqual(cold['link'], 'Net000')
+        self.assertEqual(cold['command_kinds'],
+                         {'interfaces': 2, 'profiles': 1, 'networks': 1, 'export': 1, 'connect': 1})
+
+        # The scan and the exported profiles are reused by the next invocation
+        warm = run_manager(environment, self.cache_dir, 'optimize_wifi_connection')
+        self.assertEqual(warm['link'], cold['link'])
+        self.assertEqual(warm['command_kinds'], {'interfaces': 2, 'connect': 1})
+
+        quick = run_manager(environment, self.cache_dir, 'quick')
+        self.assertEqual(quick['link'], cold['link'])
+        self.assertEqual(quick['queries'], 2)
+        self.assertEqual(quick['command_kinds'], {'networks': 1, 'interfaces': 2, 'connect': 1})
+
+    def test_survey_queries_run_concurrently(self):
+        environment = NetshEnvironment.dense(10, 2, 5, latency_scale=1.0,
+                                             latency={'interfaces': 0.2, 'profiles': 0.2, 'networks': 0.2, 'export': 0})
+
+        outcome, stats = timed(1, run_manager, environment, self.cache_dir, 'get_network_status')
+
+        self.assertEqual(outcome['commands'], 4)
+        self.assertLess(stats['seconds'], 0.45)
+
+    def test_compare_flags_regressions(self):
+        baseline = {'optimize_cold/en': {'items_per_second': 2.0, 'commands': 4},
+                    'parse_networks/en': {'items_per_second': 1000.0}}
+
+        self.assertEqual(compare({'optimize_cold/en': {'items_per_second': 1.9, 'commands': 4},
+                                  'parse_networks/en': {'items_per_second': 900.0}}, baseline, 0.25), [])
+        regressions = compare({'optimize_cold/en': {'items_per_second': 2.0, 'commands': 5},
+                               'parse_networks/en': {'items_per_second': 500.0}}, baseline, 0.25)
+        self.assertEqual(len(regressions), 2)
+        self.assertIn('5 netsh commands', regressions[0])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,101 @@
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+from src.command_runner import FakeRunner, ShellSessionRunner, SubprocessRunner, cmd_command_line
+from src.netsh_parser import parse_interfaces, parse_networks
+from config.settings import Config
+from tests.test_netsh_parser import read_corpus
+
+@unittest.skipUnless(os.name == 'posix', 'session tests use /bin/sh')
+class TestShellSessionRunner(unittest.TestCase):
+
+    def setUp(self):
+        self.runner = ShellSessionRunner(Config())
+
+    def tearDown(self):
+        self.runner.close()
+
+    def test_output_and_exit_codes_are_framed(self):
+        result = self.runner.run(['echo', 'hello world'])
+        self.assertEqual((result.returncode, result.stdout), (0, 'hello world\n'))
+
+        result = self.runner.run(['sh', '-c', 'echo oops >&2; exit 3'])
+        self.assertEqual((result.returncode, result.stdout, result.stderr), (3, '', 'oops\n'))
+
+        result = self.runner.run(['printf', 'no newline'])
+        self.assertEqual(result.stdout, 'no newline')
+        self.assertEqual(self.runner.sessions_started, 1)
+
+    def test_metacharacters_are_passed_literally(self):
+        result = self.runner.run(['echo', 'Cafe&calc.exe|more %PATH% $HOME;x'])
+        self.assertEqual(result.stdout, 'Cafe&calc.exe|more %PATH% $HOME;x\n')
+
+    def test_timeout_restarts_session(self):
+        with self.assertRaises(subprocess.TimeoutExpired):
+            self.runner.run(['sleep', '5'], timeout=0.2)
+        self.assertEqual(self.runner.run(['echo', 'again']).stdout, 'again\n')
+
+class TestCmdCommandLine(unittest.TestCase):
+
+    def test_metacharacters_are_escaped(self):
+        self.assertEqual(cmd_command_line(['netsh', 'wlan', 'connect', 'name=Cafe&calc.exe|x<y>z^']),
+                         'netsh wlan connect name=Cafe^&calc.exe^|x^<y^>z^^')
+        # Quoted arguments are escaped as a whole, quotes included
+        self.assertEqual(cmd_command_line(['netsh', 'wlan', 'connect', 'name=My Cafe&calc', 'interface=Wi-Fi 2']),
+                         'netsh wlan connect ^"name=My Cafe^&calc^" ^"interface=Wi-Fi 2^"')
+
+    def test_variables_cannot_be_carried(self):
+        self.assertIsNone(cmd_command_line(['netsh', 'wlan', 'connect', 'name=100%&|Free']))
+        self.assertIsNone(cmd_command_line(['netsh', 'wlan', 'connect', 'name=Hi!there']))
+        self.assertEqual(cmd_command_line(['netsh', 'wlan', 'show', 'interfaces']), 'netsh wlan show interfaces')
+
+class TestOtherRunners(unittest.TestCase):
+
+    def test_subprocess_runner(self):
+        result = SubprocessRunner().run(['python', '-c', 'print(42)'])
+        self.assertEqual(result.stdout.strip(), '42')
+
+    def test_fake_runner_matches_longest_prefix(self):
+        runner = FakeRunner()
+        runner.add(['netsh', 'wlan'], 'generic')
+        runner.add(['netsh', 'wlan', 'show', 'interfaces'], 'interfaces')
+
+        self.assertEqual(runner.run(['netsh', 'wlan', 'show', 'interfaces']).stdout, 'interfaces')
+        self.assertEqual(runner.run(['netsh', 'wlan', 'disconnect']).stdout, 'generic')
+        self.assertEqual(runner.run(['ipconfig']).returncode, 1)
+        self.assertEqual(len(runner.commands), 3)
+
+class TestOemOutput(unittest.TestCase):
+    """netsh on a German, French or Spanish Windows writes in the OEM code page."""
+
+    def setUp(self):
+        self.workdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.workdir, ignore_errors=True)
+
+    def netsh_output(self, locale, name):
+        path = os.path.join(self.workdir, f'{locale}-{name}.txt')
+        with open(path, 'wb') as f:
+            f.write(read_corpus(locale, name).encode('cp850'))
+        return [sys.executable, '-c', f'import sys; sys.stdout.buffer.write(open({path!r}, "rb").read())']
+
+    def check_runner(self, runner):
+        for locale in ('de', 'es', 'fr'):
+            with self.subTest(locale=locale):
+                networks = runner.run(self.netsh_output(locale, 'networks')).stdout
+                interfaces = runner.run(self.netsh_output(locale, 'interfaces')).stdout
+                self.assertEqual(parse_networks(networks), parse_networks(read_corpus(locale, 'networks')))
+                self.assertEqual(parse_interfaces(interfaces), parse_interfaces(read_corpus(locale, 'interfaces')))
+
+    def test_subprocess_runner_decodes_the_console_code_page(self):
+        self.check_runner(SubprocessRunner(encoding='cp850'))
+
+    @unittest.skipUnless(os.name == 'posix', 'session tests use /bin/sh')
+    def test_shell_session_decodes_the_console_code_page(self):
+        with ShellSessionRunner(Config(), encoding='cp850') as runner:
+            self.check_runner(runner)
+
+if __name__ == '__main__':
+    unittest.main()
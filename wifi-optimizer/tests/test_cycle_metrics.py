@@ -0,0 +1,70 @@
+import os
+import shutil
+import tempfile
+import unittest
+from src.cycle_metrics import CycleMetrics, read_cycles, summarize
+from config.settings import Config
+
+class TestCycleMetrics(unittest.TestCase):
+
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.cache_dir, ignore_errors=True)
+        self.config = Config()
+        self.config.set('cache_dir', self.cache_dir)
+        self.now = 0.0
+        self.metrics = CycleMetrics(self.config, clock=lambda: self.now)
+        self.path = os.path.join(self.cache_dir, 'cycles.jsonl')
+
+    def test_phases_and_counters_of_one_cycle(self):
+        self.metrics.increment('commands')
+        with self.metrics.cycle('optimize') as cycle:
+            with self.metrics.phase('scan'):
+                self.now += 0.5
+            with self.metrics.cycle('roam'):
+                # A nested cycle is part of the open one
+                with self.metrics.phase('scan'):
+                    self.now += 0.25
+                self.metrics.increment('commands', 2)
+            cycle['outcome'] = 'stayed'
+
+        [logged] = read_cycles(self.path)
+        self.assertEqual((logged['kind'], logged['outcome'], logged['total_seconds']), ('optimize', 'stayed', 0.75))
+        self.assertEqual(logged['phases'], {'scan': 0.75})
+        self.assertEqual(logged['counters'], {'commands': 2})
+
+    def test_exception_is_logged_as_error(self):
+        with self.assertRaises(RuntimeError):
+            with self.metrics.cycle('status'):
+                raise RuntimeError('netsh missing')
+
+        self.assertEqual(read_cycles(self.path)[0]['outcome'], 'error')
+
+    def test_log_is_rotated(self):
+        self.config.set('cycle_metrics_max_bytes', 100)
+        metrics = CycleMetrics(self.config)
+        for _ in range(3):
+            with metrics.cycle('quick'):
+                pass
+
+        self.assertEqual(len(read_cycles(self.path)), 1)
+        self.assertEqual(len(read_cycles(f"{self.path}.1")), 1)
+
+    def test_summary(self):
+        cycles = [{'kind': 'optimize', 'outcome': 'switched', 'total_seconds': seconds,
+                   'phases': {'scan': seconds / 2}, 'counters': {'commands': 6}}
+                  for seconds in (1.0, 2.0, 3.0, 4.0)]
+        cycles.append({'kind': 'status', 'outcome': 'ok', 'total_seconds': 10.0, 'phases': {}, 'counters': {}})
+
+        summary = summarize(cycles)
+
+        self.assertEqual(summary['kinds'], {'optimize': 4, 'status': 1})
+        self.assertEqual(summary['outcomes'], {'switched': 4, 'ok': 1})
+        self.assertEqual((summary['total_seconds']['p50'], summary['total_seconds']['p95'],
+                          summary['total_seconds']['max']), (3.0, 10.0, 10.0))
+        self.assertEqual(summary['phases']['scan']['count'], 4)
+        self.assertEqual(summary['counters']['commands'], {'total': 24, 'mean': 4.8, 'max': 6})
+        self.assertEqual(summarize([])['cycles'], 0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,124 @@
+import shutil
+import socket
+import socketserver
+import tempfile
+import threading
+import unittest
+from src.link_probe import LinkProbe, ProbeCache, probe_score
+from src.network_manager import NetworkManager
+from config.settings import Config
+
+class EchoServer:
+    """TCP and UDP echo service on one localhost port."""
+
+    def __init__(self):
+        class TCPEcho(socketserver.BaseRequestHandler):
+            def handle(self):
+                while True:
+                    data = self.request.recv(65536)
+                    if not data:
+                        break
+                    self.request.sendall(data)
+
+        class UDPEcho(socketserver.BaseRequestHandler):
+            def handle(self):
+                data, sock = self.request
+                sock.sendto(data, self.client_address)
+
+        self.tcp = socketserver.ThreadingTCPServer(('127.0.0.1', 0), TCPEcho)
+        self.tcp.daemon_threads = True
+        self.port = self.tcp.server_address[1]
+        self.udp = socketserver.UDPServer(('127.0.0.1', self.port), UDPEcho)
+        for server in (self.tcp, self.udp):
+            threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    def close(self):
+        for server in (self.tcp, self.udp):
+            server.shutdown()
+            server.server_close()
+
+class TestLinkProbe(unittest.TestCase):
+
+    def setUp(self):
+        self.echo = EchoServer()
+        self.addCleanup(self.echo.close)
+        self.config = Config()
+        self.config.set('probe_host', '127.0.0.1')
+        self.config.set('probe_port', self.echo.port)
+
+    def test_measure_against_echo_service(self):
+        result = LinkProbe(self.config).measure()
+
+        self.assertEqual(result['loss'], 0)
+        self.assertGreater(result['rtt_ms'], 0)
+        self.assertGreaterEqual(result['jitter_ms'], 0)
+        self.assertGreater(result['throughput_kbps'], 0)
+
+    def test_unreachable_target(self):
+        with socket.socket() as sock:
+            sock.bind(('127.0.0.1', 0))
+            self.config.set('probe_port', sock.getsockname()[1])
+        self.config.set('probe_timeout', 0.2)
+        self.config.set('probe_count', 2)
+
+        self.assertIsNone(LinkProbe(self.config).measure())
+
+class TestProbeSelection(unittest.TestCase):
+
+    def setUp(self):
+        self.now = 1000.0
+        self.cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.cache_dir, ignore_errors=True)
+        self.config = Config()
+        self.config.set('cache_dir', self.cache_dir)
+        self.config.set('probe_enabled', True)
+        self.config.set('probe_host', '127.0.0.1')
+        self.manager = NetworkManager(self.config)
+        self.manager.probes = ProbeCache(None, 600, clock=lambda: self.now)
+        self.networks = [
+            {'ssid': 'Crowded', 'bssid': 'aa:01', 'signal_strength': 95, 'has_profile': True},
+            {'ssid': 'Quiet', 'bssid': 'aa:02', 'signal_strength': 75, 'has_profile': True}
+        ]
+
+    def measured(self, ssid, bssid, throughput, rtt=10):
+        self.manager.probes.put(ssid, bssid, {'rtt_ms': rtt, 'jitter_ms': 1, 'loss': 0, 'throughput_kbps': throughput})
+
+    def test_cache_expires(self):
+        self.measured('Quiet', 'aa:02', 5000)
+        self.assertIsNotNone(self.manager.probes.get('Quiet', 'aa:02'))
+        self.now += 601
+        self.assertIsNone(self.manager.probes.get('Quiet', 'aa:02'))
+
+    def test_latency_discounts_throughput(self):
+        fast_laggy = {'rtt_ms': 300, 'jitter_ms': 50, 'throughput_kbps': 20000}
+        responsive = {'rtt_ms': 10, 'jitter_ms': 1, 'throughput_kbps': 12000}
+        self.assertGreater(probe_score(responsive), probe_score(fast_laggy))
+
+    def test_measured_speed_beats_signal(self):
+        self.measured('Crowded', 'aa:01', 2000)
+        self.measured('Quiet', 'aa:02', 30000)
+
+        self.assertEqual(self.manager._select_best_network(self.networks, None)['ssid'], 'Quiet')
+        on_quiet = {'ssid': 'Quiet', 'bssid': 'aa:02', 'signal': '75%'}
+        self.assertIsNone(self.manager._select_best_network(self.networks, on_quiet))
+
+    def test_unmeasured_network_is_tried(self):
+        self.measured('Quiet', 'aa:02', 30000)
+
+        on_quiet = {'ssid': 'Quiet', 'bssid': 'aa:02', 'signal': '75%'}
+        self.assertEqual(self.manager._select_best_network(self.networks, on_quiet)['ssid'], 'Crowded')
+
+    def test_switches_back_from_slower_network(self):
+        self.measured('Quiet', 'aa:02', 30000)
+        on_quiet = {'ssid': 'Quiet', 'bssid': 'aa:02', 'signal': '75%'}
+        connects = []
+        self.manager.connector.connect_to_network = lambda network, snapshot=None: connects.append(network['ssid']) or True
+        self.manager.connector.get_current_connection = lambda snapshot=None: {'ssid': 'Crowded', 'bssid': 'aa:01'}
+        self.manager.prober.measure = lambda: {'rtt_ms': 40, 'jitter_ms': 20, 'loss': 0, 'throughput_kbps': 2000}
+
+        self.assertFalse(self.manager.switch_to_network(self.networks[0], on_quiet))
+        self.assertEqual(connects, ['Crowded', 'Quiet'])
+        self.assertIsNotNone(self.manager.probes.get('Crowded', 'aa:01'))
+
+if __name__ == '__main__':
+    unittest.main()
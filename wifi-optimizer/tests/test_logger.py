@@ -0,0 +1,42 @@
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+class TestLoggerSetup(unittest.TestCase):
+
+    def setUp(self):
+        self.workdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.workdir, ignore_errors=True)
+
+    def run_python(self, code):
+        environment = dict(os.environ, PYTHONPATH=ROOT)
+        result = subprocess.run([sys.executable, '-c', code], cwd=self.workdir, env=environment,
+                                capture_output=True, text=True)
+        self.assertEqual(result.returncode, 0, result.stderr)
+        return result.stdout
+
+    def test_components_log_to_the_console_only(self):
+        output = self.run_python("from utils.logger import setup_logger; setup_logger('probe').info('hello')")
+
+        self.assertTrue(output.strip().endswith('probe - INFO - hello'))
+        self.assertEqual(os.listdir(self.workdir), [])
+
+    def test_configuration_replaces_the_console_only_setup(self):
+        self.run_python("from utils.logger import configure_logging, setup_logger; "
+                        "from config.settings import Config; "
+                        "setup_logger('early').info('before'); "
+                        "configure_logging(Config()); "
+                        "setup_logger('late').info('after')")
+
+        with open(os.path.join(self.workdir, 'wifi_optimizer.log')) as f:
+            lines = f.read().splitlines()
+        self.assertEqual(len(lines), 1)
+        self.assertTrue(lines[0].endswith('late - INFO - after'))
+
+if __name__ == '__main__':
+    unittest.main()
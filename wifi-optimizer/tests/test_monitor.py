@@ -0,0 +1,116 @@
+import shutil
+import subprocess
+import tempfile
+import unittest
+from unittest.mock import patch
+from src.command_runner import FakeRunner
+from src.monitor import ConnectionMonitor, DEGRADED, HEALTHY
+from src.network_manager import NetworkManager
+from config.settings import Config
+from tests.test_network_manager import INTERFACES
+from tests.test_wifi_scanner import NETWORKS, PROFILE_LIST, export_profiles
+
+class TestConnectionMonitor(unittest.TestCase):
+
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+        self.config = Config()
+        self.config.set('cache_dir', self.cache_dir)
+        self.config.set('scan_cache_file', '')
+        self.now = 0.0
+        self.connected_to = ['CafeGuest', 80]
+
+        def connect(cmd):
+            self.connected_to[:] = [cmd[3].split('=', 1)[1], 82]
+            return subprocess.CompletedProcess(cmd, 0, 'Connection request was completed successfully.', '')
+
+        self.runner = FakeRunner({
+            ('netsh', 'wlan', 'show', 'interfaces'): lambda cmd: subprocess.CompletedProcess(
+                cmd, 0, INTERFACES.format(ssid=self.connected_to[0], signal=self.connected_to[1]), ''),
+            ('netsh', 'wlan', 'export', 'profile'): export_profiles,
+            ('netsh', 'wlan', 'connect'): connect
+        })
+        self.runner.add(['netsh', 'wlan', 'show', 'profile'], PROFILE_LIST)
+        self.runner.add(['netsh', 'wlan', 'show', 'networks'], NETWORKS)
+        self.manager = NetworkManager(self.config, self.runner)
+        self.monitor = ConnectionMonitor(self.config, self.manager, clock=lambda: self.now)
+
+    def tearDown(self):
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+
+    def advance(self, seconds, signal=None):
+        if signal is not None:
+            self.connected_to[1] = signal
+        self.now += seconds
+        return self.monitor.step()
+
+    def scans(self):
+        return sum(1 for cmd in self.runner.commands if cmd[2:4] == ['show', 'networks'])
+
+    def test_healthy_link_is_only_sampled(self):
+        for _ in range(10):
+            self.assertEqual(self.advance(10), self.config.get('monitor_interval'))
+
+        self.assertEqual(self.monitor.state, HEALTHY)
+        self.assertEqual(self.scans(), 0)
+
+    def test_single_dip_does_not_degrade(self):
+        self.advance(10)
+        self.advance(10, signal=20)
+
+        self.assertEqual(self.monitor.state, HEALTHY)
+        self.assertEqual(self.scans(), 0)
+
+    @patch('src.wifi_connector.time.sleep')
+    def test_sustained_drop_switches_once(self, mock_sleep):
+        self.advance(10)
+        # Smoothed 80 -> 65 -> 54 -> 47: degraded on the third weak sample
+        delays = [self.advance(10, signal=30) for _ in range(3)]
+
+        self.assertEqual(self.monitor.state, DEGRADED)
+        self.assertEqual(delays[-1], self.config.get('monitor_fast_interval'))
+        self.assertEqual(self.connected_to[0], 'HomeNet')
+        self.assertEqual(self.monitor.switches, 1)
+
+        for _ in range(5):
+            self.advance(2)
+        self.assertEqual(self.monitor.state, HEALTHY)
+        self.assertEqual(self.scans(), 1)
+
+    def test_hysteresis_and_scan_backoff(self):
+        self.runner.add(['netsh', 'wlan', 'show', 'networks'], '')
+        self.advance(10)
+        for _ in range(4):
+            self.advance(2, signal=30)
+        self.assertEqual(self.monitor.state, DEGRADED)
+
+        # Between the trigger and recovery levels the link stays degraded
+        for _ in range(10):
+            self.advance(2, signal=55)
+        self.assertEqual(self.monitor.state, DEGRADED)
+
+        # 24 s degraded with scans due at 0, 15 and 45 s after the first
+        self.assertEqual(self.scans(), 2)
+
+        for _ in range(10):
+            self.advance(2, signal=70)
+        self.assertEqual(self.monitor.state, HEALTHY)
+
+    @patch('src.wifi_connector.time.sleep')
+    def test_dwell_time_blocks_roaming_after_switch(self, mock_sleep):
+        self.config.set('min_dwell_time', 60)
+        self.connected_to[:] = ['CafeGuest', 30]
+        self.monitor.last_switch = self.now
+        self.monitor.step()
+        for _ in range(29):
+            self.advance(2)
+
+        self.assertEqual(self.monitor.state, DEGRADED)
+        self.assertEqual(self.scans(), 0)
+
+        self.advance(2)
+        self.assertEqual(self.scans(), 1)
+        self.assertEqual(self.connected_to[0], 'HomeNet')
+
+if __name__ == '__main__':
+    unittest.main()
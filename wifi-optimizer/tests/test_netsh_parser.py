@@ -0,0 +1,69 @@
+import os
+import time
+import unittest
+from src.netsh_parser import parse_interfaces, parse_networks, parse_profile_details, parse_profiles
+from tests.test_network_table import dense_scan
+
+CORPUS_DIR = os.path.join(os.path.dirname(__file__), 'fixtures', 'netsh')
+LOCALES = sorted(os.listdir(CORPUS_DIR))
+
+# The same networks, recorded under every display language
+ACCESS_POINTS = [
+    ('HomeNet', 'aa:bb:cc:dd:ee:01', 82, 36, '5 GHz', '802.11ax'),
+    ('HomeNet', 'aa:bb:cc:dd:ee:11', 40, 6, '2.4 GHz', '802.11n'),
+    ('Cafe: Guest', 'aa:bb:cc:dd:ee:02', 55, 149, '5 GHz', '802.11ac'),
+    ('', 'aa:bb:cc:dd:ee:03', 31, 37, '6 GHz', '802.11ax')
+]
+
+def read_corpus(locale, name):
+    with open(os.path.join(CORPUS_DIR, locale, f'{name}.txt'), encoding='utf-8') as f:
+        return f.read()
+
+class TestNetshCorpus(unittest.TestCase):
+
+    def test_networks(self):
+        for locale in LOCALES:
+            with self.subTest(locale=locale):
+                access_points = parse_networks(read_corpus(locale, 'networks'))
+                self.assertEqual([(ap['ssid'], ap['bssid'], ap['signal_strength'], ap['channel'],
+                                   ap['band'], ap['radio_type']) for ap in access_points], ACCESS_POINTS)
+                self.assertTrue(access_points[0]['authentication'].startswith('WPA2'))
+                self.assertEqual(access_points[0]['encryption'], 'CCMP')
+
+    def test_interfaces(self):
+        for locale in LOCALES:
+            with self.subTest(locale=locale):
+                connected, idle = parse_interfaces(read_corpus(locale, 'interfaces'))
+                self.assertEqual((connected['state'], connected['ssid'], connected['bssid'], connected['channel'],
+                                  connected['signal_strength'], connected['band'], connected['profile']),
+                                 ('connected', 'HomeNet', 'aa:bb:cc:dd:ee:01', 36, 82, '5 GHz', 'HomeNet'))
+                self.assertEqual(idle['state'], 'disconnected')
+                self.assertNotIn('ssid', idle)
+                self.assertNotEqual(connected['interface'], idle['interface'])
+
+    def test_profiles(self):
+        for locale in LOCALES:
+            with self.subTest(locale=locale):
+                self.assertEqual(parse_profiles(read_corpus(locale, 'profiles')), ['HomeNet', 'Cafe: Guest', 'Work'])
+
+    def test_profile_details(self):
+        for locale in LOCALES:
+            with self.subTest(locale=locale):
+                details = parse_profile_details(read_corpus(locale, 'profile'), 'HomeNet')
+                self.assertEqual(details['name'], 'HomeNet')
+                self.assertTrue(details['authentication'].startswith('WPA2'))
+                self.assertEqual(details['encryption'], 'CCMP')
+
+    def test_parse_throughput(self):
+        output = dense_scan(200, 10)
+        lines = output.count('\n') + 1
+        start = time.perf_counter()
+        access_points = parse_networks(output)
+        elapsed = time.perf_counter() - start
+
+        self.assertEqual(len(access_points), 2000)
+        # About 600k lines/s on a development machine; the bound leaves room for slow CI
+        self.assertGreater(lines / elapsed, 100000)
+
+if __name__ == '__main__':
+    unittest.main()
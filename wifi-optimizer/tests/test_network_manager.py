@@ -1,7 +1,25 @@
+import asyncio
+import json
+import os
+import shutil
+import subprocess
+import tempfile
+import time
 import unittest
 from unittest.mock import Mock, patch
+from src.command_runner import FakeRunner
 from src.network_manager import NetworkManager
+from src.network_table import NetworkTable
+from src.selection import assign_networks
 from config.settings import Config
+from tests.test_wifi_scanner import NETWORKS, PROFILE_LIST, export_profiles
+
+INTERFACES = """
+    Name                   : Wi-Fi
+    State                  : connected
+    SSID                   : {ssid}
+    Signal                 : {signal}%
+"""
 
 class TestNetworkManager(unittest.TestCase):
     
@@ -29,5 +47,153 @@ class TestNetworkManager(unittest.TestCase):
         best = self.manager._select_best_network(networks, None)
         self.assertEqual(best['ssid'], 'Strong')
 
+    def test_other_access_points_of_the_current_network_are_not_targets(self):
+        networks = [{'ssid': 'Corp', 'bssid': 'aa:bb:cc:00:00:02', 'signal_strength': 91, 'has_profile': True}]
+        weak_ap = {'ssid': 'Corp', 'bssid': 'aa:bb:cc:00:00:01', 'signal': '45%'}
+
+        # netsh cannot move the link to the stronger access point
+        self.assertIsNone(self.manager._select_best_network(networks, weak_ap))
+
+        networks.append({'ssid': 'Guest', 'bssid': 'aa:bb:cc:00:00:03', 'signal_strength': 80, 'has_profile': True})
+        self.assertEqual(self.manager._select_best_network(networks, weak_ap)['ssid'], 'Guest')
+
+class TestOptimizationCycle(unittest.TestCase):
+
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+        self.config = Config()
+        self.config.set('cache_dir', self.cache_dir)
+        self.connected_to = ('CafeGuest', 40)
+
+        def slow(stdout):
+            def respond(cmd):
+                time.sleep(0.2)
+                return subprocess.CompletedProcess(cmd, 0, stdout() if callable(stdout) else stdout, '')
+            return respond
+
+        def connect(cmd):
+            self.connected_to = (cmd[3].split('=', 1)[1], 82)
+            return subprocess.CompletedProcess(cmd, 0, 'Connection request was completed successfully.', '')
+
+        self.runner = FakeRunner({
+            ('netsh', 'wlan', 'show', 'interfaces'): slow(
+                lambda: INTERFACES.format(ssid=self.connected_to[0], signal=self.connected_to[1])),
+            ('netsh', 'wlan', 'show', 'profile'): slow(PROFILE_LIST),
+            ('netsh', 'wlan', 'show', 'networks'): slow(NETWORKS),
+            ('netsh', 'wlan', 'export', 'profile'): export_profiles,
+            ('netsh', 'wlan', 'connect'): connect
+        })
+        self.manager = NetworkManager(self.config, self.runner)
+
+    def tearDown(self):
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+
+    def test_queries_run_concurrently_with_one_snapshot(self):
+        start = time.perf_counter()
+        interfaces_snapshot, networks = asyncio.run(self.manager._survey())
+        elapsed = time.perf_counter() - start
+
+        self.assertLess(elapsed, 0.5)
+        self.assertIn('CafeGuest', interfaces_snapshot)
+        self.assertEqual(len(networks), 2)
+
+    @patch('src.wifi_connector.time.sleep')
+    def test_optimize_switches_to_stronger_network(self, mock_sleep):
+        self.assertTrue(self.manager.optimize_wifi_connection())
+
+        self.assertEqual(self.connected_to[0], 'HomeNet')
+        commands = [' '.join(cmd[2:4]) for cmd in self.runner.commands]
+        # One snapshot for the cycle plus the verification after connecting
+        self.assertEqual(commands.count('show interfaces'), 2)
+
+    @patch('src.wifi_connector.time.sleep')
+    def test_cycle_phases_and_counters_are_logged(self, mock_sleep):
+        self.manager.optimize_wifi_connection()
+
+        cycle = self.manager.metrics.last
+        self.assertEqual((cycle['kind'], cycle['outcome'], cycle['ssid']), ('optimize', 'switched', 'HomeNet'))
+        self.assertEqual(set(cycle['phases']),
+                         {'survey', 'interfaces', 'profiles', 'scan', 'select', 'connect', 'verify'})
+        self.assertEqual(cycle['counters']['commands'], len(self.runner.commands))
+        self.assertEqual(cycle['counters']['verify_polls'], 1)
+        self.assertGreater(cycle['counters']['bytes_parsed'], len(NETWORKS))
+        with open(os.path.join(self.cache_dir, 'cycles.jsonl')) as f:
+            self.assertEqual(json.loads(f.read())['phases'], cycle['phases'])
+
+DUAL_BAND_NETWORKS = """
+SSID 1 : HomeNet
+    Network type            : Infrastructure
+    Authentication          : WPA2-Personal
+    Encryption              : CCMP
+    BSSID 1                 : aa:bb:cc:dd:ee:01
+         Signal             : 90%
+         Band               : 5 GHz
+         Channel            : 36
+SSID 2 : CafeGuest
+    Network type            : Infrastructure
+    Authentication          : Open
+    Encryption              : None
+    BSSID 1                 : aa:bb:cc:dd:ee:02
+         Signal             : 80%
+         Band               : 5 GHz
+         Channel            : 149
+"""
+
+class TestMultipleAdapters(unittest.TestCase):
+
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.cache_dir, ignore_errors=True)
+        self.config = Config()
+        self.config.set('cache_dir', self.cache_dir)
+        self.links = {'Wi-Fi': None, 'Wi-Fi 2': None}
+        self.runner = FakeRunner({
+            ('netsh', 'wlan', 'show', 'interfaces'): self.interfaces,
+            ('netsh', 'wlan', 'export', 'profile'): export_profiles,
+            ('netsh', 'wlan', 'connect'): self.connect
+        })
+        self.runner.add(['netsh', 'wlan', 'show', 'profile'], PROFILE_LIST)
+        self.runner.add(['netsh', 'wlan', 'show', 'networks'], DUAL_BAND_NETWORKS)
+        self.manager = NetworkManager(self.config, self.runner)
+        self.addCleanup(self.manager.close)
+
+    def interfaces(self, cmd):
+        output = ''
+        for name, ssid in self.links.items():
+            output += f"    Name                   : {name}\n"
+            if ssid:
+                output += f"    State                  : connected\n    SSID                   : {ssid}\n"
+            else:
+                output += "    State                  : disconnected\n"
+        return subprocess.CompletedProcess(cmd, 0, output, '')
+
+    def connect(self, cmd):
+        self.links[cmd[-1].split('=', 1)[1]] = cmd[3].split('=', 1)[1]
+        return subprocess.CompletedProcess(cmd, 0, 'Connection request was completed successfully.', '')
+
+    @patch('src.wifi_connector.time.sleep')
+    def test_adapters_are_spread_over_channels(self, mock_sleep):
+        self.assertTrue(self.manager.optimize_all_interfaces())
+
+        # Sharing channel 36 would halve HomeNet for the second adapter
+        self.assertEqual(self.links, {'Wi-Fi': 'HomeNet', 'Wi-Fi 2': 'CafeGuest'})
+        scans = [cmd[-1] for cmd in self.runner.commands if cmd[2:4] == ['show', 'networks']]
+        self.assertEqual(sorted(scans), ['interface=Wi-Fi', 'interface=Wi-Fi 2'])
+        self.assertTrue(os.path.exists(os.path.join(self.cache_dir, 'profiles-Wi_Fi_2.json')))
+        self.assertEqual(self.manager.metrics.last['assignments'], {'Wi-Fi': 'HomeNet', 'Wi-Fi 2': 'CafeGuest'})
+
+    def test_adapter_stays_on_a_link_that_does_not_overlap(self):
+        networks = self.manager.scanner._merge_network_data(
+            [{'name': 'HomeNet'}, {'name': 'CafeGuest'}], NetworkTable.from_netsh(DUAL_BAND_NETWORKS))
+        current = {'Wi-Fi': None,
+                   'Wi-Fi 2': {'ssid': 'HomeNet', 'bssid': 'aa:bb:cc:dd:ee:01', 'channel': 36, 'band': '5 GHz'}}
+
+        assignments = assign_networks(self.config, self.manager.scoring,
+                                      {'Wi-Fi': networks, 'Wi-Fi 2': networks}, current)
+
+        # The connected adapter keeps HomeNet, so the other one avoids its channel
+        self.assertIsNone(assignments['Wi-Fi 2'])
+        self.assertEqual(assignments['Wi-Fi']['ssid'], 'CafeGuest')
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
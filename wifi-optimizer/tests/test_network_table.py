@@ -0,0 +1,70 @@
+import time
+import unittest
+from src.network_table import NetworkTable
+
+OFFICE_SCAN = """
+Interface name : Wi-Fi
+There are 2 networks currently visible.
+
+SSID 1 : Corp
+    Network type            : Infrastructure
+    Authentication          : WPA2-Enterprise
+    Encryption              : CCMP
+    BSSID 1                 : AA:BB:CC:00:00:01
+         Signal             : 45%
+         Radio type         : 802.11n
+         Channel            : 6
+         Basic rates (Mbps) : 1 2 5.5 11
+    BSSID 2                 : aa:bb:cc:00:00:02
+         Signal             : 91%
+         Radio type         : 802.11ax
+         Band               : 5 GHz
+         Channel            : 44
+SSID 2 : Guest
+    Network type            : Infrastructure
+    Authentication          : Open
+    Encryption              : None
+    BSSID 1                 : aa:bb:cc:00:00:03
+         Signal             : 60%
+         Channel            : 11
+"""
+
+def dense_scan(ssids, aps_per_ssid):
+    lines = []
+    for s in range(ssids):
+        lines += [f"SSID {s + 1} : Net{s}", "    Authentication          : WPA2-Personal",
+                  "    Encryption              : CCMP"]
+        for a in range(aps_per_ssid):
+            lines += [f"    BSSID {a + 1}                 : 02:00:00:00:{s:02x}:{a:02x}",
+                      f"         Signal             : {(s * 7 + a * 13) % 100}%",
+                      f"         Channel            : {1 + a % 11}"]
+    return '\n'.join(lines)
+
+class TestNetworkTable(unittest.TestCase):
+
+    def test_access_points_are_indexed_per_bssid(self):
+        table = NetworkTable.from_netsh(OFFICE_SCAN)
+
+        self.assertEqual(len(table), 3)
+        self.assertEqual(table.ssids(), ['Corp', 'Guest'])
+        best = table.best_access_point('Corp')
+        self.assertEqual((best['bssid'], best['signal_strength'], best['channel'], best['band']),
+                         ('aa:bb:cc:00:00:02', 91, 44, '5 GHz'))
+        legacy = table.get('Corp', 'AA:BB:CC:00:00:01')
+        self.assertEqual((legacy['band'], legacy['radio_type'], legacy['authentication']),
+                         ('2.4 GHz', '802.11n', 'WPA2-Enterprise'))
+        self.assertEqual([ap['signal_strength'] for ap in table.access_points_for('Corp')], [91, 45])
+        self.assertIsNone(table.best_access_point('Missing'))
+
+    def test_dense_scan_in_one_pass(self):
+        output = dense_scan(50, 10)
+        start = time.perf_counter()
+        table = NetworkTable.from_netsh(output)
+        elapsed = time.perf_counter() - start
+
+        self.assertEqual(len(table), 500)
+        self.assertEqual(len(table.access_points_for('Net49')), 10)
+        self.assertLess(elapsed, 0.5)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,86 @@
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+from src.command_runner import FakeRunner
+from src.quick_connect import QuickConnect
+from src.wifi_scanner import WiFiScanner
+from config.settings import Config
+from tests.test_network_manager import INTERFACES
+from tests.test_wifi_scanner import NETWORKS, PROFILE_LIST, fake_netsh
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+class TestQuickConnect(unittest.TestCase):
+
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.cache_dir, ignore_errors=True)
+        self.config = Config()
+        self.config.set('cache_dir', self.cache_dir)
+        self.connected = 'CafeGuest'
+        self.runner = FakeRunner({
+            ('netsh', 'wlan', 'show', 'interfaces'): self.interfaces,
+            ('netsh', 'wlan', 'connect'): self.connect
+        })
+        self.runner.add(['netsh', 'wlan', 'show', 'networks'], NETWORKS)
+        self.runner.add(['netsh', 'wlan', 'show', 'profile'], PROFILE_LIST)
+
+    def interfaces(self, cmd):
+        if self.connected is None:
+            return subprocess.CompletedProcess(cmd, 0, "    Name : Wi-Fi\n    State : disconnected\n", '')
+        signal, bssid = (82, '01') if self.connected == 'HomeNet' else (40, '02')
+        output = INTERFACES.format(ssid=self.connected, signal=signal) + f"    BSSID : aa:bb:cc:dd:ee:{bssid}\n"
+        return subprocess.CompletedProcess(cmd, 0, output, '')
+
+    def connect(self, cmd):
+        self.connected = cmd[3].split('=', 1)[1]
+        return subprocess.CompletedProcess(cmd, 0, 'Connection request was completed successfully.', '')
+
+    def run_quick(self):
+        quick_connect = QuickConnect(self.config, self.runner)
+        try:
+            return quick_connect.run()
+        finally:
+            quick_connect.close()
+
+    def verbs(self):
+        return [' '.join(cmd[2:4]) for cmd in self.runner.commands]
+
+    def test_decides_after_two_queries_with_profile_cache(self):
+        # A full scan leaves the profile cache behind
+        WiFiScanner(self.config, fake_netsh()).scan_networks()
+
+        self.assertTrue(self.run_quick())
+
+        self.assertEqual(sorted(self.verbs()[:2]), ['show interfaces', 'show networks'])
+        self.assertEqual(self.verbs()[2], 'connect name=HomeNet')
+        self.assertEqual(self.connected, 'HomeNet')
+
+    def test_keeps_the_current_link_without_cache(self):
+        # HomeNet is stronger, but nothing says the CafeGuest link may be dropped for it
+        self.assertTrue(self.run_quick())
+
+        self.assertEqual(sorted(self.verbs()), ['show interfaces', 'show networks'])
+        self.assertEqual(self.connected, 'CafeGuest')
+
+    def test_lists_profiles_without_cache_or_link(self):
+        self.connected = None
+
+        self.assertTrue(self.run_quick())
+
+        self.assertEqual(sorted(self.verbs()[:2]), ['show interfaces', 'show networks'])
+        self.assertEqual(self.verbs()[2:4], ['show profile', 'connect name=HomeNet'])
+        self.assertEqual(self.connected, 'HomeNet')
+
+    def test_imports_stay_light(self):
+        code = ("import sys, src.quick_connect; "
+                "print(sorted(m for m in ('asyncio', 'xml.etree.ElementTree', 'src.network_manager', "
+                "'src.wifi_scanner', 'src.link_probe') if m in sys.modules))")
+        result = subprocess.run([sys.executable, '-c', code], cwd=ROOT, capture_output=True, text=True)
+        self.assertEqual(result.stdout.strip(), '[]', result.stderr)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,107 @@
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+from src.command_runner import FakeRunner
+from src.network_manager import NetworkManager
+from src.scan_cache import ScanCache
+from config.settings import Config
+from tests.test_network_manager import INTERFACES
+from tests.test_wifi_scanner import NETWORKS, PROFILE_LIST, export_profiles
+
+class TestScanCache(unittest.TestCase):
+
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.cache_dir, ignore_errors=True)
+        self.config = Config()
+        self.config.set('cache_dir', self.cache_dir)
+        self.now = 1000.0
+        self.cache = ScanCache(self.config, clock=lambda: self.now)
+
+    def test_entries_expire_after_ttl(self):
+        self.cache.put([{'ssid': 'HomeNet'}])
+
+        self.now += 10
+        self.assertEqual(self.cache.get(), [{'ssid': 'HomeNet'}])
+        self.assertIsNone(self.cache.get(max_age=5))
+        self.now += 1
+        self.assertIsNone(self.cache.get())
+        self.assertEqual(self.cache.get(max_age=60), [{'ssid': 'HomeNet'}])
+        self.assertEqual(os.listdir(self.cache_dir), ['scan_cache.json'])
+
+    def test_refresh_always_scans(self):
+        self.cache.put([{'ssid': 'Old'}])
+
+        networks, scanned = self.cache.get_or_scan(lambda: [{'ssid': 'New'}], refresh=True)
+        self.assertTrue(scanned)
+        self.assertEqual(self.cache.get(), [{'ssid': 'New'}])
+
+    def test_concurrent_callers_share_one_scan(self):
+        cache = ScanCache(self.config)
+        scans = []
+
+        def scan():
+            scans.append(1)
+            time.sleep(0.3)
+            return [{'ssid': 'HomeNet'}]
+
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(ScanCache(self.config).get_or_scan(scan)))
+                   for _ in range(3)]
+        for thread in threads:
+            thread.start()
+            time.sleep(0.02)
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(scans), 1)
+        self.assertEqual([networks for networks, _ in results], [[{'ssid': 'HomeNet'}]] * 3)
+        self.assertFalse(os.path.exists(cache.lock_path))
+
+    def test_stale_lock_is_removed(self):
+        self.config.set('scan_timeout', 0.1)
+        cache = ScanCache(self.config)
+        with open(cache.lock_path, 'w') as f:
+            f.write('12345')
+        os.utime(cache.lock_path, (time.time() - 60, time.time() - 60))
+
+        networks, scanned = cache.get_or_scan(lambda: [{'ssid': 'HomeNet'}])
+        self.assertTrue(scanned)
+
+class TestCachedStatus(unittest.TestCase):
+
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.cache_dir, ignore_errors=True)
+        self.config = Config()
+        self.config.set('cache_dir', self.cache_dir)
+        self.runner = FakeRunner({('netsh', 'wlan', 'export', 'profile'): export_profiles})
+        self.runner.add(['netsh', 'wlan', 'show', 'interfaces'], INTERFACES.format(ssid='HomeNet', signal=82))
+        self.runner.add(['netsh', 'wlan', 'show', 'profile'], PROFILE_LIST)
+        self.runner.add(['netsh', 'wlan', 'show', 'networks'], NETWORKS)
+
+    def status(self, **kwargs):
+        # Every CLI invocation has its own manager
+        self.runner.commands.clear()
+        status = NetworkManager(self.config, self.runner).get_network_status(**kwargs)
+        return status, [' '.join(cmd[2:4]) for cmd in self.runner.commands]
+
+    def test_repeated_status_reuses_scan(self):
+        first, commands = self.status()
+        self.assertIn('show networks', commands)
+
+        second, commands = self.status()
+        self.assertEqual(commands, ['show interfaces'])
+        self.assertEqual(second['available_networks'], first['available_networks'])
+        self.assertEqual(second['current_connection']['ssid'], 'HomeNet')
+
+    def test_max_age_and_refresh_force_a_scan(self):
+        self.status()
+        self.assertIn('show networks', self.status(max_age=0)[1])
+        self.assertIn('show networks', self.status(refresh=True)[1])
+
+if __name__ == '__main__':
+    unittest.main()
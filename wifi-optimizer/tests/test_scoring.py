@@ -0,0 +1,118 @@
+import time
+import unittest
+from src.network_manager import NetworkManager
+from src.scoring import ScoringEngine, channel_overlap, dbm_to_percent, percent_to_dbm
+from src.signal_history import SignalHistory
+from config.settings import Config
+
+def access_point(ssid, bssid, signal, channel, band=None, encryption='CCMP'):
+    ap = {'ssid': ssid, 'bssid': bssid, 'signal_strength': signal, 'channel': channel, 'encryption': encryption}
+    if band:
+        ap['band'] = band
+    return ap
+
+def network(ssid, *access_points, has_profile=True):
+    best = max(access_points, key=lambda ap: ap['signal_strength'])
+    return dict(best, has_profile=has_profile, access_points=list(access_points))
+
+class TestScoringEngine(unittest.TestCase):
+
+    def setUp(self):
+        self.config = Config()
+        self.engine = ScoringEngine(self.config)
+
+    def test_dbm_percent_conversion(self):
+        self.assertEqual(percent_to_dbm(100), -50)
+        self.assertEqual(percent_to_dbm(60), -70)
+        self.assertEqual(percent_to_dbm(0), -100)
+        self.assertEqual(dbm_to_percent(-70), 60)
+        self.assertEqual(dbm_to_percent(-30), 100)
+        self.assertEqual(dbm_to_percent(-110), 0)
+        for percent in (0, 25, 50, 83, 100):
+            self.assertAlmostEqual(dbm_to_percent(percent_to_dbm(percent)), percent)
+
+    def test_channel_overlap(self):
+        self.assertEqual(channel_overlap('2.4 GHz', 6, '2.4 GHz', 6), 1)
+        self.assertAlmostEqual(channel_overlap('2.4 GHz', 6, '2.4 GHz', 8), 0.6)
+        self.assertEqual(channel_overlap('2.4 GHz', 1, '2.4 GHz', 6), 0)
+        self.assertEqual(channel_overlap('5 GHz', 36, '5 GHz', 40), 0)
+        self.assertEqual(channel_overlap('2.4 GHz', 6, '5 GHz', 6), 0)
+
+    def test_congested_channel_loses_to_quiet_one(self):
+        loud = access_point('Loud', 'aa:01', 90, 6)
+        quiet = access_point('Quiet', 'aa:02', 80, 11)
+        neighbours = [access_point(f'N{i}', f'bb:{i:02x}', 70, 5 + i % 3) for i in range(6)]
+
+        loud_score, quiet_score = self.engine.score([loud, quiet], [loud, quiet] + neighbours)
+        self.assertGreater(quiet_score, loud_score)
+
+    def test_band_and_cipher(self):
+        scores = self.engine.score([
+            access_point('Wide', 'aa:01', 70, 1),
+            access_point('Fast', 'aa:02', 70, 36),
+            access_point('Legacy', 'aa:03', 70, 36, encryption='TKIP')
+        ])
+        self.assertGreater(scores[1], scores[0])
+        self.assertAlmostEqual(scores[2], scores[1] / 2)
+
+    def test_custom_factor(self):
+        self.engine.add_factor('metered', lambda columns, context: [
+            0.1 if band == '5 GHz' else 1.0 for band in columns['band']])
+        scores = self.engine.score([access_point('Wide', 'aa:01', 70, 1), access_point('Fast', 'aa:02', 70, 36)])
+        self.assertGreater(scores[0], scores[1])
+
+    def test_history_smooths_signal(self):
+        history = SignalHistory()
+        for signal in [95, 20, 95, 20, 95]:
+            history.record('Flaky', 'aa:01', signal)
+        engine = ScoringEngine(self.config, history)
+
+        flaky, steady = engine.score([access_point('Flaky', 'aa:01', 95, 36), access_point('Steady', 'aa:02', 75, 40)])
+        self.assertGreater(steady, flaky)
+
+    def test_dense_scan(self):
+        scan = [access_point(f'Net{i // 4}', f'02:00:00:00:{i // 256:02x}:{i % 256:02x}', 30 + i % 70, 1 + i % 11)
+                for i in range(1000)]
+        start = time.perf_counter()
+        scores = self.engine.score(scan, scan)
+        elapsed = time.perf_counter() - start
+
+        self.assertEqual(len(scores), 1000)
+        self.assertLess(elapsed, 0.5)
+
+class TestSelection(unittest.TestCase):
+
+    def setUp(self):
+        self.config = Config()
+        self.manager = NetworkManager(self.config)
+        self.manager.history = self.manager.scoring.history = SignalHistory()
+
+    def test_threshold_is_compared_in_dbm(self):
+        # -70 dBm is 60%; the old check compared percentages against 70
+        networks = [network('Edge', access_point('Edge', 'aa:01', 65, 36))]
+        self.assertEqual(self.manager._select_best_network(networks, None)['ssid'], 'Edge')
+
+        networks = [network('Edge', access_point('Edge', 'aa:01', 55, 36))]
+        self.assertIsNone(self.manager._select_best_network(networks, None))
+
+    def test_picks_access_point_on_free_channel(self):
+        crowded = access_point('Office', 'aa:01', 88, 6, encryption='CCMP')
+        free = access_point('Office', 'aa:02', 80, 149, encryption='CCMP')
+        others = [network(f'Other{i}', access_point(f'Other{i}', f'bb:{i:02x}', 75, 6), has_profile=False)
+                  for i in range(4)]
+
+        best = self.manager._select_best_network([network('Office', crowded, free)] + others, None)
+        self.assertEqual((best['bssid'], best['channel'], best['signal_strength']), ('aa:02', 149, 80))
+
+    def test_preferred_network_wins(self):
+        self.config.set('preferred_networks', ['Home'])
+        networks = [
+            network('Home', access_point('Home', 'aa:01', 65, 1)),
+            network('Fast', access_point('Fast', 'aa:02', 95, 36))
+        ]
+        current = {'ssid': 'Fast', 'bssid': 'aa:02', 'signal': '95%'}
+
+        self.assertEqual(self.manager._select_best_network(networks, current)['ssid'], 'Home')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,98 @@
+import os
+import shutil
+import tempfile
+import tracemalloc
+import unittest
+from src.network_manager import NetworkManager
+from src.signal_history import SignalHistory
+from config.settings import Config
+
+class TestSignalHistory(unittest.TestCase):
+
+    def setUp(self):
+        self.history = SignalHistory(capacity=4, max_access_points=3, alpha=0.5)
+
+    def test_ring_keeps_latest_samples(self):
+        for i, signal in enumerate([10, 20, 30, 40, 50, 60]):
+            self.history.record('Corp', 'AA:01', signal, when=i * 60)
+
+        ring = self.history.get('Corp', 'AA:01')
+        self.assertEqual(ring.count, 4)
+        self.assertEqual(ring.mean(), 45)
+        self.assertAlmostEqual(ring.variance(), 125)
+        self.assertAlmostEqual(ring.trend(), 10)
+        self.assertAlmostEqual(self.history.ewma('Corp', 'AA:01'), 50.3125)
+
+    def test_access_points_are_capped(self):
+        for i in range(5):
+            self.history.record(f'Net{i}', None, 50, when=i)
+
+        self.assertEqual(len(self.history), 3)
+        self.assertIsNone(self.history.get('Net0'))
+        self.assertIsNotNone(self.history.get('Net4'))
+
+    def test_memory_is_flat(self):
+        history = SignalHistory(capacity=32, max_access_points=16)
+        for i in range(2000):
+            history.record(f'Net{i % 16}', None, i % 100, when=i)
+        tracemalloc.start()
+        for i in range(20000):
+            history.record(f'Net{i % 16}', None, i % 100, when=2000 + i)
+        current, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        self.assertLess(current, 4096)
+
+    def test_save_and_load(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory, ignore_errors=True)
+        path = os.path.join(directory, 'history.bin')
+        for i, signal in enumerate([70, 72, 40, 75, 71]):
+            self.history.record('Café', 'aa:01', signal, when=i)
+        self.history.save(path)
+
+        loaded = SignalHistory(capacity=4, max_access_points=3, alpha=0.5)
+        loaded.load(path)
+        self.assertEqual(loaded.ewma('Café', 'aa:01'), self.history.ewma('Café', 'aa:01'))
+        self.assertEqual(loaded.variance('Café', 'aa:01'), self.history.variance('Café', 'aa:01'))
+
+        resized = SignalHistory(capacity=2, alpha=0.5)
+        resized.load(path)
+        self.assertEqual(list(resized.get('Café', 'aa:01').signals), [75, 71])
+
+    def test_truncated_file_is_ignored(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory, ignore_errors=True)
+        config = Config()
+        config.set('cache_dir', directory)
+        config.set('signal_history_size', 4)
+        path = os.path.join(directory, config.get('signal_history_file'))
+        for i in range(3):
+            self.history.record(f'Net{i}', None, 50, when=i)
+        self.history.save(path)
+
+        # Cut on an item boundary, so array.fromfile runs out of data
+        with open(path, 'rb') as f:
+            data = f.read()
+        with open(path, 'wb') as f:
+            f.write(data[:-16])
+
+        history = SignalHistory.from_config(config)
+        self.assertEqual(len(history), 0)
+
+    def test_selection_prefers_steady_access_point(self):
+        manager = NetworkManager(Config())
+        manager.history = manager.scoring.history = SignalHistory()
+        for signal in [90, 30, 88, 35, 85]:
+            manager.history.record('Flaky', 'aa:01', signal)
+        for signal in [70, 71, 69, 70, 70]:
+            manager.history.record('Steady', 'aa:02', signal)
+        networks = [
+            {'ssid': 'Flaky', 'bssid': 'aa:01', 'signal_strength': 85, 'has_profile': True},
+            {'ssid': 'Steady', 'bssid': 'aa:02', 'signal_strength': 70, 'has_profile': True}
+        ]
+
+        self.assertEqual(manager._select_best_network(networks, None)['ssid'], 'Steady')
+
+if __name__ == '__main__':
+    unittest.main()
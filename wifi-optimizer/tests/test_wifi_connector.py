@@ -0,0 +1,93 @@
+import subprocess
+import unittest
+from unittest.mock import patch
+from src.command_runner import FakeRunner
+from src.wifi_connector import WiFiConnector
+from config.settings import Config
+
+INTERFACES = """
+There is 1 interface on the system:
+
+    Name                   : Wi-Fi
+    Description            : Intel(R) Wi-Fi 6 AX201 160MHz
+    State                  : connected
+    SSID                   : Corp
+    BSSID                  : AA:BB:CC:00:00:01
+    Network type           : Infrastructure
+    Channel                : 6
+    Signal                 : 45%
+    Profile                : Corp
+"""
+
+class TestWiFiConnector(unittest.TestCase):
+
+    def setUp(self):
+        self.runner = FakeRunner()
+        self.runner.add(['netsh', 'wlan', 'show', 'interfaces'], INTERFACES)
+        self.connector = WiFiConnector(Config(), self.runner)
+
+    def test_bssid_is_not_taken_for_ssid(self):
+        connection = self.connector.get_current_connection()
+
+        self.assertEqual(connection['ssid'], 'Corp')
+        self.assertEqual(connection['bssid'], 'aa:bb:cc:00:00:01')
+        self.assertEqual(connection['signal'], '45%')
+        self.assertEqual(connection['interface'], 'Wi-Fi')
+
+    def test_already_connected_uses_snapshot(self):
+        self.assertTrue(self.connector.connect_to_network({'ssid': 'Corp'}, INTERFACES))
+        self.assertEqual(self.runner.commands, [])
+
+    def test_other_access_point_of_current_network_does_not_drop_the_link(self):
+        target = {'ssid': 'Corp', 'bssid': 'aa:bb:cc:00:00:02'}
+
+        self.assertTrue(self.connector.connect_to_network(target, INTERFACES))
+        self.assertEqual(self.runner.commands, [])
+
+class TestConnectionVerification(unittest.TestCase):
+
+    def setUp(self):
+        self.states = []
+        self.runner = FakeRunner({('netsh', 'wlan', 'show', 'interfaces'): self.next_state})
+        self.runner.add(['netsh', 'wlan', 'connect'], 'Connection request was completed successfully.')
+        self.config = Config()
+        self.config.set('connection_timeout', 2)
+        self.connector = WiFiConnector(self.config, self.runner)
+
+    def next_state(self, cmd):
+        state, ssid = self.states.pop(0) if len(self.states) > 1 else self.states[0]
+        output = INTERFACES.replace('connected', state).replace(': Corp', f': {ssid}')
+        return subprocess.CompletedProcess(cmd, 0, output, '')
+
+    def commands(self, verb):
+        return [cmd for cmd in self.runner.commands if cmd[2] == verb]
+
+    @patch('src.wifi_connector.time.sleep')
+    def test_returns_as_soon_as_connected(self, mock_sleep):
+        self.states = [('associating', 'Corp'), ('authenticating', 'Corp'), ('connected', 'Corp')]
+
+        connection = self.connector._connect_using_profile('Corp')
+
+        self.assertEqual(connection['ssid'], 'Corp')
+        self.assertEqual([c.args[0] for c in mock_sleep.call_args_list], [0.1, 0.2])
+
+    @patch('src.wifi_connector.time.sleep')
+    def test_similar_ssid_is_not_success(self, mock_sleep):
+        self.states = [('connected', 'Corp-Guest')]
+
+        self.assertIsNone(self.connector._connect_using_profile('Corp'))
+        self.assertEqual(len(self.commands('connect')), self.config.get('retry_attempts'))
+        self.assertAlmostEqual(sum(c.args[0] for c in mock_sleep.call_args_list), 2 * 3)
+
+    @patch('src.wifi_connector.time.sleep')
+    def test_failed_attempt_is_retried(self, mock_sleep):
+        self.states = [('connected', 'Corp')]
+        results = [subprocess.CompletedProcess([], 1, '', 'The network is not available.'),
+                   subprocess.CompletedProcess([], 0, '', '')]
+        self.runner.responses[('netsh', 'wlan', 'connect')] = lambda cmd: results.pop(0)
+
+        self.assertEqual(self.connector._connect_using_profile('Corp')['ssid'], 'Corp')
+        self.assertEqual(len(self.commands('connect')), 2)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,99 @@
+import os
+import shutil
+import subprocess
+import tempfile
+import unittest
+from src.command_runner import FakeRunner
+from src.wifi_scanner import WiFiScanner
+from config.settings import Config
+
+PROFILE_LIST = """
+Profiles on interface Wi-Fi:
+
+User profiles
+-------------
+    All User Profile     : HomeNet
+    All User Profile     : CafeGuest
+"""
+
+NETWORKS = """
+SSID 1 : HomeNet
+    Network type            : Infrastructure
+    Authentication          : WPA2-Personal
+    Encryption              : CCMP
+    BSSID 1                 : aa:bb:cc:dd:ee:01
+         Signal             : 82%
+SSID 2 : CafeGuest
+    Network type            : Infrastructure
+    Authentication          : Open
+    Encryption              : None
+    BSSID 1                 : aa:bb:cc:dd:ee:02
+         Signal             : 40%
+"""
+
+PROFILE_XML = """<?xml version="1.0"?>
+<WLANProfile xmlns="http://www.microsoft.com/networking/WLAN/profile/v1">
+    <name>{name}</name>
+    <SSIDConfig><SSID><name>{name}</name></SSID></SSIDConfig>
+    <MSM>
+        <security>
+            <authEncryption>
+                <authentication>{auth}</authentication>
+                <encryption>{encryption}</encryption>
+                <useOneX>false</useOneX>
+            </authEncryption>
+        </security>
+    </MSM>
+</WLANProfile>
+"""
+
+def export_profiles(cmd):
+    """Write profile XML files like 'netsh wlan export profile folder=...'"""
+    folder = cmd[4].split('=', 1)[1]
+    for name, auth, encryption in [('HomeNet', 'WPA2PSK', 'AES'), ('CafeGuest', 'open', 'none')]:
+        with open(os.path.join(folder, f'Wi-Fi-{name}.xml'), 'w') as f:
+            f.write(PROFILE_XML.format(name=name, auth=auth, encryption=encryption))
+    return subprocess.CompletedProcess(cmd, 0, '', '')
+
+def fake_netsh(profile_list=PROFILE_LIST):
+    runner = FakeRunner({('netsh', 'wlan', 'export', 'profile'): export_profiles})
+    runner.add(['netsh', 'wlan', 'show', 'profile'], profile_list)
+    runner.add(['netsh', 'wlan', 'show', 'networks'], NETWORKS)
+    return runner
+
+class TestWiFiScanner(unittest.TestCase):
+
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+        self.config = Config()
+        self.config.set('cache_dir', self.cache_dir)
+
+    def tearDown(self):
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+
+    def test_profiles_are_exported_in_one_call(self):
+        netsh = fake_netsh()
+        networks = WiFiScanner(self.config, netsh).scan_networks()
+
+        self.assertEqual(len(netsh.commands), 3)
+        self.assertFalse(any('key=clear' in cmd for cmd in netsh.commands))
+        by_ssid = {network['ssid']: network for network in networks}
+        self.assertEqual(by_ssid['HomeNet']['authentication'], 'WPA2-Personal')
+        self.assertEqual(by_ssid['HomeNet']['encryption'], 'CCMP')
+        self.assertEqual(by_ssid['HomeNet']['signal_strength'], 82)
+        self.assertEqual(by_ssid['CafeGuest']['authentication'], 'Open')
+
+    def test_cached_details_reused_until_profile_list_changes(self):
+        first = WiFiScanner(self.config, fake_netsh()).scan_networks()
+
+        netsh = fake_netsh()
+        second = WiFiScanner(self.config, netsh).scan_networks()
+        self.assertEqual(second, first)
+        self.assertEqual([cmd[2] for cmd in netsh.commands], ['show', 'show'])
+
+        netsh = fake_netsh(PROFILE_LIST.replace('CafeGuest', 'Office'))
+        WiFiScanner(self.config, netsh).scan_networks()
+        self.assertIn('export', [cmd[2] for cmd in netsh.commands])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,34 +1,42 @@
 """Logging utility for Wi-Fi optimizer."""
 
 import logging
+import os
 import sys
-from datetime import datetime
+
+# The queue-based logging setup is shared with the other tools in the repository
+SHARED_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), 'shared')
+if SHARED_DIR not in sys.path:
+    sys.path.append(SHARED_DIR)
+
+import queue_logging
+
+# Whether the current setup is the console-only one of setup_logger, which configure_logging replaces
+_console_only = False
+
+def configure_logging(config) -> bool:
+    """Set up the process-wide log handlers from the configuration; only the console-only fallback is replaced."""
+    global _console_only
+    configured = queue_logging.configure(
+        log_file=config.get('log_file') or None,
+        level=config.get('log_level'),
+        json_format=config.get('log_format') == 'json',
+        console='stdout',
+        max_bytes=config.get('log_max_bytes'),
+        when=config.get('log_rotate_when') or None,
+        backup_count=config.get('log_backup_count'),
+        force=_console_only
+    )
+    _console_only = False
+    return configured
 
 def setup_logger(name: str, log_level: str = 'INFO') -> logging.Logger:
-    """Set up logger with custom formatting."""
-    
+    """Get a logger at log_level, logging to the console only if nothing set up logging yet."""
+    global _console_only
+    if not queue_logging.is_configured():
+        # Library use and tests get no log file; main() sets that up from the configuration
+        _console_only = queue_logging.configure(console='stdout')
+
     logger = logging.getLogger(name)
     logger.setLevel(getattr(logging, log_level.upper()))
-    
-    # Clear existing handlers
-    logger.handlers.clear()
-    
-    # Create formatter
-    formatter = logging.Formatter(
-        '%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-        datefmt='%Y-%m-%d %H:%M:%S'
-    )
-    
-    # Console handler
-    console_handler = logging.StreamHandler(sys.stdout)
-    console_handler.setFormatter(formatter)
-    logger.addHandler(console_handler)
-    
-    # File handler
-    file_handler = logging.FileHandler(
-        f'wifi_optimizer_{datetime.now().strftime("%Y%m%d")}.log'
-    )
-    file_handler.setFormatter(formatter)
-    logger.addHandler(file_handler)
-    
-    return logger
\ No newline at end of file
+    return logger